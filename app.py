@@ -4,11 +4,15 @@ import subprocess
 import atexit
 os.environ["QT_LOGGING_RULES"] = "qt.multimedia.ffmpeg.debug=false"
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtCore import QCoreApplication, QTimer
 from config_ini import ConfigIni
 from main_window import ElevatorScreen
+from atualizadores import slots
+from passagem import ServidorPassagem, ClientePassagem
 
 CONFIG_FILE = "config.json"
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSUMIR = "--assumir" in sys.argv  # 🔀 versão nova em espera: assume a tela da instância em exibição
 atualizador_proc = None
 
 atualizador_path = os.path.join(os.path.dirname(__file__), "atualizador.py")
@@ -18,6 +22,11 @@ def verificar_primeira_execucao():
     return not os.path.exists(CONFIG_FILE)
 
 if __name__ == "__main__":
+    # 🅰️🅱️ Versão ativa instalada num slot (software/v<N>/): quem roda é o app.py de lá
+    #    (em espera o ponteiro ainda não está confirmado: quem iniciou já é o slot novo)
+    if not ASSUMIR and slots.redirecionar(__file__):
+        sys.exit(0)
+
     try:
         app = QApplication(sys.argv)
         primeira_vez = verificar_primeira_execucao()
@@ -30,37 +39,53 @@ if __name__ == "__main__":
             app.exec()
 
         # ✅ Sempre executa o atualizador (depois da config_ini ou direto)
-        try:
-            print("🚀 Iniciando atualizador:", atualizador_path)
-            atualizador_proc = subprocess.Popen(
-                [sys.executable, atualizador_path]
-            )
-
-            verificador_proc = subprocess.Popen(
-                [sys.executable, verificador_path],
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-
-            # 🔒 Encerrar subprocessos ao sair do app
-            def encerrar_processos():
-                for proc in [atualizador_proc, verificador_proc]:
-                    if proc and proc.poll() is None:
-                        print("🛑 Encerrando subprocesso...")
-                        proc.terminate()
-                        try:
-                            proc.wait(timeout=5)
-                        except subprocess.TimeoutExpired:
-                            proc.kill()
-
-            QCoreApplication.instance().aboutToQuit.connect(encerrar_processos)
-            atexit.register(encerrar_processos)
-
-        except Exception as e:
-            print(f"⚠️ Erro ao iniciar atualizador: {e}")
+        def iniciar_subprocessos():
+            global atualizador_proc
+            try:
+                print("🚀 Iniciando atualizador:", atualizador_path)
+                atualizador_proc = subprocess.Popen(
+                    [sys.executable, atualizador_path]
+                )
+
+                verificador_proc = subprocess.Popen(
+                    [sys.executable, verificador_path],
+                    creationflags=subprocess.CREATE_NO_WINDOW
+                )
+
+                # 🔒 Encerrar subprocessos ao sair do app
+                def encerrar_processos():
+                    for proc in [atualizador_proc, verificador_proc]:
+                        if proc and proc.poll() is None:
+                            print("🛑 Encerrando subprocesso...")
+                            proc.terminate()
+                            try:
+                                proc.wait(timeout=5)
+                            except subprocess.TimeoutExpired:
+                                proc.kill()
+
+                QCoreApplication.instance().aboutToQuit.connect(encerrar_processos)
+                atexit.register(encerrar_processos)
+
+            except Exception as e:
+                print(f"⚠️ Erro ao iniciar atualizador: {e}")
+
+        def assumir_exibicao():
+            # 🔀 Esta instância é a que está na tela: atende a próxima troca de versão
+            app.servidor_passagem = ServidorPassagem(window)
+            # ✅ Janela na tela: confirma a versão (sem isso, o verificador faz rollback)
+            slots.sinalizar_pronto(APP_DIR)
+
+        # 🔀 Em espera, os subprocessos só sobem depois que a instância antiga (e os dela) saírem
+        if not ASSUMIR:
+            iniciar_subprocessos()
 
         # ✅ Agora inicia a tela principal
-        window = ElevatorScreen()
-        window.show()
+        window = ElevatorScreen(em_espera=ASSUMIR)
+        if ASSUMIR:
+            app.cliente_passagem = ClientePassagem(window, lambda: (iniciar_subprocessos(), assumir_exibicao()))
+        else:
+            window.show()
+            QTimer.singleShot(0, assumir_exibicao)
         sys.exit(app.exec())
 
     except Exception as e:
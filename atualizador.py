@@ -1,23 +1,83 @@
 import os
 import atexit
-import time
 import sys
 import psutil
-from atualizadores import sistema, entretenimento, noticias_update
+from atualizadores import sistema, entretenimento, noticias_update, http_cliente
+from atualizadores import live_update, cotacao_update, clima_update, indice, retentativas, pacote_sync, catalogo, canal_push
+from atualizadores.agendador import Agendador, Tarefa, carregar_intervalos
 
 BASE_DIR = getattr(sys, '_MEIPASS', os.path.abspath("."))
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
 LOCKFILE = os.path.join(CACHE_DIR, "atualizador.lock")
 
+# ⏱️ Intervalo de cada feed em segundos (sobrescrevível pela chave "agendamento" do config.json)
+INTERVALOS_PADRAO = {
+    "clientes": 1200,
+    "entretenimento": 1200,
+    "noticias": 1200,
+    "lives": 1200,
+    "cotacoes": 1200,
+    "clima": 1200,
+    "retentativas": 15,
+    "pacote": 1200,
+}
+
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 def limpar_lockfile():
     if os.path.exists(LOCKFILE):
         os.remove(LOCKFILE)
 
-if __name__ == "__main__":
-    tempo_espera = 1200  # 20 minutos
+def criar_agendador():
+    intervalos = carregar_intervalos(INTERVALOS_PADRAO)
+    # Feeds de conteúdo pesado (vídeos) dividem um orçamento próprio; consultas leves rodam em paralelo.
+    # Manutenção (varredura do índice, fila de retentativas) tem o seu: uma retentativa longa esperando
+    # downloads não ocupa a vaga da sincronização de clientes/entretenimento
+    agendador = Agendador(orcamentos={"conteudo": 2, "consultas": 4, "manutencao": 1})
+    # ⏱️ Cada feed começa na fase desta tela (não no boot); só uma tela ainda sem conteúdo sincroniza na hora
+    ja_sincronizada = catalogo.revisao_manifesto("clientes") > 0
+    # 📡 Feeds cobertos pelo canal push: consultas mais espaçadas enquanto ele está de pé
+    fator = canal_push.FATOR_POLLING
+    # 📦 Com um pacote de sincronização recente, os manifestos e notícias vêm dele (sem nova consulta)
+    agendador.adicionar(Tarefa("clientes", lambda: sistema.verificar_atualizacao(manifesto_ciclo=pacote_sync.ciclo_do_pacote()),
+                               intervalos["clientes"], orcamento="conteudo", fase=ja_sincronizada, fator_push=fator))
+    agendador.adicionar(Tarefa("entretenimento", lambda: entretenimento.verificar_atualizacao_entretenimento(manifesto_ciclo=pacote_sync.ciclo_do_pacote()),
+                               intervalos["entretenimento"], orcamento="conteudo", fase=ja_sincronizada, fator_push=fator))
+    agendador.adicionar(Tarefa("noticias", lambda: noticias_update.verificar_e_atualizar_noticias(manifesto_ciclo=pacote_sync.ciclo_do_pacote()),
+                               intervalos["noticias"], fator_push=fator))
+    agendador.adicionar(Tarefa("lives", live_update.verificar_e_atualizar_live, intervalos["lives"], fator_push=fator))
+    agendador.adicionar(Tarefa("cotacoes", cotacao_update.verificar_e_atualizar_cotacao, intervalos["cotacoes"]))
+    agendador.adicionar(Tarefa("clima", clima_update.atualizar_clima, intervalos["clima"]))
+    if pacote_sync.carregar_config_pacote()["ativo"]:
+        # Uma ida ao servidor traz todos os feeds e antecipa só as tarefas dos que mudaram; sem o endpoint
+        # (ou com o pacote pausado) as tarefas acima consultam sozinhas, em paralelo
+        agendador.adicionar(Tarefa("pacote", lambda: pacote_sync.sincronizar(agendador.disparar), intervalos["pacote"],
+                                   fase=ja_sincronizada, fator_push=fator))
+    agendador.adicionar(Tarefa("metricas", http_cliente.imprimir_metricas, intervalos["clientes"], jitter=0))
+    # 📅 Avisos que entram em vigor nos próximos dias já no disco (só consulta catálogo e índice)
+    agendador.adicionar(Tarefa("avisos_proximos", sistema.garantir_avisos_proximos, 3600, orcamento="conteudo"))
+    # 🗂️ Varredura completa do disco só de vez em quando; no dia a dia o índice é mantido pelos downloads
+    agendador.adicionar(Tarefa("indice_arquivos", indice.varredura_periodica, 3600, orcamento="manutencao"))
+    # 🔁 Downloads que falharam são repetidos com backoff próprio, sem esperar o ciclo de 20 minutos
+    ao_recuperar = {"clientes": sistema.verificar_atualizacao, "entretenimento": entretenimento.verificar_atualizacao_entretenimento}
+    agendador.adicionar(Tarefa("retentativas", lambda: retentativas.processar_fila(ao_recuperar), intervalos["retentativas"],
+                               jitter=0.5, orcamento="manutencao"))
+    return agendador
+
+def iniciar_canal_push(agendador):
+    """Liga o canal push: cada mudança do painel antecipa a sincronização só do feed afetado."""
+    def ao_mudar(feed, registro):
+        if feed == "software":
+            # 💾 Versão nova direto no catálogo; o verificador_sistema a percebe sem consultar o servidor
+            if registro.get("versao_disponivel") is not None:
+                catalogo.salvar_feed("software", registro, registro["versao_disponivel"])
+            return
+        # Com o pacote ativo, ele busca a mudança e antecipa a tarefa do feed (que senão usaria a cópia do pacote anterior)
+        agendador.disparar("pacote") or agendador.disparar(feed)
 
+    return canal_push.CanalPush(ao_mudar).iniciar()
+
+if __name__ == "__main__":
     # Verifica se já está rodando
     if os.path.exists(LOCKFILE):
         try:
@@ -38,22 +98,7 @@ if __name__ == "__main__":
 
     atexit.register(limpar_lockfile)
 
-    # 🔁 Loop principal de verificação
-    while True:
-        try:
-            print("\n🧪 Verificando atualizações gerais do sistema...")
-            sistema.verificar_atualizacao()
-
-            print("🎞️ Verificando atualizações de entretenimento...")
-            entretenimento.verificar_atualizacao_entretenimento()
-
-            print("📰 Verificando atualizações das notícias...")
-            noticias_update.verificar_e_atualizar_noticias()
-
-            print("✅ Fim do ciclo. Aguardando próximo...")
-            time.sleep(tempo_espera)
-
-        except Exception as e:
-            print(f"❌ Erro inesperado no loop principal: {e}")
-            print("⏳ Aguardando 30s antes de tentar novamente...")
-            time.sleep(30)
+    # 🔁 Cada feed roda no seu próprio ritmo, com jitter e backoff independentes
+    agendador = criar_agendador()
+    iniciar_canal_push(agendador)
+    agendador.rodar()
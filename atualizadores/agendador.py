@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import traceback
+from atualizadores import catalogo, canal_push
+
+CONFIG_PATH = "config.json"
+
+# Espalhamento da frota: todas as telas de um prédio (ou de uma cidade, depois de uma queda de energia)
+# ligam juntas. Para não consultarem o servidor no mesmo segundo, cada feed de cada tela tem uma fase
+# estável dentro do intervalo — derivada do tela_id, igual em todo boot — além do jitter a cada ciclo.
+# O servidor também pode pedir que as telas esperem (Retry-After / "retry_after" do pacote): a dica fica
+# no catálogo e vale para todos os processos (atualizador, verificador e widgets).
+
+
+def carregar_tela_id():
+    if not os.path.exists(CONFIG_PATH):
+        return 101
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            return int(json.load(file).get("tela_id", 101))
+    except:
+        return 101
+
+
+def fase(nome, intervalo, tela_id=None):
+    """Deslocamento estável (0 a `intervalo` segundos) do feed `nome` nesta tela."""
+    tela_id = carregar_tela_id() if tela_id is None else tela_id
+    h = hashlib.sha256(f"{tela_id}:{nome}".encode("utf-8")).digest()
+    return int.from_bytes(h[:8], "big") / 2 ** 64 * intervalo
+
+
+def registrar_dica(segundos, origem=""):
+    """Servidor pediu para esperar `segundos` antes de novas consultas."""
+    ate = time.time() + float(segundos)
+    try:
+        if ate > float(catalogo.obter_metadado("dica_backoff_ate", 0)) + 1:
+            catalogo.salvar_metadado("dica_backoff_ate", ate)
+            print(f"🚧 Servidor {origem} pediu pausa de {float(segundos):.0f}s nas consultas")
+    except Exception as e:
+        print(f"⚠️ Falha ao registrar dica de backoff: {e}")
+
+
+def espera_dica():
+    """Segundos que ainda faltam da última dica de backoff do servidor (0 se nenhuma)."""
+    try:
+        return max(0.0, float(catalogo.obter_metadado("dica_backoff_ate", 0)) - time.time())
+    except Exception:
+        return 0.0
+
+
+class Cadencia:
+    """Esperas de uma consulta periódica fora do agendador (ex.: timers dos widgets).
+
+    A primeira espera é a fase da tela; as seguintes, o intervalo com jitter. Nenhuma é menor
+    que a dica de backoff do servidor.
+    """
+
+    def __init__(self, nome, intervalo, jitter=0.1, tela_id=None):
+        self.nome = nome
+        self.intervalo = intervalo
+        self.jitter = jitter
+        self.tela_id = tela_id
+        self.primeira = True
+
+    def proxima(self):
+        if self.primeira:
+            self.primeira = False
+            base = fase(self.nome, self.intervalo, self.tela_id)
+        else:
+            base = self.intervalo * random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(1, base, espera_dica())
+
+    def proxima_ms(self):
+        return int(self.proxima() * 1000)
+
+
+class Tarefa:
+    """Um feed periódico com intervalo, jitter, backoff e orçamento de concorrência próprios.
+
+    A função é síncrona e roda em thread separada. Exceção ou retorno `False` contam como falha.
+    Com `fase=True` a primeira execução espera a fase estável da tela em vez de rodar no boot.
+    `fator_push` espaça as esperas enquanto o canal push cobre o feed (ver canal_push).
+    """
+
+    def __init__(self, nome, funcao, intervalo, jitter=0.1, backoff_base=30, backoff_max=None, orcamento="consultas",
+                 fase=True, fator_push=1):
+        self.nome = nome
+        self.funcao = funcao
+        self.intervalo = intervalo
+        self.jitter = jitter
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max or intervalo
+        self.orcamento = orcamento
+        self.fase = fase
+        self.fator_push = fator_push
+        self.falhas = 0
+
+    def espera_inicial(self):
+        return max(fase(self.nome, self.intervalo) if self.fase else 0, espera_dica())
+
+    def proxima_espera(self, sucesso):
+        if sucesso:
+            self.falhas = 0
+            base = self.intervalo
+        else:
+            self.falhas += 1
+            base = min(self.backoff_max, self.backoff_base * 2 ** (self.falhas - 1))
+        return max(1, base * random.uniform(1 - self.jitter, 1 + self.jitter), espera_dica())
+
+    def espera_efetiva(self, espera):
+        """`espera` esticada enquanto o canal push está de pé (só fora do backoff de falhas)."""
+        if self.fator_push > 1 and self.falhas == 0 and canal_push.ativo():
+            return espera * self.fator_push
+        return espera
+
+
+class Agendador:
+    """Laço asyncio que executa cada feed no seu próprio ritmo.
+
+    Feeds independentes rodam em paralelo; `orcamentos` limita quantos feeds de cada
+    tipo podem estar ativos ao mesmo tempo (ex.: só um feed pesado de vídeos por vez).
+    `disparar` antecipa a próxima execução de um feed (ex.: mudança avisada pelo canal push).
+    """
+
+    def __init__(self, orcamentos=None):
+        self.orcamentos = orcamentos or {"conteudo": 1, "consultas": 4}
+        self.tarefas = []
+        self.eventos = {}
+        self.loop = None
+
+    def adicionar(self, tarefa):
+        self.tarefas.append(tarefa)
+        return tarefa
+
+    def disparar(self, nome):
+        """Acorda a tarefa `nome` agora (pode ser chamado de outra thread). False se ela não existe."""
+        evento = self.eventos.get(nome)
+        if evento is None or self.loop is None:
+            return False
+        self.loop.call_soon_threadsafe(evento.set)
+        return True
+
+    async def _esperar(self, tarefa, espera, relaxar=True):
+        """Dorme `espera` segundos ou até a tarefa ser disparada. O prazo é reavaliado a cada minuto, então
+        encurta de volta assim que o canal push cai."""
+        evento = self.eventos[tarefa.nome]
+        inicio = time.monotonic()
+        while True:
+            restante = (tarefa.espera_efetiva(espera) if relaxar else espera) - (time.monotonic() - inicio)
+            if restante <= 0:
+                return
+            try:
+                await asyncio.wait_for(evento.wait(), timeout=min(restante, 60))
+            except asyncio.TimeoutError:
+                continue
+            evento.clear()
+            if espera_dica() > 0:
+                continue  # o servidor pediu pausa: o aviso espera o prazo normal
+            print(f"📨 [{tarefa.nome}] Sincronização antecipada por aviso de mudança")
+            return
+
+    async def _executar_uma_vez(self, tarefa, semaforo):
+        async with semaforo:
+            try:
+                resultado = await asyncio.to_thread(tarefa.funcao)
+                return resultado is not False
+            except Exception as e:
+                print(f"❌ Erro no feed '{tarefa.nome}': {e}")
+                traceback.print_exc()
+                return False
+
+    async def _loop_tarefa(self, tarefa, semaforo):
+        espera = tarefa.espera_inicial()
+        if espera >= 1:
+            print(f"⏱️ [{tarefa.nome}] Primeira execução em {espera:.0f}s (fase desta tela)")
+            await self._esperar(tarefa, espera, relaxar=False)
+        while True:
+            print(f"🔄 [{tarefa.nome}] Iniciando sincronização...")
+            sucesso = await self._executar_uma_vez(tarefa, semaforo)
+            espera = tarefa.proxima_espera(sucesso)
+            if sucesso:
+                print(f"✅ [{tarefa.nome}] Concluído. Próxima execução em {tarefa.espera_efetiva(espera):.0f}s")
+            else:
+                print(f"⏳ [{tarefa.nome}] Falha {tarefa.falhas}. Nova tentativa em {espera:.0f}s")
+            await self._esperar(tarefa, espera)
+
+    async def executar(self):
+        self.loop = asyncio.get_running_loop()
+        self.eventos = {tarefa.nome: asyncio.Event() for tarefa in self.tarefas}
+        semaforos = {nome: asyncio.Semaphore(limite) for nome, limite in self.orcamentos.items()}
+        await asyncio.gather(*(
+            self._loop_tarefa(tarefa, semaforos.setdefault(tarefa.orcamento, asyncio.Semaphore(1)))
+            for tarefa in self.tarefas
+        ))
+
+    def rodar(self):
+        asyncio.run(self.executar())
+
+
+def carregar_intervalos(padroes):
+    """Intervalos por feed (segundos), sobrescrevíveis pela chave "agendamento" do config.json."""
+    intervalos = dict(padroes)
+    if not os.path.exists(CONFIG_PATH):
+        return intervalos
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            intervalos.update(json.load(file).get("agendamento", {}))
+    except:
+        pass
+    return intervalos
+
+
+def simular_carga(telas=500, intervalo=1200, duracao=3600, janela=10, espalhar=True, jitter=0.1, semente=1):
+    """Simula uma frota que liga ao mesmo tempo (queda de energia) e conta requisições por janela de `janela` s.
+
+    Sem espalhamento, cada tela consulta no boot e depois a cada `intervalo` exato (os timers antigos).
+    Retorna (pico de requisições numa janela, média por janela).
+    """
+    aleatorio = random.Random(semente)
+    contagem = {}
+    for tela_id in range(1, telas + 1):
+        boot = aleatorio.uniform(0, 2)  # todas ligam juntas, com diferença de poucos segundos
+        t = boot + (fase("pacote", intervalo, tela_id) if espalhar else 0)
+        while t < duracao:
+            contagem[int(t // janela)] = contagem.get(int(t // janela), 0) + 1
+            t += intervalo * (aleatorio.uniform(1 - jitter, 1 + jitter) if espalhar else 1)
+    total = sum(contagem.values())
+    return max(contagem.values()), total / (duracao / janela)
+
+
+if __name__ == "__main__":
+    for espalhar in (False, True):
+        pico, media = simular_carga(espalhar=espalhar)
+        print(f"{'Com fase + jitter' if espalhar else 'Timers fixos     '}: pico {pico} req/10s, média {media:.1f} req/10s")
@@ -0,0 +1,149 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+
+BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+ARMAZEM_DIR = os.path.join(CACHE_DIR, "Armazem")
+INDICE_ETAG_FILE = os.path.join(ARMAZEM_DIR, "indice_etag.json")
+
+# Armazém endereçado por conteúdo: cada arquivo existe uma única vez em Armazem/<sha[:2]>/<sha>
+# e as pastas de categoria (Propagandas, Entretenimento, News...) são hard links para ele.
+# O número de links do objeto funciona como contagem de referências.
+
+_lock = threading.Lock()
+
+
+def calcular_sha256(caminho):
+    h = hashlib.sha256()
+    with open(caminho, "rb") as file:
+        for bloco in iter(lambda: file.read(1024 * 1024), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def gravar_se_mudou(caminho, conteudo):
+    """Grava `conteudo` (bytes) de forma atômica, só se diferir do que já está no disco. Retorna True se gravou."""
+    if os.path.exists(caminho) and os.path.getsize(caminho) == len(conteudo):
+        if calcular_sha256(caminho) == hashlib.sha256(conteudo).hexdigest():
+            return False
+    os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+    return True
+
+
+def caminho_objeto(sha256):
+    return os.path.join(ARMAZEM_DIR, sha256[:2], sha256)
+
+
+def _carregar_indice():
+    if not os.path.exists(INDICE_ETAG_FILE):
+        return {}
+    try:
+        with open(INDICE_ETAG_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return {}
+
+
+def _salvar_indice(indice):
+    gravar_se_mudou(INDICE_ETAG_FILE, json.dumps(indice, sort_keys=True).encode("utf-8"))
+
+
+def sha_por_etag(etag):
+    if not etag:
+        return None
+    with _lock:
+        return _carregar_indice().get(etag)
+
+
+def vincular_arquivo(origem, destino):
+    """Cria `destino` como hard link de `origem` (cópia se o sistema de arquivos não suportar)."""
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporario = destino + ".link"
+    if os.path.exists(temporario):
+        os.remove(temporario)
+    try:
+        os.link(origem, temporario)
+    except OSError:
+        shutil.copy2(origem, temporario)
+    os.replace(temporario, destino)
+
+
+def vincular(sha256, destino):
+    """Materializa `destino` a partir do armazém, sem download. Retorna False se o conteúdo não existe."""
+    if not sha256:
+        return False
+    objeto = caminho_objeto(sha256.lower())
+    if not os.path.exists(objeto):
+        return False
+    vincular_arquivo(objeto, destino)
+    print(f"🔗 Reaproveitado do armazém: {os.path.basename(destino)}")
+    return True
+
+
+def armazenar(caminho, etag=None, sha256=None):
+    """Registra um arquivo recém-baixado no armazém e retorna seu SHA-256.
+
+    Se o mesmo conteúdo já existir, o arquivo vira um link para o objeto existente.
+    """
+    sha256 = (sha256 or calcular_sha256(caminho)).lower()
+    objeto = caminho_objeto(sha256)
+    with _lock:
+        if os.path.exists(objeto):
+            vincular_arquivo(objeto, caminho)
+        else:
+            vincular_arquivo(caminho, objeto)
+        if etag:
+            indice = _carregar_indice()
+            if indice.get(etag) != sha256:
+                indice[etag] = sha256
+                _salvar_indice(indice)
+    return sha256
+
+
+def descartar(caminho):
+    """Tira do armazém o conteúdo de `caminho` (ex.: corrompido): o objeto e os ETags que apontam para ele.
+
+    Sem isso o próximo download acharia o objeto pelo ETag e vincularia os mesmos bytes de volta.
+    """
+    sha256 = calcular_sha256(caminho)
+    objeto = caminho_objeto(sha256)
+    with _lock:
+        if os.path.exists(objeto):
+            os.remove(objeto)
+        indice = _carregar_indice()
+        restantes = {etag: sha for etag, sha in indice.items() if sha != sha256}
+        if len(restantes) != len(indice):
+            _salvar_indice(restantes)
+    return sha256
+
+
+def coletar_lixo():
+    """Remove objetos que não são mais referenciados por nenhuma pasta de categoria."""
+    if not os.path.exists(ARMAZEM_DIR):
+        return 0
+    removidos = set()
+    with _lock:
+        for root, _, files in os.walk(ARMAZEM_DIR):
+            for file in files:
+                objeto = os.path.join(root, file)
+                if objeto == INDICE_ETAG_FILE:
+                    continue
+                try:
+                    if os.stat(objeto).st_nlink <= 1:
+                        os.remove(objeto)
+                        removidos.add(file)
+                except OSError as e:
+                    print(f"⚠️ Falha ao coletar {objeto}: {e}")
+
+        if removidos:
+            indice = _carregar_indice()
+            _salvar_indice({etag: sha for etag, sha in indice.items() if sha not in removidos})
+            print(f"🧹 Armazém: {len(removidos)} objeto(s) sem referência removido(s)")
+    return len(removidos)
@@ -0,0 +1,218 @@
+import os
+import json
+import hashlib
+import threading
+from atualizadores import catalogo
+
+CONFIG_PATH = "config.json"
+
+# Substituto local do backend (Supabase) para testar a sincronização sem rede.
+# Ativado pela chave opcional "backend_local" do config.json, com o caminho de um arquivo JSON:
+#   {"tabelas": {"updates_clientes": [{"cliente_id": 101, "atualizado_em": "...", "json_data": {...}}], ...}}
+# Implementa só o que os atualizadores usam do cliente do Supabase (select/eq/order/limit/update/execute)
+# e a função remota `manifesto_delta`. `publicar` simula uma nova versão vinda do painel e guarda a
+# anterior no histórico, de onde os deltas são calculados. `ouvir` recebe cada linha alterada, como o
+# Realtime do Supabase (usado pelo servidor_local para simular o canal push).
+
+
+def assinatura_manifesto(dados):
+    """SHA-256 da forma canônica do manifesto — o cliente confere o resultado de um delta com ela."""
+    return hashlib.sha256(json.dumps(dados, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def calcular_delta(antigo, novo, chaves):
+    """Diferença entre dois manifestos. `chaves` mapeia cada lista de itens ao campo que identifica o item."""
+    delta = {"itens": {}, "campos": {}, "campos_removidos": []}
+    for lista, campo in chaves.items():
+        anteriores = {item.get(campo): item for item in antigo.get(lista, [])}
+        atuais = {item.get(campo): item for item in novo.get(lista, [])}
+        mudancas = {
+            "adicionados": [item for chave, item in atuais.items() if chave not in anteriores],
+            "alterados": [item for chave, item in atuais.items() if chave in anteriores and anteriores[chave] != item],
+            "removidos": [chave for chave in anteriores if chave not in atuais],
+        }
+        # A ordem só vai junto quando não é a natural (itens mantidos na ordem antiga + novos no fim)
+        natural = [chave for chave in anteriores if chave in atuais] + [chave for chave in atuais if chave not in anteriores]
+        if list(atuais) != natural:
+            mudancas["ordem"] = list(atuais)
+        if any(mudancas.values()):
+            delta["itens"][lista] = mudancas
+    for chave, valor in novo.items():
+        if chave not in chaves and antigo.get(chave) != valor:
+            delta["campos"][chave] = valor
+    delta["campos_removidos"] = [chave for chave in antigo if chave not in chaves and chave not in novo]
+    return delta
+
+
+class Resposta:
+    def __init__(self, data):
+        self.data = data
+
+
+class Consulta:
+    """Construtor de consultas no formato do cliente do Supabase."""
+
+    def __init__(self, backend, tabela):
+        self.backend = backend
+        self.tabela = tabela
+        self.colunas = None
+        self.filtros = []
+        self.ordem = None
+        self.limite = None
+        self.valores = None
+
+    def select(self, colunas="*"):
+        self.colunas = None if colunas.strip() == "*" else [coluna.strip() for coluna in colunas.split(",")]
+        return self
+
+    def eq(self, coluna, valor):
+        self.filtros.append((coluna, valor))
+        return self
+
+    def order(self, coluna, desc=False):
+        self.ordem = (coluna, desc)
+        return self
+
+    def limit(self, n):
+        self.limite = n
+        return self
+
+    def update(self, valores):
+        self.valores = valores
+        return self
+
+    def execute(self):
+        return self.backend._executar(self)
+
+
+class ChamadaRemota:
+    def __init__(self, backend, funcao, parametros):
+        self.backend, self.funcao, self.parametros = backend, funcao, parametros
+
+    def execute(self):
+        return self.backend._chamar(self.funcao, self.parametros)
+
+
+class BackendLocal:
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self.lock = threading.Lock()
+        self.bytes_respondidos = 0  # para comparar o volume da sonda/delta com o snapshot completo
+        self.ouvintes = []
+        self.dados = {"tabelas": {}, "historico": {}}
+        if os.path.exists(caminho):
+            with open(caminho, "r", encoding="utf-8") as f:
+                self.dados.update(json.load(f))
+
+    def table(self, nome):
+        return Consulta(self, nome)
+
+    def rpc(self, funcao, parametros=None):
+        return ChamadaRemota(self, funcao, parametros or {})
+
+    def ouvir(self, funcao):
+        """`funcao(tabela, tipo, registro)` é chamada a cada INSERT/UPDATE."""
+        self.ouvintes.append(funcao)
+
+    def _notificar(self, tabela, tipo, registro):
+        for funcao in self.ouvintes:
+            try:
+                funcao(tabela, tipo, dict(registro))
+            except Exception as e:
+                print(f"⚠️ Ouvinte do backend local falhou: {e}")
+
+    def _salvar(self):
+        temporario = self.caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.dados, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho)
+
+    def _responder(self, data):
+        self.bytes_respondidos += len(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+        return Resposta(data)
+
+    def _linhas(self, tabela, filtros):
+        return [linha for linha in self.dados["tabelas"].get(tabela, [])
+                if all(linha.get(coluna) == valor for coluna, valor in filtros)]
+
+    def _executar(self, consulta):
+        with self.lock:
+            linhas = self._linhas(consulta.tabela, consulta.filtros)
+            if consulta.valores is not None:
+                for linha in linhas:
+                    linha.update(consulta.valores)
+                    self._notificar(consulta.tabela, "UPDATE", linha)
+                self._salvar()
+                return self._responder(linhas)
+            if consulta.ordem:
+                coluna, desc = consulta.ordem
+                linhas = sorted(linhas, key=lambda linha: linha.get(coluna), reverse=desc)
+            if consulta.limite is not None:
+                linhas = linhas[:consulta.limite]
+            if consulta.colunas:
+                faltando = [coluna for coluna in consulta.colunas if linhas and coluna not in linhas[0]]
+                if faltando:
+                    raise KeyError(f"coluna inexistente em {consulta.tabela}: {', '.join(faltando)}")
+                linhas = [{coluna: linha.get(coluna) for coluna in consulta.colunas} for linha in linhas]
+            return self._responder(linhas)
+
+    def _chamar(self, funcao, parametros):
+        if funcao != "manifesto_delta":
+            raise KeyError(f"função remota desconhecida: {funcao}")
+        with self.lock:
+            tabela, coluna = parametros["tabela"], parametros["coluna_carimbo"]
+            filtros = list((parametros.get("filtro") or {}).items())
+            linhas = sorted(self._linhas(tabela, filtros), key=lambda linha: linha.get(coluna), reverse=True)
+            if not linhas:
+                return self._responder(None)
+            atual = linhas[0]
+            anterior = next((
+                registro["json_data"] for registro in self.dados["historico"].get(tabela, [])
+                if str(registro["carimbo"]) == str(parametros["desde"]) and all(registro["filtro"].get(c) == v for c, v in filtros)
+            ), None)
+            if anterior is None:
+                # Versão base desconhecida (ou já expirada do histórico): o cliente deve pedir o snapshot
+                return self._responder({"snapshot": True})
+            delta = calcular_delta(anterior, atual["json_data"], catalogo.CHAVES_ITEM[parametros["manifesto"]])
+            delta.update({"base": parametros["desde"], "carimbo": atual.get(coluna),
+                          "assinatura": assinatura_manifesto(atual["json_data"])})
+            return self._responder(delta)
+
+    def publicar(self, tabela, json_data, coluna_carimbo, carimbo, **filtro):
+        """Simula uma publicação do painel: grava a nova linha e guarda a versão anterior no histórico."""
+        with self.lock:
+            linhas = self.dados["tabelas"].setdefault(tabela, [])
+            existentes = self._linhas(tabela, filtro.items())
+            for linha in existentes:
+                self.dados["historico"].setdefault(tabela, []).append(
+                    {"filtro": filtro, "carimbo": linha.get(coluna_carimbo), "json_data": linha["json_data"]}
+                )
+                linhas.remove(linha)
+            linhas.append({**filtro, coluna_carimbo: carimbo, "json_data": json_data})
+            self._salvar()
+            self._notificar(tabela, "INSERT", linhas[-1])
+
+
+_cliente = None
+_cliente_lock = threading.Lock()
+
+
+def obter_cliente():
+    """Cliente do backend: o substituto local se "backend_local" estiver no config.json, senão o Supabase."""
+    global _cliente
+    with _cliente_lock:
+        if _cliente is None:
+            caminho = None
+            if os.path.exists(CONFIG_PATH):
+                try:
+                    with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+                        caminho = json.load(file).get("backend_local")
+                except:
+                    pass
+            if caminho:
+                print(f"🧪 Usando backend local: {caminho}")
+                _cliente = BackendLocal(caminho)
+            else:
+                from config.database import supabase
+                _cliente = supabase
+        return _cliente
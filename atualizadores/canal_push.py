@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import random
+import threading
+from atualizadores import catalogo, backend_local
+
+CONFIG_PATH = "config.json"
+
+# Canal push de mudanças (Supabase Realtime): uma conexão websocket por tela avisa na hora quando o painel
+# altera um dos feeds abaixo, e o atualizador sincroniza só aquele feed. As consultas periódicas continuam
+# como rede de segurança, mais espaçadas enquanto o canal está de pé (FATOR_POLLING) e no ritmo normal
+# assim que ele cai. O estado do canal fica no catálogo, visível para o verificador e os widgets: só as
+# transições (conectou/caiu) são gravadas, nunca os heartbeats. O websocket em si é o cliente síncrono
+# da biblioteca `websockets`, que já vem com o supabase (dependência do `realtime`).
+#
+# Protocolo (Phoenix, vsn 1.0.0), o mínimo usado aqui:
+#   -> {"topic": "realtime:telas", "event": "phx_join", "payload": {"config": {"postgres_changes": [...]}}, "ref": "1"}
+#   <- {"topic": "realtime:telas", "event": "postgres_changes", "payload": {"data": {"table": "cameras", "record": {...}}}}
+#   -> {"topic": "phoenix", "event": "heartbeat", "payload": {}, "ref": "2"}  (a cada HEARTBEAT segundos)
+
+# tabela -> feed do atualizador
+TABELAS = {
+    "updates_clientes": "clientes",
+    "entretenimento_updates": "entretenimento",
+    "noticias": "noticias",
+    "cameras": "lives",
+    "sistema_update": "software",
+}
+TABELAS_POR_TELA = {"updates_clientes", "sistema_update"}  # filtradas pelo cliente_id desta tela
+
+TOPICO = "realtime:telas"
+HEARTBEAT = 25            # segundos entre heartbeats (o servidor derruba a conexão sem eles em ~60s)
+RECONEXAO_BASE = 5        # primeira espera após uma queda
+RECONEXAO_MAX = 5 * 60    # teto da espera entre reconexões
+FATOR_POLLING = 4         # com o canal de pé, as consultas periódicas cobertas por ele ficam 4x mais espaçadas
+SILENCIO_MAX = 2 * HEARTBEAT + 5  # sem nenhuma mensagem (nem resposta de heartbeat) por mais que isso: conexão morta
+
+
+def carregar_config_canal():
+    config = {"ativo": True, "url": None, "apikey": None, "tela_id": 101}
+    if not os.path.exists(CONFIG_PATH):
+        return config
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            dados = json.load(file)
+        config["tela_id"] = int(dados.get("tela_id", 101))
+        config.update(dados.get("canal_push", {}))
+    except:
+        pass
+    return config
+
+
+def url_realtime(cliente):
+    """URL do websocket do Realtime a partir do cliente do Supabase (None se o cliente não é o Supabase)."""
+    url, chave = getattr(cliente, "supabase_url", None), getattr(cliente, "supabase_key", None)
+    if not url or not chave:
+        return None
+    return url.rstrip("/").replace("https://", "wss://").replace("http://", "ws://") + f"/realtime/v1/websocket?apikey={chave}&vsn=1.0.0"
+
+
+def ativo():
+    """True se o canal push está conectado (em qualquer processo desta tela).
+
+    O processo dono do canal grava o seu pid ao conectar e 0 ao cair; o pid de um processo que
+    morreu sem avisar não conta.
+    """
+    try:
+        pid = int(catalogo.obter_metadado("canal_push_pid", 0))
+        if not pid:
+            return False
+        if pid == os.getpid():
+            return True
+        import psutil
+        return psutil.pid_exists(pid)
+    except Exception:
+        return False
+
+
+def conectar(url, timeout=10):
+    """Abre o websocket (ws:// ou wss://); ping/pong e fechamento ficam com a biblioteca."""
+    from websockets.sync.client import connect
+    return connect(url, open_timeout=timeout, close_timeout=2)
+
+
+def espera_reconexao(falhas):
+    """Backoff exponencial entre reconexões, com jitter de ±50% para a frota não voltar junta."""
+    return min(RECONEXAO_MAX, RECONEXAO_BASE * 2 ** (falhas - 1)) * random.uniform(0.5, 1.5)
+
+
+class CanalPush:
+    """Assinatura das mudanças numa thread de fundo, com reconexão e backoff.
+
+    `ao_mudar(feed, registro)` é chamada a cada mudança, na thread do canal.
+    """
+
+    def __init__(self, ao_mudar, url=None, tela_id=None, apikey=None):
+        config = carregar_config_canal()
+        self.ao_mudar = ao_mudar
+        self.habilitado = config["ativo"]
+        self.url = url or config["url"] or (url_realtime(backend_local.obter_cliente()) if self.habilitado else None)
+        self.tela_id = config["tela_id"] if tela_id is None else tela_id
+        self.apikey = apikey or config["apikey"]
+        self.conexao = None
+        self.conectado = None  # em memória; o catálogo só é escrito quando isto muda
+        self.parar = threading.Event()
+        self.ref = 0
+
+    def _proxima_ref(self):
+        self.ref += 1
+        return str(self.ref)
+
+    def _enviar(self, topico, evento, payload):
+        self.conexao.send(json.dumps({"topic": topico, "event": evento, "payload": payload, "ref": self._proxima_ref()}))
+
+    def _mudancas_assinadas(self):
+        mudancas = []
+        for tabela in TABELAS:
+            mudanca = {"event": "*", "schema": "public", "table": tabela}
+            if tabela in TABELAS_POR_TELA:
+                mudanca["filter"] = f"cliente_id=eq.{self.tela_id}"
+            mudancas.append(mudanca)
+        return mudancas
+
+    def _marcar_conectado(self, conectado):
+        if conectado == self.conectado:
+            return
+        self.conectado = conectado
+        try:
+            catalogo.salvar_metadado("canal_push_pid", os.getpid() if conectado else 0)
+        except Exception as e:
+            print(f"⚠️ Falha ao registrar estado do canal push: {e}")
+
+    def _sessao(self):
+        """Uma conexão do início ao fim; retorna normalmente só quando `parar` é sinalizado."""
+        self.conexao = conectar(self.url)
+        payload = {"config": {"postgres_changes": self._mudancas_assinadas()}}
+        if self.apikey:
+            payload["access_token"] = self.apikey
+        self._enviar(TOPICO, "phx_join", payload)
+        ultimo_heartbeat = ultima_mensagem = time.monotonic()
+        while not self.parar.is_set():
+            if time.monotonic() - ultimo_heartbeat >= HEARTBEAT:
+                self._enviar("phoenix", "heartbeat", {})
+                ultimo_heartbeat = time.monotonic()
+            if time.monotonic() - ultima_mensagem > SILENCIO_MAX:
+                raise ConnectionError(f"nenhuma resposta do servidor em {SILENCIO_MAX}s")
+            try:
+                # Acorda a tempo do próximo heartbeat (e ao menos a cada segundo, para ver `parar`)
+                texto = self.conexao.recv(timeout=min(1, max(0.05, ultimo_heartbeat + HEARTBEAT - time.monotonic())))
+            except TimeoutError:
+                continue
+            ultima_mensagem = time.monotonic()
+            mensagem = json.loads(texto)
+            evento, payload = mensagem.get("event"), mensagem.get("payload") or {}
+            if evento == "phx_reply":
+                if payload.get("status") != "ok":
+                    raise ConnectionError(f"servidor recusou o canal: {payload.get('response')}")
+                if mensagem.get("topic") == TOPICO and not self.conectado:
+                    print("📡 Canal push conectado: mudanças do painel chegam na hora")
+                    self._marcar_conectado(True)
+            elif evento in ("phx_error", "phx_close"):
+                raise ConnectionError(f"canal encerrado pelo servidor ({evento})")
+            elif evento == "postgres_changes":
+                dados = payload.get("data") or {}
+                feed = TABELAS.get(dados.get("table"))
+                if feed:
+                    print(f"📨 Mudança em '{dados.get('table')}' avisada pelo canal push")
+                    try:
+                        self.ao_mudar(feed, dados.get("record") or {})
+                    except Exception as e:
+                        print(f"⚠️ Erro ao tratar mudança de '{feed}': {e}")
+
+    def _rodar(self):
+        falhas = 0
+        while not self.parar.is_set():
+            inicio = time.monotonic()
+            try:
+                self._sessao()
+            except Exception as e:
+                if self.conectado:
+                    print(f"📴 Canal push caiu ({e}); consultas periódicas voltam ao ritmo normal")
+            finally:
+                self._marcar_conectado(False)
+                if self.conexao:
+                    self.conexao.close()
+                    self.conexao = None
+            # Conexão que durou é queda pontual: recomeça o backoff
+            falhas = 1 if time.monotonic() - inicio > 2 * HEARTBEAT else falhas + 1
+            self.parar.wait(espera_reconexao(falhas))
+
+    def iniciar(self):
+        if not self.habilitado:
+            return None
+        if not self.url:
+            print("ℹ️ Canal push sem URL configurada; só consultas periódicas.")
+            return None
+        self._marcar_conectado(False)
+        thread = threading.Thread(target=self._rodar, name="canal-push", daemon=True)
+        thread.start()
+        return thread
+
+    def encerrar(self):
+        self.parar.set()
@@ -0,0 +1,400 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+CATALOGO_DB = os.path.join(CACHE_DIR, "catalogo.db")
+
+# Catálogo local de conteúdo em SQLite (modo WAL): manifestos, itens (assets), feeds,
+# versões, validadores HTTP, o índice de arquivos locais e a fila de downloads a repetir. Atualizadores escrevem em transações; widgets leem por
+# consultas indexadas em vez de reabrir e reinterpretar arquivos JSON inteiros.
+# Gravações são condicionadas ao conteúdo: dados idênticos aos já salvos não geram escrita
+# no disco nem incrementam a revisão (que é o que os widgets observam).
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS manifestos (
+    nome TEXT PRIMARY KEY,
+    versao TEXT,
+    dados TEXT NOT NULL,
+    revisao INTEGER NOT NULL DEFAULT 0,
+    atualizado_em REAL
+);
+CREATE TABLE IF NOT EXISTS assets (
+    manifesto TEXT NOT NULL,
+    categoria TEXT NOT NULL,
+    caminho TEXT NOT NULL,
+    subcategoria TEXT,
+    status TEXT,
+    data_ini TEXT,
+    data_fim TEXT,
+    posicao INTEGER,
+    PRIMARY KEY (manifesto, categoria, caminho)
+);
+CREATE INDEX IF NOT EXISTS idx_assets_categoria ON assets (categoria, subcategoria, status, posicao);
+CREATE INDEX IF NOT EXISTS idx_assets_vigencia ON assets (categoria, data_ini, data_fim);
+CREATE TABLE IF NOT EXISTS feeds (
+    nome TEXT PRIMARY KEY,
+    dados TEXT,
+    carimbo TEXT,
+    revisao INTEGER NOT NULL DEFAULT 0,
+    atualizado_em REAL
+);
+CREATE TABLE IF NOT EXISTS versoes (
+    nome TEXT PRIMARY KEY,
+    versao INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS validadores (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT
+);
+CREATE TABLE IF NOT EXISTS arquivos (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT,
+    dono TEXT
+);
+CREATE TABLE IF NOT EXISTS verificacoes (
+    caminho TEXT PRIMARY KEY,
+    tamanho INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    sha256 TEXT,
+    md5 TEXT,
+    etag TEXT,
+    referencia TEXT,
+    verificado_em REAL
+);
+CREATE TABLE IF NOT EXISTS reproducoes (
+    caminho TEXT PRIMARY KEY,
+    reproduzido_em REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS geracoes (
+    manifesto TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    diretorio TEXT NOT NULL,
+    assinatura TEXT NOT NULL,
+    publicada_em REAL NOT NULL,
+    substituida_em REAL,
+    PRIMARY KEY (manifesto, numero)
+);
+CREATE TABLE IF NOT EXISTS retentativas (
+    destino TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    opcoes TEXT NOT NULL,
+    prioridade TEXT NOT NULL,
+    tentativas INTEGER NOT NULL DEFAULT 0,
+    proxima_em REAL NOT NULL,
+    criada_em REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_retentativas_proxima ON retentativas (proxima_em);
+CREATE TABLE IF NOT EXISTS metadados (
+    chave TEXT PRIMARY KEY,
+    valor TEXT
+);
+"""
+
+# Colunas acrescentadas depois da criação das tabelas (bancos antigos recebem via ALTER TABLE)
+COLUNAS_NOVAS = {"manifestos": {"geracao": "TEXT"}}
+
+# Campo do item que aponta para o arquivo, por categoria do manifesto de clientes
+CAMPOS_ARQUIVO = {"Propagandas": "video", "Banners": "imagem", "CondominiumNotices": "mensagem"}
+
+# Listas de itens de cada manifesto e o campo que identifica o item (usado pelos manifestos delta)
+CHAVES_ITEM = {"clientes": CAMPOS_ARQUIVO, "entretenimento": {"entretenimento": "video"}}
+
+# Onde ficam os arquivos de cada manifesto antes da primeira geração publicada
+PASTAS_BASE = {"clientes": CACHE_DIR, "entretenimento": os.path.join(CACHE_DIR, "Entretenimento")}
+
+_local = threading.local()
+
+
+def conectar():
+    """Conexão da thread atual (SQLite não compartilha conexões entre threads)."""
+    conexao = getattr(_local, "conexao", None)
+    if conexao is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conexao = sqlite3.connect(CATALOGO_DB, timeout=10)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        with conexao:
+            conexao.executescript(ESQUEMA)
+            _adicionar_colunas(conexao)
+        _local.conexao = conexao
+        _migrar_json_legado(conexao)
+    return conexao
+
+
+def _adicionar_colunas(conexao):
+    for tabela, colunas in COLUNAS_NOVAS.items():
+        existentes = {linha["name"] for linha in conexao.execute(f"PRAGMA table_info({tabela})")}
+        for coluna, tipo in colunas.items():
+            if coluna not in existentes:
+                conexao.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} {tipo}")
+
+
+def _itens_do_manifesto(nome, dados):
+    if nome == "clientes":
+        for categoria, campo in CAMPOS_ARQUIVO.items():
+            for posicao, item in enumerate(dados.get(categoria, [])):
+                if item.get(campo):
+                    yield (nome, categoria, item[campo], None, item.get("status"),
+                           item.get("data_ini"), item.get("data_fim"), posicao)
+    elif nome == "entretenimento":
+        for posicao, item in enumerate(dados.get("entretenimento", [])):
+            if item.get("video"):
+                yield (nome, "Entretenimento", item["video"], item.get("categoria"), item.get("status"),
+                       None, None, posicao)
+
+
+def _serializar(dados):
+    # Forma canônica: o mesmo conteúdo sempre gera o mesmo texto, independente da ordem das chaves
+    return json.dumps(dados, ensure_ascii=False, sort_keys=True)
+
+
+# 📦 Manifestos
+
+def _gravar_manifesto(conexao, nome, dados, versao, geracao=None, forcar=False):
+    # Sem commit: quem chama decide a transação (ver publicar_geracao)
+    versao = None if versao is None else str(versao)
+    cursor = conexao.execute(
+        """INSERT INTO manifestos (nome, versao, dados, revisao, atualizado_em, geracao) VALUES (?, ?, ?, 1, ?, ?)
+           ON CONFLICT(nome) DO UPDATE SET versao = excluded.versao, dados = excluded.dados,
+           revisao = manifestos.revisao + 1, atualizado_em = excluded.atualizado_em,
+           geracao = COALESCE(excluded.geracao, manifestos.geracao)
+           WHERE ? OR manifestos.dados != excluded.dados OR manifestos.versao IS NOT excluded.versao""",
+        (nome, versao, _serializar(dados), time.time(), geracao, int(forcar)),
+    )
+    if not cursor.rowcount:
+        return False
+    conexao.execute("DELETE FROM assets WHERE manifesto = ?", (nome,))
+    conexao.executemany("INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _itens_do_manifesto(nome, dados))
+    return True
+
+
+def salvar_manifesto(nome, dados, versao=None):
+    """Grava o manifesto e seus itens. Retorna False (sem escrever nada) se o conteúdo não mudou."""
+    conexao = conectar()
+    with conexao:
+        return _gravar_manifesto(conexao, nome, dados, versao)
+
+
+def carregar_manifesto(nome):
+    linha = conectar().execute("SELECT dados FROM manifestos WHERE nome = ?", (nome,)).fetchone()
+    return json.loads(linha["dados"]) if linha else None
+
+
+def revisao_manifesto(nome):
+    """Contador que muda a cada gravação do manifesto — barato para os widgets detectarem mudanças."""
+    linha = conectar().execute("SELECT revisao FROM manifestos WHERE nome = ?", (nome,)).fetchone()
+    return linha["revisao"] if linha else 0
+
+
+# 🧬 Gerações de conteúdo
+
+def publicar_geracao(nome, dados, versao, numero, diretorio, assinatura):
+    """Troca atômica: manifesto, itens e ponteiro da geração mudam na mesma transação."""
+    conexao = conectar()
+    agora = time.time()
+    with conexao:
+        _gravar_manifesto(conexao, nome, dados, versao, geracao=diretorio, forcar=True)
+        conexao.execute("UPDATE geracoes SET substituida_em = ? WHERE manifesto = ? AND substituida_em IS NULL", (agora, nome))
+        conexao.execute("INSERT INTO geracoes VALUES (?, ?, ?, ?, ?, NULL)", (nome, numero, diretorio, assinatura, agora))
+
+
+def geracao_atual(nome):
+    linha = conectar().execute(
+        "SELECT * FROM geracoes WHERE manifesto = ? AND substituida_em IS NULL ORDER BY numero DESC LIMIT 1", (nome,)
+    ).fetchone()
+    return dict(linha) if linha else None
+
+
+def proximo_numero_geracao(nome):
+    linha = conectar().execute("SELECT MAX(numero) FROM geracoes WHERE manifesto = ?", (nome,)).fetchone()
+    return (linha[0] or 0) + 1
+
+
+def geracoes_substituidas(nome, antes_de):
+    linhas = conectar().execute(
+        "SELECT * FROM geracoes WHERE manifesto = ? AND substituida_em IS NOT NULL AND substituida_em < ?", (nome, antes_de)
+    ).fetchall()
+    return [dict(linha) for linha in linhas]
+
+
+def origem_na_geracao(caminho):
+    """'Geracoes/entretenimento/7/curiosidades/a.mp4' -> 'Entretenimento/curiosidades/a.mp4' (relativo ao cache)."""
+    partes = caminho.split("/")
+    if len(partes) < 4 or partes[0] != "Geracoes" or partes[1] not in PASTAS_BASE:
+        return caminho
+    base = os.path.relpath(PASTAS_BASE[partes[1]], CACHE_DIR).replace("\\", "/")
+    return "/".join(([] if base == "." else [base]) + partes[3:])
+
+
+def esquecer_geracao(nome, numero):
+    conexao = conectar()
+    with conexao:
+        conexao.execute("DELETE FROM geracoes WHERE manifesto = ? AND numero = ?", (nome, numero))
+
+
+# 🔎 Consultas indexadas
+# Uma única consulta traz itens e geração juntos, então o resultado sempre pertence a uma só
+# geração publicada: os caminhos retornados são absolutos, dentro do diretório dessa geração.
+
+def _resolver(linhas):
+    caminhos = []
+    for linha in linhas:
+        base = os.path.join(CACHE_DIR, linha["geracao"]) if linha["geracao"] else PASTAS_BASE[linha["manifesto"]]
+        caminhos.append(os.path.join(base, *linha["caminho"].split("/")))
+    return caminhos
+
+
+def avisos_vigentes(hoje):
+    """Arquivos dos avisos vigentes em `hoje` (date), na ordem do manifesto."""
+    data = hoje.isoformat()
+    linhas = conectar().execute(
+        """SELECT a.manifesto, a.caminho, m.geracao FROM assets a JOIN manifestos m ON m.nome = a.manifesto
+           WHERE a.categoria = 'CondominiumNotices' AND COALESCE(a.status, '') != 'deleted'
+             AND a.data_ini <= ? AND a.data_fim >= ?
+           ORDER BY a.posicao""",
+        (data, data),
+    ).fetchall()
+    return _resolver(linhas)
+
+
+def banners_ativos():
+    linhas = conectar().execute(
+        """SELECT a.manifesto, a.caminho, m.geracao FROM assets a JOIN manifestos m ON m.nome = a.manifesto
+           WHERE a.categoria = 'Banners' AND COALESCE(a.status, '') != 'deleted'
+           ORDER BY a.posicao""",
+    ).fetchall()
+    return _resolver(linhas)
+
+
+def videos_por_categoria(categoria, subcategoria=None):
+    """Vídeos ativos de 'Propagandas' ou 'Entretenimento' (opcionalmente filtrados por subcategoria)."""
+    sql = """SELECT a.manifesto, a.caminho, m.geracao FROM assets a JOIN manifestos m ON m.nome = a.manifesto
+             WHERE a.categoria = ? AND COALESCE(a.status, '') != 'deleted'"""
+    parametros = [categoria]
+    if subcategoria is not None:
+        sql += " AND a.subcategoria = ?"
+        parametros.append(subcategoria)
+    linhas = conectar().execute(sql + " ORDER BY a.posicao", parametros).fetchall()
+    return _resolver(linhas)
+
+
+# 📰 Feeds (notícias, lives, cotação, clima)
+
+def salvar_feed(nome, dados, carimbo=None):
+    """Grava o feed. Retorna False (sem escrever nada) se dados e carimbo não mudaram."""
+    conexao = conectar()
+    with conexao:
+        cursor = conexao.execute(
+            """INSERT INTO feeds (nome, dados, carimbo, revisao, atualizado_em) VALUES (?, ?, ?, 1, ?)
+               ON CONFLICT(nome) DO UPDATE SET dados = excluded.dados, carimbo = excluded.carimbo,
+               revisao = feeds.revisao + 1, atualizado_em = excluded.atualizado_em
+               WHERE feeds.dados IS NOT excluded.dados OR feeds.carimbo IS NOT excluded.carimbo""",
+            (nome, _serializar(dados), carimbo, time.time()),
+        )
+    return cursor.rowcount > 0
+
+
+def carregar_feed(nome):
+    """Retorna (dados, carimbo) ou (None, None)."""
+    linha = conectar().execute("SELECT dados, carimbo FROM feeds WHERE nome = ?", (nome,)).fetchone()
+    if not linha:
+        return None, None
+    return json.loads(linha["dados"]), linha["carimbo"]
+
+
+# 🔢 Versões
+
+def carregar_versao(nome, padrao=0):
+    linha = conectar().execute("SELECT versao FROM versoes WHERE nome = ?", (nome,)).fetchone()
+    return linha["versao"] if linha else padrao
+
+
+def salvar_versao(nome, versao):
+    conexao = conectar()
+    with conexao:
+        conexao.execute(
+            """INSERT INTO versoes (nome, versao) VALUES (?, ?)
+               ON CONFLICT(nome) DO UPDATE SET versao = excluded.versao WHERE versoes.versao != excluded.versao""",
+            (nome, versao),
+        )
+
+
+# 🏷️ Validadores HTTP
+
+def obter_validador(url):
+    linha = conectar().execute("SELECT etag, last_modified FROM validadores WHERE url = ?", (url,)).fetchone()
+    return dict(linha) if linha else {}
+
+
+def salvar_validador(url, etag, last_modified):
+    conexao = conectar()
+    with conexao:
+        conexao.execute("INSERT OR REPLACE INTO validadores (url, etag, last_modified) VALUES (?, ?, ?)",
+                        (url, etag, last_modified))
+
+
+def remover_validador(url):
+    conexao = conectar()
+    with conexao:
+        conexao.execute("DELETE FROM validadores WHERE url = ?", (url,))
+
+
+# 🗒️ Metadados internos (ex.: horário da última varredura de arquivos)
+
+def obter_metadado(chave, padrao=None):
+    linha = conectar().execute("SELECT valor FROM metadados WHERE chave = ?", (chave,)).fetchone()
+    return linha["valor"] if linha else padrao
+
+
+def salvar_metadado(chave, valor):
+    conexao = conectar()
+    with conexao:
+        conexao.execute("INSERT OR REPLACE INTO metadados (chave, valor) VALUES (?, ?)", (chave, str(valor)))
+
+
+# 🚚 Migração dos arquivos JSON antigos do cache
+
+def _ler_json(nome_arquivo):
+    caminho = os.path.join(CACHE_DIR, nome_arquivo)
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return None
+
+
+def _migrar_json_legado(conexao):
+    if conexao.execute("SELECT 1 FROM manifestos UNION ALL SELECT 1 FROM feeds LIMIT 1").fetchone():
+        return
+
+    legados = {
+        "update.json": lambda d: salvar_manifesto("clientes", d),
+        "entretenimento_update.json": lambda d: salvar_manifesto("entretenimento", d),
+        "noticias.json": lambda d: salvar_feed("noticias", d.get("noticias"), d.get("atualizado_em")),
+        "live.json": lambda d: salvar_feed("lives", d.get("lives", []), d.get("data_criacao")),
+        "cotacao.json": lambda d: salvar_feed("cotacao", d.get("cotacao"), d.get("atualizado_em")),
+        "clima_cache.json": lambda d: salvar_feed("clima", d),
+        "versao_entretenimento.json": lambda d: salvar_versao("entretenimento", d.get("versao", 0)),
+        "versao_software.json": lambda d: salvar_versao("software", d.get("versao", 1)),
+        "validadores.json": lambda d: [salvar_validador(url, v.get("etag"), v.get("last_modified")) for url, v in d.items()],
+    }
+    for nome_arquivo, importar in legados.items():
+        dados = _ler_json(nome_arquivo)
+        if dados is None:
+            continue
+        try:
+            importar(dados)
+            os.remove(os.path.join(CACHE_DIR, nome_arquivo))
+            print(f"🚚 {nome_arquivo} migrado para o catálogo SQLite")
+        except Exception as e:
+            print(f"⚠️ Falha ao migrar {nome_arquivo}: {e}")
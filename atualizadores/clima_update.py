@@ -0,0 +1,37 @@
+import traceback
+from atualizadores import validadores, catalogo, pacote_sync
+
+CLIMA_URL = "http://15.228.8.3:8000/api/clima"  # substitua pelo IP se necessário
+
+
+def carregar_clima_local():
+    try:
+        dados, _ = catalogo.carregar_feed("clima")
+        return dados
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar clima local: {e}")
+        return None
+
+
+def atualizar_clima():
+    # 📦 O pacote de sincronização recente já trouxe o clima: nenhuma consulta extra
+    if pacote_sync.recente("clima") and carregar_clima_local() is not None:
+        return True
+    try:
+        print("🔄 Buscando clima da API...")
+        response = validadores.get_condicional(CLIMA_URL, possui_copia_local=carregar_clima_local() is not None, timeout=10)
+        if response.status_code == 304:
+            print("✅ Clima sem alterações (304), mantendo cache local.")
+            return True
+        response.raise_for_status()
+        dados = response.json()
+
+        catalogo.salvar_feed("clima", dados)
+
+        print("✅ Clima atualizado com sucesso.")
+        return True
+    except Exception as e:
+        print("⚠️ Erro ao buscar clima da API:", e)
+        traceback.print_exc()
+        print("🟡 Usando previsão local com base na hora atual.")
+        return False
@@ -0,0 +1,181 @@
+import os
+import json
+import shutil
+import threading
+from atualizadores import armazem, catalogo, indice, geracoes
+
+BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+CONFIG_PATH = "config.json"
+
+# Cota de disco do cache: antes de cada download verifica orçamento e espaço livre e, se faltar,
+# libera arquivos pelo critério LRU (última exibição registrada pelo VideoWidget, ou mtime).
+# Itens do manifesto do cliente e imagens das notícias atuais nunca são removidos; vídeos de
+# entretenimento só dão lugar a conteúdo obrigatório, nunca a outro vídeo de entretenimento.
+# Os arquivos são hard links (armazém, gerações publicadas): apagar a cópia da categoria só libera
+# disco quando nenhum outro link sobra, então gerações substituídas saem primeiro e um arquivo cujo
+# conteúdo ainda é usado por outro caminho nem é removido.
+
+# Valores padrão — podem ser sobrescritos pela chave "cota" do config.json
+LIMITE_BYTES = 12 * 1024 ** 3        # orçamento total do conteúdo baixado
+RESERVA_LIVRE_BYTES = 1024 ** 3      # espaço que sempre deve sobrar na partição
+
+_lock = threading.Lock()
+_reservas = {}  # destino -> bytes reservados por downloads em andamento
+
+
+def carregar_config_cota():
+    config = {"limite_bytes": LIMITE_BYTES, "reserva_livre_bytes": RESERVA_LIVRE_BYTES}
+    if not os.path.exists(CONFIG_PATH):
+        return config
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            config.update(json.load(file).get("cota", {}))
+    except:
+        pass
+    return config
+
+
+def _protegidos():
+    """(fixados, entretenimento): caminhos referenciados pelos manifestos e feeds atuais."""
+    conexao = catalogo.conectar()
+    fixados, entretenimento = set(), set()
+    for linha in conexao.execute("SELECT manifesto, caminho FROM assets WHERE COALESCE(status, '') != 'deleted'"):
+        if linha["manifesto"] == "entretenimento":
+            entretenimento.add(indice.normalizar(os.path.join("Entretenimento", linha["caminho"])))
+        else:
+            fixados.add(indice.normalizar(linha["caminho"]))
+    noticias, _ = catalogo.carregar_feed("noticias")
+    for lista in (noticias or {}).values():
+        for noticia in lista:
+            if noticia.get("imagem"):
+                fixados.add(indice.normalizar(os.path.join("News", noticia["imagem"])))
+    return fixados, entretenimento
+
+
+def _candidatos(permitir_entretenimento):
+    """Arquivos removíveis: primeiro os sem referência, depois (se permitido) entretenimento, do menos exibido ao mais."""
+    fixados, entretenimento = _protegidos()
+    em_download = {indice.normalizar(destino) for destino in _reservas}
+    linhas = catalogo.conectar().execute(
+        """SELECT a.caminho, a.tamanho, COALESCE(r.reproduzido_em, a.mtime) AS uso
+           FROM arquivos a LEFT JOIN reproducoes r ON r.caminho = a.caminho
+           ORDER BY uso"""
+    ).fetchall()
+
+    sem_referencia, lru = [], []
+    for linha in linhas:
+        caminho = linha["caminho"]
+        final = caminho
+        for sufixo in (".part.json", ".part"):
+            if final.endswith(sufixo):
+                final = final[:-len(sufixo)]
+        if final in fixados or final in em_download:
+            continue
+        if final in entretenimento:
+            if permitir_entretenimento and caminho == final:
+                lru.append((caminho, linha["tamanho"]))
+        else:
+            sem_referencia.append((caminho, linha["tamanho"]))
+    return sem_referencia + lru
+
+
+def _faltas(necessario, config, destino):
+    """(acima da cota, falta na partição) em bytes para caber `necessario`, sem contar as reservas de `destino`."""
+    pendente = sum(bytes_ for outro, bytes_ in _reservas.items() if outro != destino) + necessario
+    acima_da_cota = indice.uso_total() + pendente - config["limite_bytes"]
+    livre = shutil.disk_usage(CACHE_DIR).free - pendente
+    return max(acima_da_cota, 0), max(config["reserva_livre_bytes"] - livre, 0)
+
+
+def _inodes(diretorio):
+    """(dispositivo, inode) -> caminhos dos arquivos em `diretorio`."""
+    inodes = {}
+    for root, _, files in os.walk(diretorio):
+        for file in files:
+            caminho = os.path.join(root, file)
+            try:
+                stat = os.stat(caminho)
+            except OSError:
+                continue
+            inodes.setdefault((stat.st_dev, stat.st_ino), []).append(caminho)
+    return inodes
+
+
+def _descartar_geracoes_substituidas():
+    """Sob falta de espaço, gerações substituídas não esperam a RETENCAO: seus links prendem o disco."""
+    for linha in catalogo.conectar().execute("SELECT DISTINCT manifesto FROM geracoes").fetchall():
+        geracoes.coletar_geracoes(linha["manifesto"], retencao=0)
+
+
+def liberar_espaco(bytes_cota, bytes_disco=0, permitir_entretenimento=True):
+    """Remove arquivos pelo critério LRU até baixar `bytes_cota` do uso indexado (o orçamento) e liberar
+    `bytes_disco` na partição. Retorna os bytes liberados, medidos na partição.
+
+    Os dois alvos são contados à parte: gerações substituídas só liberam disco (não estão no índice), e um
+    arquivo cujo conteúdo ainda tem outro link só baixa o uso indexado.
+    """
+    livre_antes = shutil.disk_usage(CACHE_DIR).free
+    if bytes_disco > 0:
+        _descartar_geracoes_substituidas()
+        bytes_disco -= shutil.disk_usage(CACHE_DIR).free - livre_antes
+    em_geracoes = _inodes(geracoes.GERACOES_DIR)
+    no_armazem = _inodes(armazem.ARMAZEM_DIR)
+
+    removidos = 0
+    for caminho, _ in _candidatos(permitir_entretenimento):
+        if bytes_cota <= 0 and bytes_disco <= 0:
+            break
+        caminho_absoluto = indice.absoluto(caminho)
+        try:
+            stat = os.stat(caminho_absoluto)
+        except OSError:
+            indice.remover(caminho)
+            continue
+        inode = (stat.st_dev, stat.st_ino)
+        links_geracao = em_geracoes.get(inode, [])
+        # Links que sobram além da categoria, das gerações e do objeto do armazém (coletado no fim)
+        libera_disco = stat.st_nlink - 1 - len(links_geracao) - (1 if inode in no_armazem else 0) <= 0
+        if not libera_disco and bytes_cota <= 0:
+            continue  # o conteúdo continua em uso por outro caminho: removê-lo não libera disco
+        try:
+            if libera_disco:
+                for link in links_geracao:
+                    os.remove(link)
+            os.remove(caminho_absoluto)
+            indice.remover(caminho)
+            bytes_cota -= stat.st_size
+            if libera_disco:
+                bytes_disco -= stat.st_size
+            removidos += 1
+            print(f"🧹 Cota de disco: removido {caminho} ({stat.st_size / 1024 ** 2:.1f} MB)")
+        except OSError as e:
+            print(f"⚠️ Falha ao liberar {caminho}: {e}")
+    if removidos:
+        armazem.coletar_lixo()
+    return max(shutil.disk_usage(CACHE_DIR).free - livre_antes, 0)
+
+
+def garantir_espaco(necessario, destino):
+    """Reserva `necessario` bytes para o download de `destino`, liberando espaço se preciso.
+
+    Retorna False se nem removendo os candidatos o download cabe no orçamento.
+    """
+    config = carregar_config_cota()
+    entretenimento = indice.normalizar(destino).startswith("Entretenimento/")
+    with _lock:
+        acima_da_cota, falta_disco = _faltas(necessario, config, destino)
+        if acima_da_cota or falta_disco:
+            liberar_espaco(acima_da_cota, falta_disco, permitir_entretenimento=not entretenimento)
+            acima_da_cota, falta_disco = _faltas(necessario, config, destino)
+        excesso = max(acima_da_cota, falta_disco)
+        if excesso > 0:
+            print(f"💾 Sem espaço para {os.path.basename(destino)}: faltam {excesso / 1024 ** 2:.1f} MB na cota")
+            return False
+        _reservas[destino] = necessario
+        return True
+
+
+def liberar_reserva(destino):
+    with _lock:
+        _reservas.pop(destino, None)
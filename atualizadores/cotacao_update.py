@@ -0,0 +1,68 @@
+import json
+from atualizadores import catalogo, backend_local, pacote_sync
+
+supabase = backend_local.obter_cliente()
+
+def obter_cotacao_supabase():
+    if supabase is None:
+        print("⚠️ Supabase não disponível. Pulando atualização de notícias.")
+        return None, None
+
+    try:
+        response = supabase.table("cotacoes").select("valor, atualizado_em").eq("tipo", "cotacao").execute()
+        if response.data:
+            cotacao_data = response.data[0]
+            return cotacao_data["valor"], cotacao_data["atualizado_em"]  # Retorna os valores
+        print("⚠️ Nenhuma cotação encontrada no Supabase.")
+        return None, None
+
+    except Exception as e:
+        print(f"❌ Erro ao buscar cotação no Supabase: {e}")
+        return None, None
+
+
+def salvar_cotacao_localmente(cotacao, atualizado_em):
+    """Salva a cotação no catálogo local."""
+    try:
+        catalogo.salvar_feed("cotacao", cotacao, atualizado_em)
+    except Exception as e:
+        print(f"❌ Erro ao salvar cotação localmente: {e}")
+
+
+def carregar_cotacao_local():
+    """Carrega a cotação do catálogo local e garante que está em formato de dicionário"""
+    try:
+        cotacao, atualizado_em = catalogo.carregar_feed("cotacao")
+
+        # 🚀 Verifica se o campo "cotacao" está salvo como string e converte para dicionário
+        if isinstance(cotacao, str):
+            cotacao = json.loads(cotacao)
+
+        return cotacao, atualizado_em
+
+    except Exception as e:
+        print(f"❌ Erro ao carregar cotação local: {e}")
+        return None, None
+
+def verificar_e_atualizar_cotacao(usar_pacote=True):
+
+    # 🔥 Busca timestamp da cotação salva localmente
+    cotacao_local, timestamp_local = carregar_cotacao_local()
+
+    # 📦 O pacote de sincronização recente já trouxe a cotação: nenhuma consulta extra
+    if usar_pacote and cotacao_local and pacote_sync.recente("cotacao"):
+        return cotacao_local
+
+    # 🔥 Busca do Supabase
+    cotacao_supabase, timestamp_supabase = obter_cotacao_supabase()
+
+    # Se não houver cotação no Supabase, manter o que já existe localmente
+    if not cotacao_supabase:
+        return cotacao_local
+
+    # Se os timestamps forem diferentes, atualiza o catálogo local
+    if timestamp_supabase != timestamp_local:
+        print(f"🔄 Atualização detectada! Novo timestamp: {timestamp_supabase}")
+        salvar_cotacao_localmente(cotacao_supabase, timestamp_supabase)
+        return cotacao_supabase  # Retorna a nova cotação
+    return cotacao_local  # Retorna a cotação já salva
@@ -0,0 +1,512 @@
+import os
+import json
+import time
+import queue
+import itertools
+import threading
+from concurrent.futures import Future
+from urllib.parse import urlparse
+from atualizadores import armazem, http_cliente, governador, indice, cota, verificacao, retentativas
+from atualizadores.prioridade import PRIORIDADE_PADRAO
+
+CONFIG_PATH = "config.json"
+
+# Valores padrão — podem ser sobrescritos pela chave "downloads" do config.json
+MAX_WORKERS = 4
+MAX_POR_HOST = 2
+LIMITE_BYTES_SEG = 0  # 0 = sem limite
+TAMANHO_CHUNK = 1024 * 256
+SUFIXO_PARCIAL = ".part"
+SUFIXO_SEGMENTOS = ".part.json"
+SEGMENTOS = 4
+LIMIAR_SEGMENTADO = 32 * 1024 * 1024  # Arquivos maiores que isso são baixados em paralelo por faixas
+
+# Motivos de falha de um download: decidem se ele entra na fila de retentativas
+FALHA_REDE = "rede"            # conexão, status retentável ou download incompleto
+FALHA_STATUS = "status"        # status HTTP definitivo (404, 403...)
+FALHA_COTA = "cota"            # sem espaço na cota: não adianta repetir até algo ser liberado
+FALHA_CHECKSUM = "checksum"    # SHA-256 diferente do manifesto: repetir raramente muda o resultado
+FALHA_INVALIDO = "invalido"    # tamanho divergente ou recusado pelo validador
+RETENTATIVAS_CHECKSUM = 2      # teto de tentativas na fila para checksum divergente
+
+
+def carregar_config_downloads():
+    config = {
+        "max_workers": MAX_WORKERS,
+        "max_por_host": MAX_POR_HOST,
+        "limite_bytes_seg": LIMITE_BYTES_SEG,
+        "segmentos": SEGMENTOS,
+        "limiar_segmentado": LIMIAR_SEGMENTADO,
+    }
+    if not os.path.exists(CONFIG_PATH):
+        return config
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            config.update(json.load(file).get("downloads", {}))
+    except:
+        pass
+    return config
+
+
+class LimitadorBanda:
+    """Token bucket global: limita os bytes/s somados de todos os downloads."""
+
+    def __init__(self, bytes_por_seg):
+        self.limite_configurado = bytes_por_seg
+        self.bytes_por_seg = bytes_por_seg
+        self.tokens = float(bytes_por_seg)
+        self.ultimo = time.monotonic()
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+
+    def ajustar(self, bytes_por_seg):
+        """Define o limite efetivo (0 = sem limite), sem ultrapassar o teto configurado."""
+        if self.limite_configurado:
+            bytes_por_seg = min(bytes_por_seg or self.limite_configurado, self.limite_configurado)
+        with self.lock:
+            if bytes_por_seg and not self.bytes_por_seg:
+                self.tokens = float(bytes_por_seg)
+            self.bytes_por_seg = int(bytes_por_seg)
+            self.tokens = min(self.tokens, self.bytes_por_seg)
+
+    def consumir(self, n):
+        with self.lock:
+            self.total_bytes += n
+        while True:
+            with self.lock:
+                if not self.bytes_por_seg:
+                    return
+                agora = time.monotonic()
+                self.tokens = min(self.bytes_por_seg, self.tokens + (agora - self.ultimo) * self.bytes_por_seg)
+                self.ultimo = agora
+                if self.tokens >= n or self.tokens >= self.bytes_por_seg:
+                    self.tokens -= n
+                    return
+                espera = (n - self.tokens) / self.bytes_por_seg
+            time.sleep(min(espera, 1))
+
+
+class PoolDownloads:
+    """Pool de workers compartilhado por todos os atualizadores."""
+
+    def __init__(self, max_workers=MAX_WORKERS, max_por_host=MAX_POR_HOST, limite_bytes_seg=LIMITE_BYTES_SEG,
+                 segmentos=SEGMENTOS, limiar_segmentado=LIMIAR_SEGMENTADO):
+        self.max_workers = max(1, int(max_workers))
+        self.max_por_host = max(1, int(max_por_host))
+        self.limitador = LimitadorBanda(int(limite_bytes_seg or 0))
+        self.segmentos = max(1, int(segmentos))
+        self.limiar_segmentado = int(limiar_segmentado)
+        self.fila = queue.PriorityQueue()
+        self.sequencia = itertools.count()
+        self.lock = threading.Lock()
+        self.ativos_por_host = {}
+        self.aguardando_host = {}
+        self.em_andamento = {}  # destino -> Future (o mesmo arquivo nunca é baixado duas vezes ao mesmo tempo)
+        self.workers = []
+
+    def _iniciar_workers(self):
+        with self.lock:
+            if self.workers:
+                return
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._loop_worker, name=f"download-{i}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+
+    def enviar(self, url, destino, prioridade=PRIORIDADE_PADRAO, **opcoes):
+        """Agenda um download e retorna um Future com o resultado (True/False).
+
+        A fila é global: entre todos os atualizadores, a menor prioridade sai primeiro.
+        Se o mesmo destino já está na fila (ex.: ciclo normal e fila de retentativas), reaproveita o Future.
+        """
+        self._iniciar_workers()
+        with self.lock:
+            if destino in self.em_andamento:
+                return self.em_andamento[destino]
+            futuro = Future()
+            self.em_andamento[destino] = futuro
+        tarefa = {"url": url, "destino": destino, "opcoes": opcoes, "futuro": futuro}
+        self.fila.put((prioridade, next(self.sequencia), tarefa))
+        return futuro
+
+    def baixar_em_lote(self, tarefas, callback=None):
+        """Baixa uma lista de (url, destino[, opcoes]) em paralelo e aguarda o fim.
+
+        O callback é chamado uma vez por arquivo baixado com sucesso.
+        """
+        futuros = []
+        for tarefa in tarefas:
+            url, destino = tarefa[0], tarefa[1]
+            opcoes = tarefa[2] if len(tarefa) > 2 else {}
+            futuro = self.enviar(url, destino, **opcoes)
+            if callback:
+                futuro.add_done_callback(lambda f: f.result() and callback())
+            futuros.append(futuro)
+        return [futuro.result() for futuro in futuros]
+
+    def _loop_worker(self):
+        while True:
+            prioridade, seq, tarefa = self.fila.get()
+            host = urlparse(tarefa["url"]).netloc
+
+            # 🚦 Respeita o limite por host: se lotado, a tarefa espera a liberação de uma vaga
+            with self.lock:
+                if self.ativos_por_host.get(host, 0) >= self.max_por_host:
+                    self.aguardando_host.setdefault(host, []).append((prioridade, seq, tarefa))
+                    continue
+                self.ativos_por_host[host] = self.ativos_por_host.get(host, 0) + 1
+
+            resultado, falha = False, FALHA_REDE
+            try:
+                opcoes = dict(tarefa["opcoes"])
+                dono = opcoes.pop("dono", None)
+                resultado, falha = self._baixar(tarefa["url"], tarefa["destino"], **opcoes)
+                if resultado:
+                    # 🗂️ Mantém o índice de arquivos em dia sem precisar varrer o disco depois
+                    indice.registrar(tarefa["destino"], dono=dono)
+            except Exception as e:
+                print(f"❌ Erro inesperado ao baixar {tarefa['url']}: {e}")
+            finally:
+                cota.liberar_reserva(tarefa["destino"])
+                # 🔁 Falhou: entra na fila persistente com backoff próprio, sem esperar o próximo ciclo
+                try:
+                    if resultado or falha == FALHA_COTA:
+                        # Recusa da cota só se resolve quando sobrar espaço: fica para o próximo ciclo
+                        retentativas.resolver(tarefa["destino"])
+                    elif falha == FALHA_CHECKSUM:
+                        retentativas.registrar_falha(tarefa["url"], tarefa["destino"], tarefa["opcoes"], prioridade,
+                                                     limite=RETENTATIVAS_CHECKSUM)
+                    else:
+                        retentativas.registrar_falha(tarefa["url"], tarefa["destino"], tarefa["opcoes"], prioridade)
+                except Exception as e:
+                    print(f"⚠️ Falha ao atualizar a fila de retentativas: {e}")
+                with self.lock:
+                    self.em_andamento.pop(tarefa["destino"], None)
+                tarefa["futuro"].set_result(resultado)
+                self._liberar_vagas(host)
+
+    def _reservar_vagas(self, host, quantidade):
+        """Pega até `quantidade` vagas extras do host sem esperar (faixas do download segmentado)."""
+        with self.lock:
+            livres = max(0, self.max_por_host - self.ativos_por_host.get(host, 0))
+            obtidas = min(livres, quantidade)
+            self.ativos_por_host[host] = self.ativos_por_host.get(host, 0) + obtidas
+            return obtidas
+
+    def _liberar_vagas(self, host, quantidade=1):
+        with self.lock:
+            self.ativos_por_host[host] -= quantidade
+            pendentes = self.aguardando_host.get(host)
+            for _ in range(quantidade):
+                if not pendentes:
+                    break
+                pendentes.sort(key=lambda item: item[:2])
+                self.fila.put(pendentes.pop(0))
+
+    def _baixar(self, url, destino, tentativas=3, timeout=20, validar=None, tamanho=None, sha256=None, armazenar=True):
+        """Baixa para `<destino>.part`, retomando com Range, e só renomeia quando o arquivo está íntegro.
+
+        Retorna (True, None) ou (False, motivo), com o motivo entre as constantes FALHA_*.
+        """
+        parte = destino + SUFIXO_PARCIAL
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+        respostas_head = []
+
+        def sondar():
+            # 📡 No máximo um HEAD por download, compartilhado pelo armazém (ETag) e pelo modo segmentado
+            if not respostas_head:
+                respostas_head.append(http_cliente.head(url, timeout=timeout))
+            return respostas_head[0]
+
+        etag = None
+        if armazenar and not os.path.exists(parte):
+            try:
+                reaproveitado, etag = self._reaproveitar(url, destino, sha256, tamanho, sondar)
+                if reaproveitado:
+                    return True, None
+            except Exception as e:
+                print(f"⚠️ Falha ao consultar o armazém para {url}: {e}")
+
+        falha = FALHA_REDE
+        for tentativa in range(1, tentativas + 1):
+            try:
+                segmentado = self._baixar_segmentado(url, destino, timeout, tamanho, sha256, validar, armazenar, etag, sondar)
+                if segmentado is not None:
+                    ok, falha = segmentado
+                    if ok or falha in (FALHA_COTA, FALHA_CHECKSUM):
+                        return segmentado
+                    time.sleep(http_cliente.espera_backoff(tentativa))
+                    continue
+
+                offset = os.path.getsize(parte) if os.path.exists(parte) else 0
+                headers = {"Range": f"bytes={offset}-"} if offset else {}
+                response = http_cliente.get(url, stream=True, timeout=timeout, headers=headers, tentativas=1)
+
+                if response.status_code == 416:
+                    # O .part já tem todos os bytes (ou está maior que o remoto): valida ou recomeça
+                    total = _total_content_range(response.headers.get("Content-Range"))
+                    if total is not None and offset == total:
+                        falha = self._finalizar(parte, destino, total, sha256, validar, armazenar, etag)
+                        if falha is None:
+                            return True, None
+                        if falha == FALHA_CHECKSUM:
+                            _remover(parte)
+                            return False, falha
+                    _remover(parte)
+                    continue
+
+                if response.status_code not in (200, 206):
+                    print(f"⚠️ Erro ao baixar {url}: Status {response.status_code}")
+                    # 429/408/5xx passam: espera o Retry-After do servidor (ou o backoff) e tenta de novo
+                    if response.status_code not in http_cliente.STATUS_RETENTAVEIS:
+                        return False, FALHA_STATUS
+                    falha = FALHA_REDE
+                    response.close()
+                    time.sleep(http_cliente.espera_resposta(response, tentativa))
+                    continue
+
+                if response.status_code == 206:
+                    total = _total_content_range(response.headers.get("Content-Range"))
+                    modo = "ab"
+                else:
+                    # Servidor ignorou o Range: recomeça do zero
+                    total = int(response.headers["Content-Length"]) if "Content-Length" in response.headers else None
+                    modo = "wb"
+                    if offset:
+                        print(f"⚠️ Servidor não suporta retomada, reiniciando: {url}")
+
+                total = tamanho or total
+                etag = response.headers.get("ETag", etag)
+                # 💾 Só grava se o restante do arquivo cabe na cota de disco
+                if total is not None and not cota.garantir_espaco(total - (offset if modo == "ab" else 0), destino):
+                    response.close()
+                    return False, FALHA_COTA
+                if offset and modo == "ab":
+                    print(f"⏯️ Retomando {os.path.basename(destino)} a partir de {offset} bytes")
+
+                with open(parte, modo) as file:
+                    for chunk in response.iter_content(TAMANHO_CHUNK):
+                        self.limitador.consumir(len(chunk))
+                        http_cliente.registrar_bytes(url, len(chunk))
+                        file.write(chunk)
+
+                if total is not None and os.path.getsize(parte) < total:
+                    print(f"⚠️ Download incompleto ({tentativa}/{tentativas}) {url}, será retomado")
+                    falha = FALHA_REDE
+                    time.sleep(http_cliente.espera_backoff(tentativa))
+                    continue
+
+                falha = self._finalizar(parte, destino, total, sha256, validar, armazenar, etag)
+                if falha is None:
+                    return True, None
+                _remover(parte)
+                if falha == FALHA_CHECKSUM:
+                    # O mesmo conteúdo voltaria com o mesmo hash: não baixa de novo nesta rodada
+                    return False, falha
+            except Exception as e:
+                print(f"⚠️ Falha no download ({tentativa}/{tentativas}) {url}: {e}")
+                falha = FALHA_REDE
+                time.sleep(http_cliente.espera_backoff(tentativa))
+        return False, falha
+
+    def _reaproveitar(self, url, destino, sha256, tamanho, sondar):
+        """Tenta materializar o arquivo a partir do armazém local antes de baixá-lo.
+
+        Usa o SHA-256 do manifesto quando conhecido; senão, o ETag do HEAD (`sondar`). Arquivos
+        que cabem num chunk não são sondados: o HEAD custaria quase o mesmo que baixá-los.
+        """
+        if armazem.vincular(sha256, destino):
+            indice.registrar(destino, sha256=sha256)
+            return True, None
+        if sha256 or (tamanho and tamanho <= TAMANHO_CHUNK):
+            return False, None
+        head = sondar()
+        etag = head.headers.get("ETag") if head.status_code == 200 else None
+        sha_etag = armazem.sha_por_etag(etag)
+        if armazem.vincular(sha_etag, destino):
+            indice.registrar(destino, sha256=sha_etag)
+            return True, etag
+        return False, etag
+
+    def _baixar_segmentado(self, url, destino, timeout, tamanho, sha256, validar, armazenar=True, etag=None, sondar=None):
+        """Baixa arquivos grandes em N faixas paralelas dentro de um .part pré-alocado.
+
+        Retorna None quando o modo segmentado não se aplica (arquivo pequeno ou sem tamanho no
+        manifesto, servidor sem suporte a Range ou download sequencial já em andamento), senão
+        (True, None) ou (False, motivo). As faixas dividem as vagas do host com os demais downloads.
+        """
+        parte = destino + SUFIXO_PARCIAL
+        estado_path = destino + SUFIXO_SEGMENTOS
+        estado = _carregar_estado_segmentos(estado_path)
+        head_etag = None
+
+        if estado is None:
+            # Só sonda o servidor (HEAD) quando o manifesto já diz que o arquivo é grande
+            if self.segmentos < 2 or os.path.exists(parte) or not tamanho or tamanho < self.limiar_segmentado:
+                return None
+            head = sondar() if sondar else http_cliente.head(url, timeout=timeout)
+            total = tamanho
+            if head.status_code != 200 or head.headers.get("Accept-Ranges") != "bytes":
+                return None
+            head_etag = head.headers.get("ETag")
+            if not cota.garantir_espaco(total, destino):
+                return False, FALHA_COTA
+
+            tamanho_faixa = -(-total // self.segmentos)
+            estado = {
+                "total": total,
+                "faixas": [[inicio, min(inicio + tamanho_faixa, total) - 1, 0] for inicio in range(0, total, tamanho_faixa)],
+            }
+            with open(parte, "wb") as file:
+                file.truncate(total)  # 📦 Pré-aloca o arquivo inteiro
+            _salvar_estado_segmentos(estado_path, estado)
+            print(f"🧩 Download segmentado ({len(estado['faixas'])} faixas): {os.path.basename(destino)}")
+        elif not os.path.exists(parte):
+            _remover(estado_path)
+            return None
+        else:
+            print(f"⏯️ Retomando download segmentado: {os.path.basename(destino)}")
+
+        lock = threading.Lock()
+        erros = []
+        pendentes = queue.Queue()
+        for faixa in estado["faixas"]:
+            pendentes.put(faixa)
+
+        def baixar_faixas():
+            while not erros:
+                try:
+                    baixar_faixa(pendentes.get_nowait())
+                except queue.Empty:
+                    return
+
+        def baixar_faixa(faixa):
+            inicio, fim, _ = faixa
+            try:
+                if inicio + faixa[2] > fim:
+                    return
+                headers = {"Range": f"bytes={inicio + faixa[2]}-{fim}"}
+                response = http_cliente.get(url, stream=True, timeout=timeout, headers=headers, tentativas=1)
+                if response.status_code != 206:
+                    raise IOError(f"Status {response.status_code} para faixa {inicio}-{fim}")
+                with open(parte, "r+b") as file:
+                    file.seek(inicio + faixa[2])
+                    ultimo_salvo = time.monotonic()
+                    for chunk in response.iter_content(TAMANHO_CHUNK):
+                        chunk = chunk[:fim + 1 - inicio - faixa[2]]
+                        self.limitador.consumir(len(chunk))
+                        http_cliente.registrar_bytes(url, len(chunk))
+                        file.write(chunk)
+                        faixa[2] += len(chunk)
+                        terminou = inicio + faixa[2] > fim
+                        # 💾 Persiste o progresso no máximo 1x/s para sobreviver a reinícios
+                        if terminou or time.monotonic() - ultimo_salvo >= 1:
+                            file.flush()
+                            with lock:
+                                _salvar_estado_segmentos(estado_path, estado)
+                            ultimo_salvo = time.monotonic()
+                        if terminou:
+                            break
+            except Exception as e:
+                erros.append(e)
+
+        # 🚦 Conexões paralelas saem do limite por host: a vaga deste worker mais as extras livres agora
+        host = urlparse(url).netloc
+        extras = self._reservar_vagas(host, min(self.segmentos, len(estado["faixas"])) - 1)
+        try:
+            threads = [threading.Thread(target=baixar_faixas, daemon=True) for _ in range(1 + extras)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            if extras:
+                self._liberar_vagas(host, extras)
+
+        if erros or any(inicio + baixados <= fim for inicio, fim, baixados in estado["faixas"]):
+            print(f"⚠️ Download segmentado incompleto, será retomado: {url} ({erros[0] if erros else ''})")
+            return False, FALHA_REDE
+
+        falha = self._finalizar(parte, destino, estado["total"], sha256, validar, armazenar, etag or head_etag)
+        if falha is None:
+            _remover(estado_path)
+            return True, None
+        _remover(parte)
+        _remover(estado_path)
+        return False, falha
+
+    def _finalizar(self, parte, destino, total, sha256, validar, armazenar=True, etag=None):
+        """Confere e publica o .part; retorna None se o arquivo entrou no lugar, senão o motivo da recusa."""
+        if total is not None and os.path.getsize(parte) != total:
+            print(f"❌ Tamanho divergente em {parte}: esperado {total}")
+            return FALHA_INVALIDO
+        if sha256 and armazem.calcular_sha256(parte) != sha256.lower():
+            print(f"❌ Checksum divergente em {parte}")
+            return FALHA_CHECKSUM
+        if validar and not validar(parte):
+            return FALHA_INVALIDO
+        os.replace(parte, destino)  # ✅ Troca atômica: o arquivo final nunca aparece pela metade
+        conferido = "sha256" if sha256 else "validador" if validar else "tamanho" if total is not None else None
+        if armazenar:
+            sha256 = armazem.armazenar(destino, etag, sha256)
+        indice.registrar(destino, sha256=sha256)
+        if conferido:
+            # ✅ Já conferido no download: a verificação de fundo não precisa reler o arquivo
+            verificacao.marcar_valido(destino, conferido, sha256=sha256)
+        return None
+
+
+def caminho_final(caminho):
+    """Para arquivos auxiliares de download (.part / .part.json) retorna o arquivo que eles originam."""
+    for sufixo in (SUFIXO_SEGMENTOS, SUFIXO_PARCIAL):
+        if caminho.endswith(sufixo):
+            return caminho[:-len(sufixo)]
+    return caminho
+
+
+def _carregar_estado_segmentos(caminho):
+    if not os.path.exists(caminho):
+        return None
+    try:
+        with open(caminho, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except:
+        return None
+
+
+def _salvar_estado_segmentos(caminho, estado):
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as file:
+        json.dump(estado, file)
+    os.replace(temporario, caminho)
+
+
+def _total_content_range(valor):
+    # "bytes 100-199/2000" ou "bytes */2000"
+    if not valor or "/" not in valor:
+        return None
+    total = valor.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def _remover(caminho):
+    try:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+    except OSError:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoolDownloads(**carregar_config_downloads())
+            # 📺 Ajusta a banda dos downloads conforme o estado da live na interface
+            governador.iniciar(_pool.limitador)
+        return _pool
@@ -1,56 +1,89 @@
 import os
-import json
-import requests
-from config.database import supabase
+from atualizadores import downloader, armazem, manifesto, prioridade, catalogo, indice, verificacao, geracoes, retentativas, janelas
 import boto3
 
 BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
 ENTRETENIMENTO_DIR = os.path.join(CACHE_DIR, "Entretenimento")
-ENTRETENIMENTO_VERSAO_FILE = os.path.join(CACHE_DIR, "versao_entretenimento.json")
+S3_BUCKET = "videos-entretenimento"
 
 s3 = boto3.client('s3', region_name='sa-east-1')
 os.makedirs(ENTRETENIMENTO_DIR, exist_ok=True)
 
+def caminho_indice(caminho_video):
+    """Caminho do vídeo no índice de arquivos (relativo ao cache)."""
+    return indice.normalizar(os.path.join("Entretenimento", caminho_video))
+
+def videos_presentes():
+    indice.garantir_varredura()
+    return indice.presentes("Entretenimento")
+
 def carregar_versao_entretenimento():
-    if os.path.exists(ENTRETENIMENTO_VERSAO_FILE):
-        try:
-            with open(ENTRETENIMENTO_VERSAO_FILE, "r") as f:
-                return json.load(f).get("versao", 0)
-        except:
-            return 0
-    return 0
+    try:
+        return catalogo.carregar_versao("entretenimento", 0)
+    except:
+        return 0
 
 def salvar_versao_entretenimento(versao):
-    with open(ENTRETENIMENTO_VERSAO_FILE, "w") as f:
-        json.dump({"versao": versao}, f)
+    catalogo.salvar_versao("entretenimento", versao)
+
+def videos_liberados(json_data, presentes):
+    """Vídeos ausentes que podem baixar agora e quantos ficam para a janela de download.
+
+    Uma categoria ainda sem nenhum vídeo na tela não espera a janela para o primeiro deles.
+    """
+    prioridades = prioridade.prioridades_entretenimento(json_data)
+    config_janelas = janelas.carregar_janelas()
+    ativos = [item for item in json_data.get("entretenimento", []) if item.get("status") != "deleted" and item.get("video")]
+    categorias_presentes = {item.get("categoria") for item in ativos if caminho_indice(item["video"]) in presentes}
+    liberados, adiados = [], 0
+    for item in ativos:
+        if caminho_indice(item["video"]) in presentes:
+            continue
+        prioridade_item = prioridades[item["video"]]
+        primeiro_da_categoria = prioridade_item[0] == prioridade.EM_BREVE and item.get("categoria") not in categorias_presentes
+        if primeiro_da_categoria or janelas.liberado("Entretenimento", prioridade_item, janelas=config_janelas):
+            liberados.append((item, prioridade_item))
+        else:
+            adiados += 1
+    return liberados, adiados
 
 def baixar_videos_ausentes(json_data, callback=None):
     print("📁 Iniciando download de vídeos ausentes...")
+    liberados, adiados = videos_liberados(json_data, videos_presentes())
+    if adiados:
+        print(f"🌙 {adiados} vídeo(s) ficam para a janela de download ({janelas.descrever('Entretenimento')})")
+    tarefas = []
+    for item, prioridade_item in liberados:
+        caminho_s3 = item["video"]
+        print(f"⬇️ Baixando novo vídeo: {caminho_s3}")
+        url = f"https://{S3_BUCKET}.s3.sa-east-1.amazonaws.com/{caminho_s3}"
+        tarefas.append((url, os.path.join(ENTRETENIMENTO_DIR, caminho_s3), {"timeout": 15, "tentativas": 1, "dono": "entretenimento",
+                                                                             "prioridade": prioridade_item, **verificacao.esperado_do_item(item)}))
+
+    retentativas.manter_apenas("entretenimento", [destino for _, destino, _ in tarefas])
+    resultados = downloader.obter_pool().baixar_em_lote(tarefas, callback=callback)
+    for (url, _, _), sucesso in zip(tarefas, resultados):
+        if sucesso:
+            print(f"✅ Baixado com sucesso: {url}")
+
+def agendar_verificacao(json_data):
+    """Confere em segundo plano (tamanho/hash do manifesto ou ETag do S3) os vídeos presentes ainda não verificados."""
+    presentes = videos_presentes()
     for item in json_data.get("entretenimento", []):
-        if item.get("status") == "deleted":
-            continue
-
-        caminho_s3 = item.get("video")
-        caminho_local = os.path.join(ENTRETENIMENTO_DIR, caminho_s3)
-
-        if not os.path.exists(caminho_local):
-            print(f"⬇️ Baixando novo vídeo: {caminho_s3}")
-            try:
-                url = f"https://videos-entretenimento.s3.sa-east-1.amazonaws.com/{caminho_s3}"
-                response = requests.get(url, stream=True, timeout=15)
-                if response.status_code == 200:
-                    os.makedirs(os.path.dirname(caminho_local), exist_ok=True)
-                    with open(caminho_local, "wb") as f:
-                        for chunk in response.iter_content(1024 * 1024 * 2):
-                            f.write(chunk)
-                    print(f"✅ Baixado com sucesso: {caminho_s3}")
-                    if callback:
-                        callback()
-                else:
-                    print(f"⚠️ Erro ao baixar {caminho_s3}: Status {response.status_code}")
-            except Exception as e:
-                print(f"❌ Erro inesperado ao baixar {caminho_s3}: {e}")
+        caminho = item.get("video")
+        if caminho and item.get("status") != "deleted" and caminho_indice(caminho) in presentes:
+            verificacao.agendar(os.path.join(ENTRETENIMENTO_DIR, caminho), verificacao.esperado_do_item(item), S3_BUCKET, caminho)
+
+def publicar_geracao(json_data, versao):
+    """Publica manifesto + vídeos completos como uma nova geração (nada acontece se nada mudou)."""
+    presentes = videos_presentes()
+    arquivos = {
+        item["video"]: os.path.join(ENTRETENIMENTO_DIR, item["video"])
+        for item in json_data.get("entretenimento", [])
+        if item.get("video") and item.get("status") != "deleted" and caminho_indice(item["video"]) in presentes
+    }
+    geracoes.publicar("entretenimento", json_data, arquivos, versao=versao)
 
 def deletar_videos_entretenimento(json_data):
     print("🗑️ Verificando vídeos para exclusão...")
@@ -64,67 +97,78 @@ def deletar_videos_entretenimento(json_data):
         if not caminho:
             continue
         if status == "deleted":
-            arquivos_deletar.add(os.path.normpath(caminho))
+            arquivos_deletar.add(caminho_indice(caminho))
         else:
-            arquivos_validos.add(os.path.normpath(caminho))
+            arquivos_validos.add(caminho_indice(caminho))
 
-    for root, _, files in os.walk(ENTRETENIMENTO_DIR):
-        for file in files:
-            caminho_rel = os.path.relpath(os.path.join(root, file), ENTRETENIMENTO_DIR).replace("\\", "/")
-            caminho_norm = os.path.normpath(caminho_rel)
-            caminho_completo = os.path.join(ENTRETENIMENTO_DIR, caminho_norm)
+    # 🗂️ Diferença entre índice e manifesto: nenhuma varredura da pasta de entretenimento
+    for caminho in videos_presentes():
+        # Downloads parciais (.part) de vídeos ainda válidos são mantidos para retomada
+        caminho_norm = downloader.caminho_final(caminho)
 
-            if caminho_norm in arquivos_deletar or caminho_norm not in arquivos_validos:
-                try:
+        if caminho_norm in arquivos_deletar or caminho_norm not in arquivos_validos:
+            try:
+                caminho_completo = indice.absoluto(caminho)
+                if os.path.exists(caminho_completo):
                     os.remove(caminho_completo)
-                    print(f"🗑️ Arquivo de entretenimento deletado: {caminho_rel}")
-                except Exception as e:
-                    print(f"⚠️ Erro ao deletar {caminho_rel}: {e}")
+                    print(f"🗑️ Arquivo de entretenimento deletado: {caminho}")
+                indice.remover(caminho)
+            except Exception as e:
+                print(f"⚠️ Erro ao deletar {caminho}: {e}")
+
+    # ♻️ Libera do armazém o conteúdo que não é mais referenciado por nenhuma categoria
+    armazem.coletar_lixo()
 
-def contar_videos_faltando():
-    response = supabase.table("entretenimento_updates").select("json_data").order("versao", desc=True).limit(1).execute()
-    if not response.data:
+def contar_videos_faltando(manifesto_ciclo=None):
+    dados = (manifesto_ciclo or manifesto.ManifestoCiclo()).entretenimento()
+    if not dados:
         return 0
-    json_data = response.data[0]["json_data"]
-    return sum(1 for item in json_data.get("entretenimento", []) if item.get("status") != "deleted" and not os.path.exists(os.path.join(ENTRETENIMENTO_DIR, item["video"])))
+    # 🌙 Vídeos adiados para a janela de download não entram na barra de progresso
+    return len(videos_liberados(dados["json_data"], videos_presentes())[0])
 
 
-def verificar_atualizacao_entretenimento(callback=None):
+def verificar_atualizacao_entretenimento(callback=None, manifesto_ciclo=None):
     versao_local = carregar_versao_entretenimento()
     try:
-        response = supabase.table("entretenimento_updates")\
-            .select("versao, json_data")\
-            .order("versao", desc=True).limit(1).execute()
-
-        dados = response.data[0] if response.data else None
+        dados = (manifesto_ciclo or manifesto.ManifestoCiclo()).entretenimento()
         if not dados:
             return
 
-        versao_remota = dados["versao"]
+        # Sem delta e sem carimbo no snapshot a versão pode faltar: sincroniza só pelos arquivos
+        try:
+            versao_remota = int(dados["versao"]) if dados["versao"] is not None else None
+        except (TypeError, ValueError):
+            versao_remota = None
         json_data = dados["json_data"]
         print(f"📡 Versão local: {versao_local}")
         print(f"📥 Versão remota: {versao_remota}")
 
-        with open(os.path.join(CACHE_DIR, "entretenimento_update.json"), "w", encoding="utf-8") as f:
-            json.dump(json_data, f, indent=2, ensure_ascii=False)
-
-        # Verifica se há vídeos faltando
+        # Verifica se há vídeos faltando (pelo índice de arquivos)
+        presentes = videos_presentes()
         faltando = any(
             item.get("status") != "deleted" and
-            not os.path.exists(os.path.join(ENTRETENIMENTO_DIR, item["video"]))
+            caminho_indice(item["video"]) not in presentes
             for item in json_data.get("entretenimento", [])
         )
 
-        if versao_remota > versao_local or faltando:
+        versao_nova = versao_remota is not None and versao_remota > versao_local
+        if versao_nova or faltando:
             print("🔁 Iniciando sincronização de entretenimento...")
             baixar_videos_ausentes(json_data, callback=callback)
             deletar_videos_entretenimento(json_data)
-            if versao_remota > versao_local:
+            if versao_nova:
                 salvar_versao_entretenimento(versao_remota)
                 print(f"✅ Versão local atualizada para {versao_remota}")
         else:
             print("✅ Nenhuma atualização necessária. Todos os arquivos estão presentes.")
 
+        # 🧬 A interface só passa a ver o novo manifesto quando os vídeos dele estão completos
+        publicar_geracao(json_data, versao_remota)
+
+        # 🔍 Um mp4 truncado não passa mais despercebido: é verificado uma vez e, se inválido, baixado de novo
+        agendar_verificacao(json_data)
+
         print("✅ Processo de atualização de entretenimento finalizado.")
     except Exception as e:
         print(f"❌ Erro ao verificar atualização de entretenimento: {e}")
+        return False
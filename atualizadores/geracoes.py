@@ -0,0 +1,70 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+from atualizadores import armazem, catalogo
+
+BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+GERACOES_DIR = os.path.join(CACHE_DIR, "Geracoes")
+
+# Gerações de conteúdo: cada sincronização concluída vira um diretório Geracoes/<manifesto>/<n>
+# com hard links para os arquivos completos, e é publicada trocando o ponteiro no catálogo numa
+# única transação. A interface sempre enxerga uma geração inteira — nunca um manifesto que aponta
+# para arquivos ainda baixando ou já apagados. Gerações antigas são removidas depois de um tempo.
+
+RETENCAO = 30 * 60  # segundos que uma geração substituída fica disponível para quem ainda a exibe
+
+
+def _assinatura(dados, arquivos):
+    h = hashlib.sha256(json.dumps(dados, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    for caminho in sorted(arquivos):
+        stat = os.stat(arquivos[caminho])
+        h.update(f"\n{caminho}|{stat.st_size}|{stat.st_mtime_ns}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def publicar(nome, dados, arquivos, versao=None):
+    """Publica uma nova geração de `nome` com o manifesto `dados`.
+
+    `arquivos` mapeia o caminho do item no manifesto para o arquivo completo no disco. Se nada
+    mudou desde a geração atual, não grava nada e retorna False.
+    """
+    arquivos = {caminho: origem for caminho, origem in arquivos.items() if os.path.exists(origem)}
+    assinatura = _assinatura(dados, arquivos)
+    atual = catalogo.geracao_atual(nome)
+    if atual and atual["assinatura"] == assinatura:
+        return False
+
+    numero = catalogo.proximo_numero_geracao(nome)
+    diretorio = os.path.join(GERACOES_DIR, nome, str(numero))
+    if os.path.exists(diretorio):
+        shutil.rmtree(diretorio)  # sobra de uma publicação interrompida
+    for caminho, origem in arquivos.items():
+        armazem.vincular_arquivo(origem, os.path.join(diretorio, *caminho.split("/")))
+    os.makedirs(diretorio, exist_ok=True)
+
+    catalogo.publicar_geracao(nome, dados, versao, numero, f"Geracoes/{nome}/{numero}", assinatura)
+    print(f"🧬 Geração {numero} de '{nome}' publicada ({len(arquivos)} arquivo(s))")
+    coletar_geracoes(nome)
+    return True
+
+
+def coletar_geracoes(nome, retencao=RETENCAO):
+    """Remove gerações substituídas há mais de `retencao` s. Se algum arquivo ainda estiver aberto, tenta depois."""
+    removidas = 0
+    for geracao in catalogo.geracoes_substituidas(nome, time.time() - retencao):
+        diretorio = os.path.join(CACHE_DIR, geracao["diretorio"])
+        try:
+            if os.path.exists(diretorio):
+                shutil.rmtree(diretorio)
+        except OSError as e:
+            print(f"⚠️ Geração {geracao['numero']} de '{nome}' ainda em uso: {e}")
+            continue
+        catalogo.esquecer_geracao(nome, geracao["numero"])
+        removidas += 1
+    if removidas:
+        print(f"🧹 {removidas} geração(ões) antiga(s) de '{nome}' removida(s)")
+        armazem.coletar_lixo()
+    return removidas
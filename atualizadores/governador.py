@@ -0,0 +1,122 @@
+import json
+import time
+import socket
+import threading
+
+# Governador de banda: a interface (LiveWidget) informa por UDP local o estado da live
+# e o atualizador reduz a banda dos downloads quando a live está bufferizando ou travada.
+# Os downloads usam apenas a capacidade que sobra.
+
+HOST_IPC = "127.0.0.1"
+PORTA_IPC = 47810
+
+INTERVALO_AJUSTE = 1          # segundos entre reavaliações do limite
+FATOR_REDUCAO = 0.5           # redução multiplicativa ao detectar problema na live
+FRACAO_INCREMENTO = 0.1       # aumento aditivo (fração da vazão de pico) por segundo estável
+LIMITE_MINIMO = 32 * 1024     # bytes/s — nunca para completamente os downloads
+ESTABILIDADE_NECESSARIA = 15  # segundos de live estável antes de voltar a acelerar
+SINAL_EXPIRA = 60             # sem sinal da interface por esse tempo, libera a banda
+
+ESTADOS_PROBLEMA = {"buffering", "travada"}
+
+_governador = None
+_socket_envio = None
+
+
+def sinalizar_estado_live(estado):
+    """Chamado pela interface: envia 'ok', 'buffering' ou 'travada' ao atualizador (fire-and-forget)."""
+    global _socket_envio
+    try:
+        if _socket_envio is None:
+            _socket_envio = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        _socket_envio.sendto(json.dumps({"estado": estado}).encode("utf-8"), (HOST_IPC, PORTA_IPC))
+    except OSError:
+        pass
+
+
+class GovernadorBanda:
+    def __init__(self, limitador):
+        self.limitador = limitador
+        self.estado = None
+        self.ultimo_sinal = 0
+        self.ultimo_problema = 0
+        self.vazao = 0.0       # média móvel (bytes/s) medida nos downloads
+        self.vazao_pico = 0.0
+        self.limite = 0        # 0 = sem limite
+        self._ultimo_total = limitador.total_bytes
+        self._ultima_medicao = time.monotonic()
+
+    def receber(self, estado):
+        agora = time.monotonic()
+        self.ultimo_sinal = agora
+        if estado in ESTADOS_PROBLEMA:
+            if self.estado not in ESTADOS_PROBLEMA:
+                print(f"📺 Live em '{estado}': reduzindo banda dos downloads")
+            self.ultimo_problema = agora
+        self.estado = estado
+
+    def medir(self):
+        agora = time.monotonic()
+        total = self.limitador.total_bytes
+        decorrido = max(agora - self._ultima_medicao, 1e-6)
+        instantanea = (total - self._ultimo_total) / decorrido
+        self._ultimo_total, self._ultima_medicao = total, agora
+        self.vazao = 0.7 * self.vazao + 0.3 * instantanea
+        self.vazao_pico = max(self.vazao_pico * 0.999, self.vazao)
+
+    def ajustar(self):
+        """AIMD: corta pela metade enquanto a live sofre e volta a subir aos poucos quando estabiliza."""
+        self.medir()
+        agora = time.monotonic()
+
+        if agora - self.ultimo_sinal > SINAL_EXPIRA:
+            novo = 0  # interface sem live ativa: downloads livres
+        elif self.estado in ESTADOS_PROBLEMA:
+            referencia = self.limite or self.vazao or self.vazao_pico
+            novo = max(LIMITE_MINIMO, int(referencia * FATOR_REDUCAO))
+            self.estado = "reduzido"  # uma redução por sinal recebido
+        elif self.limite and agora - self.ultimo_problema > ESTABILIDADE_NECESSARIA:
+            novo = int(self.limite + max(LIMITE_MINIMO, self.vazao_pico * FRACAO_INCREMENTO))
+            if self.vazao_pico and novo >= self.vazao_pico:
+                novo = 0
+        else:
+            novo = self.limite
+
+        if novo != self.limite:
+            print(f"🚦 Limite de download: {'sem limite' if not novo else f'{novo / 1024:.0f} KB/s'}")
+            self.limite = novo
+            self.limitador.ajustar(novo)
+
+    def _escutar(self, sock):
+        while True:
+            try:
+                dados, _ = sock.recvfrom(1024)
+                self.receber(json.loads(dados.decode("utf-8")).get("estado"))
+            except Exception:
+                continue
+
+    def _loop_ajuste(self):
+        while True:
+            time.sleep(INTERVALO_AJUSTE)
+            try:
+                self.ajustar()
+            except Exception as e:
+                print(f"⚠️ Erro no governador de banda: {e}")
+
+
+def iniciar(limitador):
+    """Liga o governador no processo que faz downloads. Sem a porta IPC, os downloads seguem sem ajuste."""
+    global _governador
+    if _governador is not None:
+        return _governador
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind((HOST_IPC, PORTA_IPC))
+    except OSError as e:
+        print(f"⚠️ Governador de banda desativado (porta {PORTA_IPC} indisponível): {e}")
+        return None
+
+    _governador = GovernadorBanda(limitador)
+    threading.Thread(target=_governador._escutar, args=(sock,), daemon=True).start()
+    threading.Thread(target=_governador._loop_ajuste, daemon=True).start()
+    return _governador
@@ -0,0 +1,136 @@
+import time
+import random
+import threading
+from urllib.parse import urlparse
+from email.utils import parsedate_to_datetime
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cliente HTTP único do processo: uma Session com pool de conexões por host e keep-alive,
+# timeouts padrão, retentativas com backoff exponencial + jitter e métricas por host.
+
+TIMEOUT_PADRAO = (5, 20)  # (conexão, leitura) em segundos
+TENTATIVAS_PADRAO = 3
+BACKOFF_BASE = 1
+BACKOFF_MAX = 30
+CONEXOES_POR_HOST = 16
+STATUS_RETENTAVEIS = {408, 429, 500, 502, 503, 504}
+
+_sessao = None
+_sessao_lock = threading.Lock()
+_metricas = {}
+_metricas_lock = threading.Lock()
+
+
+def obter_sessao():
+    global _sessao
+    with _sessao_lock:
+        if _sessao is None:
+            _sessao = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=CONEXOES_POR_HOST)
+            _sessao.mount("http://", adapter)
+            _sessao.mount("https://", adapter)
+        return _sessao
+
+
+def espera_backoff(tentativa, base=BACKOFF_BASE, maximo=BACKOFF_MAX):
+    """Backoff exponencial com full jitter: sorteia entre 0 e base * 2^(tentativa-1)."""
+    return random.uniform(0, min(maximo, base * 2 ** (tentativa - 1)))
+
+
+def retry_after(response):
+    """Segundos pedidos pelo servidor no `Retry-After` (segundos ou data HTTP), ou None."""
+    valor = response.headers.get("Retry-After", "").strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time()) if valor else None
+    except (TypeError, ValueError):
+        return None
+
+
+def espera_resposta(response, tentativa):
+    """Quanto esperar antes de repetir após um status retentável: o `Retry-After`, senão o backoff."""
+    pedido = retry_after(response)
+    return min(pedido, BACKOFF_MAX) if pedido is not None else espera_backoff(tentativa)
+
+
+def _registrar(host, **incrementos):
+    with _metricas_lock:
+        metrica = _metricas.setdefault(host, {
+            "requisicoes": 0, "falhas": 0, "retentativas": 0, "nao_modificados": 0, "bytes": 0, "tempo_total": 0.0,
+        })
+        for chave, valor in incrementos.items():
+            metrica[chave] += valor
+
+
+def registrar_bytes(url, quantidade):
+    """Contabiliza bytes de corpo lidos em respostas com stream=True."""
+    _registrar(urlparse(url).netloc, bytes=quantidade)
+
+
+def metricas():
+    with _metricas_lock:
+        return {host: dict(valores) for host, valores in _metricas.items()}
+
+
+def imprimir_metricas():
+    for host, m in sorted(metricas().items()):
+        media = m["tempo_total"] / m["requisicoes"] if m["requisicoes"] else 0
+        print(f"📈 {host}: {m['requisicoes']} req, {m['falhas']} falha(s), {m['retentativas']} retentativa(s), "
+              f"{m['nao_modificados']} 304, {m['bytes'] / 1024:.0f} KB, {media:.2f}s/req")
+
+
+def requisitar(metodo, url, tentativas=TENTATIVAS_PADRAO, **kwargs):
+    """Executa a requisição pela sessão compartilhada.
+
+    Repete em erros de conexão e em 429/5xx (respeitando `Retry-After`). A última
+    resposta é devolvida mesmo com status de erro; a última exceção é relançada.
+    """
+    kwargs.setdefault("timeout", TIMEOUT_PADRAO)
+    host = urlparse(url).netloc
+    sessao = obter_sessao()
+
+    for tentativa in range(1, tentativas + 1):
+        inicio = time.monotonic()
+        try:
+            response = sessao.request(metodo, url, **kwargs)
+        except requests.RequestException:
+            _registrar(host, requisicoes=1, falhas=1, tempo_total=time.monotonic() - inicio)
+            if tentativa == tentativas:
+                raise
+            _registrar(host, retentativas=1)
+            time.sleep(espera_backoff(tentativa))
+            continue
+
+        _registrar(
+            host,
+            requisicoes=1,
+            tempo_total=time.monotonic() - inicio,
+            nao_modificados=int(response.status_code == 304),
+            bytes=0 if kwargs.get("stream") else len(response.content),
+        )
+        pedido = retry_after(response) if response.status_code in STATUS_RETENTAVEIS else None
+        if pedido is not None:
+            # 🚧 Dica do servidor: vale também para os próximos ciclos de todos os feeds
+            from atualizadores import agendador
+            agendador.registrar_dica(pedido, host)
+        if response.status_code not in STATUS_RETENTAVEIS or tentativa == tentativas:
+            return response
+
+        _registrar(host, falhas=1, retentativas=1)
+        response.close()
+        time.sleep(espera_resposta(response, tentativa))
+
+
+def get(url, **kwargs):
+    return requisitar("GET", url, **kwargs)
+
+
+def head(url, **kwargs):
+    kwargs.setdefault("allow_redirects", True)
+    return requisitar("HEAD", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return requisitar("POST", url, **kwargs)
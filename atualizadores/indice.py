@@ -0,0 +1,163 @@
+import os
+import time
+from atualizadores import catalogo
+
+BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+
+# Índice persistente dos arquivos de conteúdo (caminho, tamanho, mtime, hash, dono) na tabela
+# `arquivos` do catálogo. Os atualizadores registram o que gravam e removem; integridade e limpeza
+# viram uma comparação entre manifesto e índice, sem percorrer o disco. Uma varredura completa
+# ocasional corrige o que mudou por fora (arquivos apagados à mão, disco restaurado etc.).
+
+PASTAS_INDEXADAS = ["Propagandas", "Banners", "CondominiumNotices", "Entretenimento", "News"]
+INTERVALO_VARREDURA = 6 * 3600  # segundos entre varreduras completas
+CHAVE_VARREDURA = "varredura_arquivos"
+PRECISAO_REPRODUCAO = 3600  # segundos
+
+
+def normalizar(caminho):
+    """Caminho relativo ao cache com '/' — a mesma forma usada nos manifestos."""
+    if os.path.isabs(caminho):
+        caminho = os.path.relpath(caminho, CACHE_DIR)
+    return os.path.normpath(caminho).replace("\\", "/")
+
+
+def absoluto(caminho):
+    return os.path.join(CACHE_DIR, *caminho.split("/"))
+
+
+def _faixa(pasta):
+    # Todos os caminhos que começam com "pasta/": usa o índice da chave primária ('0' sucede '/')
+    pasta = normalizar(pasta)
+    return pasta + "/", pasta + "0"
+
+
+def registrar(caminho, dono=None, sha256=None):
+    """Registra (ou atualiza) um arquivo recém-gravado. O hash só é mantido se tamanho e mtime não mudaram."""
+    try:
+        stat = os.stat(caminho if os.path.isabs(caminho) else absoluto(caminho))
+    except OSError:
+        remover(caminho)
+        return
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute(
+            """INSERT INTO arquivos (caminho, tamanho, mtime, sha256, dono) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(caminho) DO UPDATE SET
+                   sha256 = CASE WHEN arquivos.tamanho = excluded.tamanho AND arquivos.mtime = excluded.mtime
+                                 THEN COALESCE(excluded.sha256, arquivos.sha256) ELSE excluded.sha256 END,
+                   tamanho = excluded.tamanho, mtime = excluded.mtime,
+                   dono = COALESCE(excluded.dono, arquivos.dono)""",
+            (normalizar(caminho), stat.st_size, stat.st_mtime, sha256 and sha256.lower(), dono),
+        )
+
+
+def remover(caminho):
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute("DELETE FROM arquivos WHERE caminho = ?", (normalizar(caminho),))
+        conexao.execute("DELETE FROM reproducoes WHERE caminho = ?", (normalizar(caminho),))
+
+
+def registrar_reproducao(caminho):
+    """Chamado pela interface quando um arquivo entra em exibição (base do LRU da cota de disco)."""
+    conexao = catalogo.conectar()
+    with conexao:
+        # Precisão de uma hora basta para o LRU e evita uma escrita a cada vídeo exibido
+        conexao.execute(
+            """INSERT INTO reproducoes (caminho, reproduzido_em) VALUES (?, ?)
+               ON CONFLICT(caminho) DO UPDATE SET reproduzido_em = excluded.reproduzido_em
+               WHERE excluded.reproduzido_em - reproducoes.reproduzido_em >= ?""",
+            (catalogo.origem_na_geracao(normalizar(caminho)), time.time(), PRECISAO_REPRODUCAO),
+        )
+
+
+def uso_total():
+    """Bytes ocupados pelos arquivos indexados."""
+    return catalogo.conectar().execute("SELECT COALESCE(SUM(tamanho), 0) FROM arquivos").fetchone()[0]
+
+
+def presentes(*pastas):
+    """Conjunto dos caminhos indexados dentro das pastas dadas."""
+    conexao = catalogo.conectar()
+    resultado = set()
+    for pasta in pastas:
+        inicio, fim = _faixa(pasta)
+        linhas = conexao.execute("SELECT caminho FROM arquivos WHERE caminho >= ? AND caminho < ?", (inicio, fim))
+        resultado.update(linha["caminho"] for linha in linhas)
+    return resultado
+
+
+def assinatura(*pastas):
+    """Resumo barato (quantidade, maior mtime, bytes) por pasta — muda quando algum arquivo entra, sai ou é regravado."""
+    conexao = catalogo.conectar()
+    resumo = []
+    for pasta in pastas:
+        inicio, fim = _faixa(pasta)
+        linha = conexao.execute(
+            "SELECT COUNT(*), MAX(mtime), SUM(tamanho) FROM arquivos WHERE caminho >= ? AND caminho < ?",
+            (inicio, fim),
+        ).fetchone()
+        resumo.append((pasta, *tuple(linha)))
+    return tuple(resumo)
+
+
+def varrer(pastas=PASTAS_INDEXADAS):
+    """Varredura completa: sincroniza o índice com o que realmente está no disco."""
+    conexao = catalogo.conectar()
+    inicio_varredura = time.time()
+    adicionados = atualizados = removidos = 0
+
+    for pasta in pastas:
+        inicio, fim = _faixa(pasta)
+        conhecidos = {
+            linha["caminho"]: (linha["tamanho"], linha["mtime"])
+            for linha in conexao.execute("SELECT caminho, tamanho, mtime FROM arquivos WHERE caminho >= ? AND caminho < ?", (inicio, fim))
+        }
+        vistos = set()
+        alteracoes = []
+        for root, _, files in os.walk(absoluto(pasta)):
+            for file in files:
+                caminho_absoluto = os.path.join(root, file)
+                try:
+                    stat = os.stat(caminho_absoluto)
+                except OSError:
+                    continue
+                caminho = normalizar(caminho_absoluto)
+                vistos.add(caminho)
+                anterior = conhecidos.get(caminho)
+                if anterior != (stat.st_size, stat.st_mtime):
+                    alteracoes.append((caminho, stat.st_size, stat.st_mtime))
+                    if anterior is None:
+                        adicionados += 1
+                    else:
+                        atualizados += 1
+
+        ausentes = [(caminho,) for caminho in conhecidos if caminho not in vistos]
+        removidos += len(ausentes)
+        with conexao:
+            conexao.executemany(
+                """INSERT INTO arquivos (caminho, tamanho, mtime, sha256) VALUES (?, ?, ?, NULL)
+                   ON CONFLICT(caminho) DO UPDATE SET tamanho = excluded.tamanho, mtime = excluded.mtime, sha256 = NULL""",
+                alteracoes,
+            )
+            conexao.executemany("DELETE FROM arquivos WHERE caminho = ?", ausentes)
+
+    catalogo.salvar_metadado(CHAVE_VARREDURA, inicio_varredura)
+    if adicionados or atualizados or removidos:
+        print(f"🗂️ Índice de arquivos: {adicionados} novo(s), {atualizados} alterado(s), {removidos} removido(s)")
+    return adicionados + atualizados + removidos
+
+
+def garantir_varredura():
+    """Faz a varredura inicial se o índice nunca foi montado (primeira execução ou banco novo)."""
+    if catalogo.obter_metadado(CHAVE_VARREDURA) is None:
+        varrer()
+
+
+def varredura_periodica():
+    """Tarefa de fundo: varre o disco só se a última varredura completa já passou do intervalo."""
+    ultima = float(catalogo.obter_metadado(CHAVE_VARREDURA, 0))
+    if time.time() - ultima >= INTERVALO_VARREDURA:
+        varrer()
@@ -0,0 +1,90 @@
+import os
+import json
+import datetime
+from atualizadores import prioridade
+
+BASE_DIR = os.path.abspath(".")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
+CONFIG_PATH = "config.json"
+
+# Janelas de download por classe de conteúdo — a pasta do arquivo no cache: "Entretenimento", "Propagandas",
+# "Banners", "CondominiumNotices". Fora da janela o download fica para a próxima abertura, para os vídeos
+# grandes não disputarem o link do prédio com as câmeras ao vivo durante o dia. Regras:
+#   - o que a tela precisa exibir agora (EXIBICAO_IMEDIATA: propagandas da rotação, banners, avisos vigentes)
+#     baixa sempre na hora;
+#   - um aviso futuro só espera a janela se ela abrir antes do início da vigência.
+# Sobrescrevível pela chave "janelas_download" do config.json: {"Entretenimento": ["01:00-06:00"], ...}
+# (uma lista vazia libera a classe o dia todo; "22:00-05:00" atravessa a meia-noite).
+JANELAS_PADRAO = {"Entretenimento": ["01:00-06:00"]}
+SEMPRE_IMEDIATO = {prioridade.EXIBICAO_IMEDIATA}
+
+
+def carregar_janelas():
+    janelas = dict(JANELAS_PADRAO)
+    if not os.path.exists(CONFIG_PATH):
+        return janelas
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            janelas.update(json.load(file).get("janelas_download", {}))
+    except:
+        pass
+    return janelas
+
+
+def _intervalos(textos):
+    intervalos = []
+    for texto in textos or []:
+        try:
+            inicio, fim = (datetime.datetime.strptime(parte.strip(), "%H:%M").time() for parte in texto.split("-"))
+            intervalos.append((inicio, fim))
+        except ValueError:
+            print(f"⚠️ Janela de download inválida: {texto!r} (use HH:MM-HH:MM)")
+    return intervalos
+
+
+def _dentro(intervalos, hora):
+    for inicio, fim in intervalos:
+        if (inicio <= hora < fim) if inicio < fim else (hora >= inicio or hora < fim):
+            return True
+    return False
+
+
+def aberta(classe, agora=None, janelas=None):
+    """True se a classe pode baixar agora (classe sem janela configurada está sempre aberta)."""
+    intervalos = _intervalos((carregar_janelas() if janelas is None else janelas).get(classe))
+    return not intervalos or _dentro(intervalos, (agora or datetime.datetime.now()).time())
+
+
+def proxima_abertura(classe, agora=None, janelas=None):
+    """Quando a janela da classe abre de novo (`agora` se já está aberta)."""
+    agora = agora or datetime.datetime.now()
+    intervalos = _intervalos((carregar_janelas() if janelas is None else janelas).get(classe))
+    if not intervalos or _dentro(intervalos, agora.time()):
+        return agora
+    aberturas = []
+    for inicio, _ in intervalos:
+        abertura = datetime.datetime.combine(agora.date(), inicio)
+        aberturas.append(abertura if abertura > agora else abertura + datetime.timedelta(days=1))
+    return min(aberturas)
+
+
+def liberado(classe, prioridade_item, precisa_em=None, agora=None, janelas=None):
+    """Decide se o download sai agora ou espera a janela da classe.
+
+    `precisa_em` (datetime) é quando o arquivo passa a ser exibido — ex.: início de um aviso futuro.
+    """
+    if prioridade_item and prioridade_item[0] in SEMPRE_IMEDIATO:
+        return True
+    agora = agora or datetime.datetime.now()
+    abertura = proxima_abertura(classe, agora, janelas)
+    return abertura <= agora or (precisa_em is not None and abertura >= precisa_em)
+
+
+def classe_do_destino(destino):
+    """Classe de um arquivo pelo caminho no cache (primeira pasta abaixo de cache/)."""
+    relativo = os.path.relpath(os.path.abspath(destino), CACHE_DIR)
+    return relativo.replace("\\", "/").split("/", 1)[0]
+
+
+def descrever(classe, janelas=None):
+    return ", ".join((carregar_janelas() if janelas is None else janelas).get(classe) or []) or "dia todo"
@@ -0,0 +1,42 @@
+from atualizadores import catalogo, backend_local, pacote_sync
+
+supabase = backend_local.obter_cliente()
+
+def verificar_e_atualizar_live(usar_pacote=True):
+    lives_locais, timestamp_local = carregar_live_local()
+
+    # 📦 O pacote de sincronização recente já trouxe as câmeras: nenhuma consulta extra
+    if usar_pacote and lives_locais and pacote_sync.recente("lives"):
+        return lives_locais
+
+    if not supabase:
+        print("⚠️ Supabase indisponível. Usando cache local.")
+        return lives_locais or []
+
+    try:
+        response = supabase.table("cameras").select("url, data_criacao, timing").order("data_criacao", desc=True).execute()
+
+        if response.data:
+            timestamp_supabase = response.data[0]["data_criacao"]
+
+            if timestamp_supabase != timestamp_local:
+                lives = [{"url": item["url"], "timing": item.get("timing", 30)} for item in response.data]
+                salvar_live_localmente(lives, timestamp_supabase)
+                return lives
+
+    except Exception as e:
+        print(f"⚠️ Erro ao buscar lives no Supabase: {e}")
+
+    return lives_locais or []
+
+def salvar_live_localmente(lives, data_criacao):
+    try:
+        catalogo.salvar_feed("lives", lives, data_criacao)
+    except:
+        pass
+
+def carregar_live_local():
+    try:
+        return catalogo.carregar_feed("lives")
+    except:
+        return None, None
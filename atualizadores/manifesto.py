@@ -0,0 +1,209 @@
+import os
+import json
+import threading
+from atualizadores import backend_local, catalogo
+
+CONFIG_PATH = "config.json"
+
+# Protocolo em duas fases para os manifestos:
+#   1. sonda barata: só a coluna de versão/carimbo (`versao` ou `atualizado_em`);
+#   2. se mudou, delta (função remota `manifesto_delta`): só os itens adicionados, alterados ou removidos
+#      desde o carimbo local. O resultado é conferido pela assinatura; qualquer falha cai no snapshot completo.
+# A última versão remota de cada manifesto fica no catálogo (feed "manifesto_<nome>"), base dos deltas.
+
+# manifesto -> (tabela, coluna de carimbo)
+TABELAS_MANIFESTO = {
+    "clientes": ("updates_clientes", "atualizado_em"),
+    "entretenimento": ("entretenimento_updates", "versao"),
+}
+
+supabase = backend_local.obter_cliente()
+
+
+def carregar_config():
+    if not os.path.exists(CONFIG_PATH):
+        return 101
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            config_data = json.load(file)
+            return int(config_data.get("tela_id", 101))
+    except:
+        return 101
+
+
+
+def _consulta(tabela, colunas, filtro):
+    consulta = supabase.table(tabela).select(colunas)
+    for coluna, valor in filtro.items():
+        consulta = consulta.eq(coluna, valor)
+    return consulta
+
+
+def sondar(tabela, coluna, filtro=None):
+    """Fase 1: só o carimbo da linha mais recente (ou None se não há linha)."""
+    response = _consulta(tabela, coluna, filtro or {}).order(coluna, desc=True).limit(1).execute()
+    return response.data[0][coluna] if response.data else None
+
+
+def aplicar_delta(local, delta, chaves):
+    """Reconstrói o manifesto novo a partir do local e do delta retornado por `manifesto_delta`."""
+    dados = {chave: valor for chave, valor in local.items() if chave not in delta.get("campos_removidos", [])}
+    dados.update(delta.get("campos", {}))
+    for lista, mudancas in delta.get("itens", {}).items():
+        campo = chaves[lista]
+        itens = {item.get(campo): item for item in local.get(lista, [])}
+        for chave in mudancas.get("removidos", []):
+            itens.pop(chave, None)
+        for item in mudancas.get("alterados", []) + mudancas.get("adicionados", []):
+            itens[item.get(campo)] = item
+        ordem = mudancas.get("ordem") or list(itens)
+        dados[lista] = [itens[chave] for chave in ordem if chave in itens]
+    return dados
+
+
+def _buscar_delta(nome, filtro, local, carimbo_local):
+    tabela, coluna = TABELAS_MANIFESTO[nome]
+    response = supabase.rpc("manifesto_delta", {
+        "manifesto": nome, "tabela": tabela, "coluna_carimbo": coluna, "filtro": filtro, "desde": carimbo_local,
+    }).execute()
+    delta = response.data
+    if not delta or delta.get("snapshot") or str(delta.get("base")) != str(carimbo_local):
+        return None, None
+    dados = aplicar_delta(local, delta, catalogo.CHAVES_ITEM[nome])
+    if delta.get("assinatura") != backend_local.assinatura_manifesto(dados):
+        print(f"⚠️ Delta do manifesto '{nome}' não confere com a assinatura. Buscando snapshot completo.")
+        return None, None
+    itens = sum(len(m.get("adicionados", [])) + len(m.get("alterados", [])) + len(m.get("removidos", []))
+                for m in delta.get("itens", {}).values())
+    print(f"🧩 Manifesto '{nome}' atualizado por delta ({itens} item(ns))")
+    return dados, delta.get("carimbo")
+
+
+def _buscar_snapshot(nome, filtro):
+    tabela, coluna = TABELAS_MANIFESTO[nome]
+    try:
+        response = _consulta(tabela, f"{coluna}, json_data", filtro).order(coluna, desc=True).limit(1).execute()
+    except Exception as e:
+        # Tabela sem a coluna de carimbo: só o snapshot, como antes
+        print(f"⚠️ Carimbo indisponível em {tabela} ({e}). Buscando só o manifesto.")
+        response = _consulta(tabela, "json_data", filtro).limit(1).execute()
+    if not response.data:
+        return None, None
+    return response.data[0]["json_data"], response.data[0].get(coluna)
+
+
+def remoto_salvo(nome):
+    """(json_data, carimbo) da última versão remota conhecida do manifesto, ou (None, None)."""
+    salvo, _ = catalogo.carregar_feed(f"manifesto_{nome}")
+    return (salvo["json_data"], salvo["carimbo"]) if salvo else (None, None)
+
+
+def lembrar_remoto(nome, dados, carimbo):
+    """Guarda a versão remota recebida (base do próximo delta). Não escreve nada se não mudou."""
+    catalogo.salvar_feed(f"manifesto_{nome}", {"carimbo": carimbo, "json_data": dados},
+                         None if carimbo is None else str(carimbo))
+
+
+def buscar_manifesto(nome, filtro=None):
+    """Retorna (json_data, carimbo) do manifesto remoto, trafegando o mínimo possível."""
+    filtro = filtro or {}
+    tabela, coluna = TABELAS_MANIFESTO[nome]
+    local, carimbo_local = remoto_salvo(nome)
+
+    carimbo = None
+    try:
+        carimbo = sondar(tabela, coluna, filtro)
+    except Exception as e:
+        print(f"⚠️ Falha na sonda de '{nome}': {e}")
+
+    if local is not None and carimbo is not None:
+        if str(carimbo) == str(carimbo_local):
+            print(f"📡 Manifesto '{nome}' sem mudanças (carimbo {carimbo})")
+            return local, carimbo_local
+        try:
+            dados, carimbo_delta = _buscar_delta(nome, filtro, local, carimbo_local)
+            if dados is not None:
+                carimbo_delta = carimbo if carimbo_delta is None else carimbo_delta
+                lembrar_remoto(nome, dados, carimbo_delta)
+                return dados, carimbo_delta
+        except Exception as e:
+            print(f"⚠️ Delta indisponível para '{nome}': {e}")
+
+    dados, carimbo_snapshot = _buscar_snapshot(nome, filtro)
+    # Snapshot sem a coluna de carimbo: vale o da sonda (pode continuar None se ela também falhou)
+    carimbo = carimbo if carimbo_snapshot is None else carimbo_snapshot
+    if dados is not None:
+        lembrar_remoto(nome, dados, carimbo)
+    return dados, carimbo
+
+
+def buscar_clientes(cliente_id=None):
+    # tela_id lido na hora: na primeira execução o config.json só existe depois da tela de configuração
+    dados, _ = buscar_manifesto("clientes", {"cliente_id": cliente_id or carregar_config()})
+    return dados
+
+
+def buscar_entretenimento():
+    dados, versao = buscar_manifesto("entretenimento")
+    return {"versao": versao, "json_data": dados} if dados is not None else None
+
+
+def buscar_noticias():
+    if supabase is None:
+        print("⚠️ Supabase não disponível. Pulando atualização de notícias.")
+        return None, None
+    try:
+        # Sonda: se o carimbo não mudou, as notícias locais valem e o `valor` (o blob inteiro) nem é pedido
+        noticias_local, carimbo_local = catalogo.carregar_feed("noticias")
+        if noticias_local is not None and carimbo_local is not None:
+            response = supabase.table("noticias").select("atualizado_em").eq("tipo", "noticias").execute()
+            if response.data and response.data[0]["atualizado_em"] == carimbo_local:
+                return noticias_local, carimbo_local
+
+        response = supabase.table("noticias").select("valor, atualizado_em").eq("tipo", "noticias").execute()
+        if response.data:
+            data = response.data[0]
+            noticias = data["valor"]
+            atualizado_em = data["atualizado_em"]
+            if isinstance(noticias, str):
+                noticias = json.loads(noticias)
+            return noticias, atualizado_em
+    except Exception as e:
+        print(f"❌ Erro ao buscar notícias no Supabase: {e}")
+    return None, None
+
+
+class ManifestoCiclo:
+    """Snapshot dos manifestos remotos de um ciclo de sincronização.
+
+    Cada tabela (`updates_clientes`, `entretenimento_updates`, `noticias`) é consultada
+    no máximo uma vez; as fases de contagem e de download compartilham o mesmo resultado.
+    """
+
+    def __init__(self, cliente_id=None):
+        self.cliente_id = cliente_id or carregar_config()
+        self._dados = {}
+        self._locks = {nome: threading.Lock() for nome in ("clientes", "entretenimento", "noticias")}
+
+    def preencher(self, nome, valor):
+        """Usa um valor já recebido (ex.: pelo pacote de sincronização) em vez de consultar a tabela."""
+        with self._locks[nome]:
+            self._dados[nome] = valor
+
+    def _obter(self, nome, buscar):
+        with self._locks[nome]:
+            if nome not in self._dados:
+                self._dados[nome] = buscar()
+            return self._dados[nome]
+
+    def clientes(self):
+        """`json_data` de `updates_clientes` para esta tela (ou None)."""
+        return self._obter("clientes", lambda: buscar_clientes(self.cliente_id))
+
+    def entretenimento(self):
+        """Linha mais recente de `entretenimento_updates`: {"versao", "json_data"} (ou None)."""
+        return self._obter("entretenimento", buscar_entretenimento)
+
+    def noticias(self):
+        """Tupla (noticias, atualizado_em)."""
+        return self._obter("noticias", buscar_noticias)
@@ -1,78 +1,48 @@
 import os
-import json
-import requests
 from PIL import Image
-from config.database import supabase
+from atualizadores import downloader, armazem, manifesto, prioridade, catalogo, indice, verificacao, retentativas
 
-NEWS_JSON_PATH = "cache/noticias.json"
 LOCAL_NEWS_FOLDER = os.path.join("cache", "News")
-CONFIG_PATH = "config.json"
 S3_BUCKET = "imagens-noticias"
 S3_PREFIX = "News/"
 
-CONFIG_PATH = "config.json"
-
-def carregar_config():
-    if not os.path.exists(CONFIG_PATH):
-        return 101
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
-            config_data = json.load(file)
-            return int(config_data.get("tela_id", 101))
-    except:
-        return 101
-
-CLIENTE_ID = carregar_config()
-
-
-def obter_noticias_supabase():
-    if supabase is None:
-        print("⚠️ Supabase não disponível. Pulando atualização de notícias.")
-        return None, None
-    try:
-        response = supabase.table("noticias").select("valor, atualizado_em").eq("tipo", "noticias").execute()
-        if response.data:
-            data = response.data[0]
-            noticias = data["valor"]
-            atualizado_em = data["atualizado_em"]
-            if isinstance(noticias, str):
-                noticias = json.loads(noticias)
-            return noticias, atualizado_em
-    except Exception as e:
-        print(f"❌ Erro ao buscar notícias no Supabase: {e}")
-    return None, None
-
 def carregar_noticias_local():
-    if not os.path.exists(NEWS_JSON_PATH):
-        return None, None
     try:
-        with open(NEWS_JSON_PATH, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return data.get("noticias"), data.get("atualizado_em")
+        return catalogo.carregar_feed("noticias")
     except Exception as e:
         print(f"❌ Erro ao carregar notícias locais: {e}")
         return None, None
 
 def salvar_noticias_localmente(noticias, atualizado_em):
     try:
-        with open(NEWS_JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump({"noticias": noticias, "atualizado_em": atualizado_em}, file, indent=4, ensure_ascii=False)
-        print(f"✅ Notícias salvas em {NEWS_JSON_PATH}")
+        catalogo.salvar_feed("noticias", noticias, atualizado_em)
+        print("✅ Notícias salvas no catálogo local")
     except Exception as e:
         print(f"❌ Erro ao salvar notícias localmente: {e}")
 
-def limpar_imagens_antigas_local():
+def imagens_referenciadas(noticias):
+    """Conjunto de nomes de imagem usados por um payload de notícias."""
+    if not noticias:
+        return set()
+    return {noticia["imagem"] for lista in noticias.values() for noticia in lista if noticia.get("imagem")}
+
+def remover_imagens_nao_referenciadas(noticias):
     if not os.path.exists(LOCAL_NEWS_FOLDER):
         print("⚠️ Pasta de notícias ainda não existe. Pulando limpeza.")
         return
+    referenciadas = imagens_referenciadas(noticias)
     for filename in os.listdir(LOCAL_NEWS_FOLDER):
         file_path = os.path.join(LOCAL_NEWS_FOLDER, filename)
+        if downloader.caminho_final(filename) in referenciadas:
+            continue
         try:
             if os.path.isfile(file_path):
                 os.remove(file_path)
+                indice.remover(file_path)
                 print(f"🗑️ Imagem local removida: {file_path}")
         except Exception as e:
             print(f"⚠️ Erro ao remover {file_path}: {e}")
+    armazem.coletar_lixo()
 
 def verificar_imagem_valida(path):
     try:
@@ -83,8 +53,8 @@ def verificar_imagem_valida(path):
         print(f"❌ Imagem inválida ou corrompida: {path} — {e}")
         return False
     
-def contar_imagens_faltando():
-    noticias, _ = obter_noticias_supabase()
+def contar_imagens_faltando(manifesto_ciclo=None):
+    noticias, _ = (manifesto_ciclo or manifesto.ManifestoCiclo()).noticias()
     if not noticias:
         return 0
 
@@ -94,12 +64,14 @@ def contar_imagens_faltando():
     )
 
 
-def baixar_imagens_noticias_s3(noticias, callback=None):
+def baixar_imagens_noticias_s3(noticias, callback=None, ja_sincronizadas=()):
+    """Baixa as imagens ausentes. Imagens em `ja_sincronizadas` que estão no disco não são reabertas."""
     if not noticias:
         return
 
     os.makedirs(LOCAL_NEWS_FOLDER, exist_ok=True)
 
+    tarefas = []
     for origem in noticias:
         for noticia in noticias[origem]:
             nome_imagem = noticia.get("imagem")
@@ -108,35 +80,27 @@ def baixar_imagens_noticias_s3(noticias, callback=None):
 
             local_path = os.path.join(LOCAL_NEWS_FOLDER, nome_imagem)
 
-            # Se a imagem já existe e é válida, pula o download
-            if os.path.exists(local_path) and verificar_imagem_valida(local_path):
+            # Se a imagem já existe (e foi validada no download anterior ou é válida agora), pula o download.
+            # O PIL só reabre imagens que ainda não têm verificação registrada para o tamanho/mtime atuais.
+            if os.path.exists(local_path) and (nome_imagem in ja_sincronizadas or verificacao.validar_uma_vez(local_path, verificar_imagem_valida)):
                 continue
 
             url = f"https://{S3_BUCKET}.s3.sa-east-1.amazonaws.com/{S3_PREFIX}{nome_imagem}"
+            tarefas.append((url, local_path, {
+                "timeout": 10,
+                "validar": verificar_imagem_valida,
+                "dono": "noticias",
+                "prioridade": prioridade.prioridade_noticia(len(tarefas)),
+            }))
 
-            for tentativa in range(3):
-                try:
-                    response = requests.get(url, timeout=10)
-                    if response.status_code == 200:
-                        with open(local_path, "wb") as f:
-                            f.write(response.content)
-
-                        if verificar_imagem_valida(local_path):
-                            if callback:
-                                callback()  # ✅ Atualiza a barra de progresso
-                            break
-                        else:
-                            os.remove(local_path)
-                    else:
-                        continue
-                except:
-                    continue
-
-def verificar_e_atualizar_noticias(callback=None):
+    retentativas.manter_apenas("noticias", [destino for _, destino, _ in tarefas])
+    downloader.obter_pool().baixar_em_lote(tarefas, callback=callback)  # ✅ Atualiza a barra de progresso
+
+def verificar_e_atualizar_noticias(callback=None, manifesto_ciclo=None):
     print("🔄 Verificando atualização das notícias...")
 
     noticias_local, timestamp_local = carregar_noticias_local()
-    noticias_supabase, timestamp_supabase = obter_noticias_supabase()
+    noticias_supabase, timestamp_supabase = (manifesto_ciclo or manifesto.ManifestoCiclo()).noticias()
 
     if not noticias_supabase:
         print("⚠️ Nenhuma notícia disponível no Supabase. Mantendo a versão local.")
@@ -144,9 +108,15 @@ def verificar_e_atualizar_noticias(callback=None):
 
     if timestamp_supabase != timestamp_local:
         print(f"🆕 Atualização detectada! Novo timestamp: {timestamp_supabase}")
-        limpar_imagens_antigas_local()
-        baixar_imagens_noticias_s3(noticias_supabase, callback=callback)
+
+        # 🔀 Diff entre o payload antigo e o novo: só baixa o que entrou e só apaga o que saiu
+        antigas = imagens_referenciadas(noticias_local)
+        novas = imagens_referenciadas(noticias_supabase)
+        print(f"📰 Imagens: {len(novas - antigas)} nova(s), {len(antigas - novas)} removida(s), {len(novas & antigas)} mantida(s)")
+
+        baixar_imagens_noticias_s3(noticias_supabase, callback=callback, ja_sincronizadas=antigas & novas)
         salvar_noticias_localmente(noticias_supabase, timestamp_supabase)
+        remover_imagens_nao_referenciadas(noticias_supabase)
         return noticias_supabase
 
     print("✅ Notícias já estão atualizadas. Nenhuma ação necessária.")
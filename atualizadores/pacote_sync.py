@@ -0,0 +1,159 @@
+import os
+import json
+import time
+from atualizadores import http_cliente, catalogo, manifesto, agendador
+
+CONFIG_PATH = "config.json"
+
+# Pacote de sincronização: uma única requisição traz os carimbos de todos os feeds (clientes,
+# entretenimento, notícias, cotação, lives, clima e versão do software) e só os dados que mudaram
+# em relação aos carimbos enviados. Feed ausente na resposta (ou servidor sem o endpoint) cai na
+# consulta individual de sempre.
+#
+#   POST /api/sync  {"tela_id": 101, "carimbos": {"noticias": "...", ...}}
+#   -> {"feeds": {"noticias": {"carimbo": "...", "dados": {...}}, "cotacao": {"carimbo": "..."}, ...}}
+#
+# Um feed sem "dados" não mudou: vale a cópia local. "retry_after" (segundos), se presente, adia as
+# próximas consultas de todos os feeds (ver agendador.registrar_dica).
+#
+# O pacote não substitui as tarefas por feed do atualizador: a tarefa "pacote" só busca e guarda o que
+# veio (feeds leves direto no catálogo, manifestos e notícias como base do próximo ciclo) e antecipa as
+# tarefas dos feeds que mudaram. Cada tarefa continua no seu ritmo e orçamento; enquanto o último pacote
+# é recente e trouxe o seu feed, ela usa essa cópia em vez de consultar o servidor.
+
+# Valores padrão — podem ser sobrescritos pela chave "pacote_sync" do config.json
+PACOTE_URL = "http://15.228.8.3:8000/api/sync"
+PAUSA_SEM_ENDPOINT = 6 * 3600  # servidor sem /api/sync: volta a tentar o pacote só depois disso
+VALIDADE = 1800                # por quanto tempo o último pacote dispensa as consultas individuais
+
+FEEDS = ("clientes", "entretenimento", "noticias", "cotacao", "lives", "clima", "software")
+
+
+def carregar_config_pacote():
+    config = {"ativo": True, "url": PACOTE_URL, "validade": VALIDADE}
+    if not os.path.exists(CONFIG_PATH):
+        return config
+    try:
+        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
+            config.update(json.load(file).get("pacote_sync", {}))
+    except:
+        pass
+    return config
+
+
+def carimbos_locais():
+    carimbos = {nome: manifesto.remoto_salvo(nome)[1] for nome in ("clientes", "entretenimento")}
+    for nome in ("noticias", "cotacao", "lives", "clima", "software"):
+        carimbos[nome] = catalogo.carregar_feed(nome)[1]
+    return carimbos
+
+
+def buscar_pacote(tela_id=None):
+    """Retorna o dicionário de feeds do pacote, ou None se o pacote não está disponível."""
+    tela_id = tela_id or manifesto.carregar_config()
+    config = carregar_config_pacote()
+    if not config["ativo"] or time.time() < float(catalogo.obter_metadado("pacote_sem_endpoint_ate", 0)):
+        return None
+    try:
+        response = http_cliente.post(config["url"], json={"tela_id": tela_id, "carimbos": carimbos_locais()},
+                                     timeout=15, tentativas=1)
+        if response.status_code in (404, 405, 501):
+            print("ℹ️ Servidor sem pacote de sincronização. Usando consultas individuais.")
+            catalogo.salvar_metadado("pacote_sem_endpoint_ate", time.time() + PAUSA_SEM_ENDPOINT)
+            return None
+        response.raise_for_status()
+        corpo = response.json()
+        feeds = corpo.get("feeds", {})
+        if corpo.get("retry_after"):
+            agendador.registrar_dica(corpo["retry_after"], "do pacote")
+    except Exception as e:
+        print(f"⚠️ Falha no pacote de sincronização: {e}")
+        return None
+    catalogo.salvar_metadado("pacote_feeds", json.dumps(sorted(feeds)))
+    catalogo.salvar_metadado("pacote_recebido_em", time.time())
+    print(f"📦 Pacote de sincronização: {len(feeds)} feed(s), {sum('dados' in f for f in feeds.values())} com mudanças")
+    return feeds
+
+
+def recente(nome=None):
+    """True se um pacote foi recebido há pouco (e trouxe o feed `nome`): vale a cópia local, sem consulta."""
+    validade = carregar_config_pacote()["validade"]
+    if time.time() - float(catalogo.obter_metadado("pacote_recebido_em", 0)) >= validade:
+        return False
+    return nome is None or nome in json.loads(catalogo.obter_metadado("pacote_feeds", "[]"))
+
+
+def _valor(feeds, nome, local):
+    """(dados, carimbo) do feed no pacote; a cópia local quando não mudou; None se o feed não veio."""
+    entrada = feeds.get(nome)
+    if entrada is None:
+        return None
+    if "dados" in entrada:
+        return entrada["dados"], entrada.get("carimbo")
+    return local, entrada.get("carimbo")
+
+
+def preparar_ciclo(feeds, tela_id=None):
+    """ManifestoCiclo já preenchido com os manifestos do pacote (os ausentes são consultados normalmente)."""
+    ciclo = manifesto.ManifestoCiclo(tela_id)
+    for nome in ("clientes", "entretenimento"):
+        valor = _valor(feeds, nome, manifesto.remoto_salvo(nome)[0])
+        if valor is None or valor[0] is None:
+            continue
+        dados, carimbo = valor
+        manifesto.lembrar_remoto(nome, dados, carimbo)
+        ciclo.preencher(nome, dados if nome == "clientes" else {"versao": carimbo, "json_data": dados})
+    noticias = _valor(feeds, "noticias", catalogo.carregar_feed("noticias")[0])
+    if noticias is not None and noticias[0] is not None:
+        ciclo.preencher("noticias", noticias)
+    return ciclo
+
+
+def _aplicar_feed(feeds, nome):
+    valor = _valor(feeds, nome, None)
+    if valor is None:
+        return False
+    dados, carimbo = valor
+    if dados is not None:
+        catalogo.salvar_feed(nome, dados, carimbo)
+    return True
+
+
+def ciclo_do_pacote():
+    """ManifestoCiclo com o que o último pacote trouxe, ou None sem pacote recente (a tarefa consulta sozinha)."""
+    if not recente():
+        return None
+    ciclo = manifesto.ManifestoCiclo()
+    for nome in ("clientes", "entretenimento"):
+        dados, carimbo = manifesto.remoto_salvo(nome)
+        if dados is not None and recente(nome):
+            ciclo.preencher(nome, dados if nome == "clientes" else {"versao": carimbo, "json_data": dados})
+    noticias, carimbo = catalogo.carregar_feed("pacote_noticias")
+    if noticias is not None and recente("noticias"):
+        ciclo.preencher("noticias", (noticias, carimbo))
+    return ciclo
+
+
+def sincronizar(disparar=None):
+    """Tarefa "pacote": uma ida ao servidor; guarda o que veio e chama `disparar(tarefa)` para os feeds que mudaram.
+
+    Sem pacote (servidor sem o endpoint, falha de rede) não há nada a fazer: as tarefas por feed consultam sozinhas.
+    """
+    feeds = buscar_pacote()
+    if feeds is None:
+        return True
+    for nome in ("clientes", "entretenimento"):
+        valor = _valor(feeds, nome, manifesto.remoto_salvo(nome)[0])
+        if valor is not None and valor[0] is not None:
+            manifesto.lembrar_remoto(nome, *valor)
+    noticias = _valor(feeds, "noticias", catalogo.carregar_feed("noticias")[0])
+    if noticias is not None and noticias[0] is not None:
+        catalogo.salvar_feed("pacote_noticias", *noticias)
+    # Feeds leves vão direto para o catálogo (widgets e verificador leem de lá)
+    for nome in ("cotacao", "lives", "clima", "software"):
+        _aplicar_feed(feeds, nome)
+    # Os que trazem downloads (vídeos, imagens) ficam com a própria tarefa, antecipada aqui
+    for nome in ("clientes", "entretenimento", "noticias"):
+        if "dados" in feeds.get(nome, {}) and disparar:
+            disparar(nome)
+    return True
@@ -0,0 +1,85 @@
+import datetime
+
+# Prioridade dos downloads pendentes: o que a tela vai exibir primeiro baixa primeiro.
+# Cada prioridade é uma tupla (classe, posição na rotação, tamanho) — menor = mais urgente.
+
+EXIBICAO_IMEDIATA = 0   # propagandas da rotação, banners ativos e avisos vigentes hoje
+EM_BREVE = 1            # primeiro vídeo de cada categoria de entretenimento, imagens de notícias
+FUTURO = 2              # avisos que ainda vão entrar em vigor
+RESTANTE = 3            # demais vídeos de entretenimento
+NAO_EXIBIDO = 4         # avisos já expirados
+
+PRIORIDADE_PADRAO = (FUTURO, 0, 0)
+
+
+def aviso_vigente(aviso, hoje=None):
+    """Mesma regra do InfoWidget: data_ini <= hoje <= data_fim. Retorna None se as datas forem inválidas."""
+    hoje = hoje or datetime.date.today()
+    try:
+        data_ini = datetime.datetime.strptime(aviso["data_ini"], "%Y-%m-%d").date()
+        data_fim = datetime.datetime.strptime(aviso["data_fim"], "%Y-%m-%d").date()
+    except (KeyError, TypeError, ValueError):
+        return None
+    return data_ini <= hoje <= data_fim
+
+
+def _tamanho(item):
+    try:
+        return int(item.get("tamanho") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def prioridades_clientes(json_data, hoje=None):
+    """Mapa caminho -> prioridade para os itens de `updates_clientes`."""
+    hoje = hoje or datetime.date.today()
+    prioridades = {}
+
+    def ativos(lista):
+        return [item for item in lista if item.get("status") != "deleted"]
+
+    # Propagandas entram intercaladas com o entretenimento em ordem de manifesto (VideoWidget)
+    for posicao, item in enumerate(ativos(json_data.get("Propagandas", []))):
+        if item.get("video"):
+            prioridades[item["video"]] = (EXIBICAO_IMEDIATA, posicao, _tamanho(item))
+
+    # Banners ativos aparecem assim que o ServicesWidget recarrega
+    for posicao, item in enumerate(ativos(json_data.get("Banners", []))):
+        if item.get("imagem"):
+            prioridades[item["imagem"]] = (EXIBICAO_IMEDIATA, posicao, _tamanho(item))
+
+    for posicao, item in enumerate(ativos(json_data.get("CondominiumNotices", []))):
+        if not item.get("mensagem"):
+            continue
+        vigente = aviso_vigente(item, hoje)
+        if vigente:
+            classe = EXIBICAO_IMEDIATA
+        elif vigente is not None and item["data_ini"] > hoje.isoformat():
+            classe = FUTURO
+        else:
+            classe = NAO_EXIBIDO
+        prioridades[item["mensagem"]] = (classe, posicao, _tamanho(item))
+
+    return prioridades
+
+
+def prioridades_entretenimento(json_data):
+    """Mapa caminho -> prioridade para os vídeos de entretenimento.
+
+    A rotação do VideoWidget intercala uma propaganda com um vídeo de cada categoria, então o
+    primeiro vídeo de cada categoria é necessário logo; os demais só bem depois.
+    """
+    prioridades = {}
+    posicao_por_categoria = {}
+    for item in json_data.get("entretenimento", []):
+        if item.get("status") == "deleted" or not item.get("video"):
+            continue
+        posicao = posicao_por_categoria.get(item.get("categoria"), 0)
+        posicao_por_categoria[item.get("categoria")] = posicao + 1
+        classe = EM_BREVE if posicao == 0 else RESTANTE
+        prioridades[item["video"]] = (classe, posicao, _tamanho(item))
+    return prioridades
+
+
+def prioridade_noticia(posicao):
+    return (EM_BREVE, posicao, 0)
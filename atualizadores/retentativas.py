@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import random
+import importlib
+from atualizadores import catalogo, janelas
+
+# Fila persistente de downloads que falharam: em vez de esperar o próximo ciclo de sincronização
+# (20 min) para tentar de novo, cada item tem seu próprio backoff com jitter — de segundos a poucos
+# minutos — e a fila sobrevive a reinícios. Só entram downloads de conteúdo (com "dono").
+
+BACKOFF_BASE = 10          # segundos até a primeira nova tentativa
+BACKOFF_MAX = 10 * 60      # teto do intervalo entre tentativas
+MAX_TENTATIVAS = 12        # depois disso o item sai da fila e volta a depender do ciclo normal
+
+
+def _espera(tentativas):
+    """Backoff exponencial com jitter (50% a 150% do intervalo), para as telas não tentarem juntas."""
+    return min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (tentativas - 1)) * random.uniform(0.5, 1.5)
+
+
+def _serializar_opcoes(opcoes):
+    # O validador é uma função: guarda o nome qualificado para reimportá-la na nova tentativa
+    opcoes = dict(opcoes)
+    validar = opcoes.get("validar")
+    if validar is not None:
+        opcoes["validar"] = f"{validar.__module__}:{validar.__qualname__}"
+    return json.dumps(opcoes, sort_keys=True)
+
+
+def _carregar_opcoes(texto):
+    opcoes = json.loads(texto)
+    if opcoes.get("validar"):
+        modulo, nome = opcoes["validar"].split(":", 1)
+        opcoes["validar"] = getattr(importlib.import_module(modulo), nome)
+    return opcoes
+
+
+def registrar_falha(url, destino, opcoes, prioridade, limite=MAX_TENTATIVAS):
+    """Coloca (ou mantém) o download na fila, agendando a próxima tentativa conforme o histórico do item.
+
+    `limite` encurta a fila para falhas que dificilmente se resolvem sozinhas (ex.: checksum divergente).
+    """
+    if not opcoes.get("dono"):
+        return
+    conexao = catalogo.conectar()
+    agora = time.time()
+    with conexao:
+        linha = conexao.execute("SELECT tentativas FROM retentativas WHERE destino = ?", (destino,)).fetchone()
+        tentativas = (linha["tentativas"] if linha else 0) + 1
+        if tentativas > limite:
+            conexao.execute("DELETE FROM retentativas WHERE destino = ?", (destino,))
+            print(f"⏹️ {os.path.basename(destino)}: {limite} tentativas sem sucesso, fica para o próximo ciclo")
+            return
+        conexao.execute(
+            """INSERT INTO retentativas (destino, url, opcoes, prioridade, tentativas, proxima_em, criada_em)
+               VALUES (?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(destino) DO UPDATE SET url = excluded.url, opcoes = excluded.opcoes,
+                   prioridade = excluded.prioridade, tentativas = excluded.tentativas, proxima_em = excluded.proxima_em""",
+            (destino, url, _serializar_opcoes(opcoes), json.dumps(prioridade), tentativas, agora + _espera(tentativas), agora),
+        )
+
+
+def adiar(destino, ate):
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute("UPDATE retentativas SET proxima_em = ? WHERE destino = ?", (ate, destino))
+
+
+def resolver(destino):
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute("DELETE FROM retentativas WHERE destino = ?", (destino,))
+
+
+def manter_apenas(dono, destinos):
+    """Chamado pelo ciclo completo: descarta da fila o que `dono` não precisa mais baixar."""
+    destinos = set(destinos)
+    conexao = catalogo.conectar()
+    linhas = conexao.execute("SELECT destino, opcoes FROM retentativas").fetchall()
+    obsoletos = [(linha["destino"],) for linha in linhas
+                 if json.loads(linha["opcoes"]).get("dono") == dono and linha["destino"] not in destinos]
+    if obsoletos:
+        with conexao:
+            conexao.executemany("DELETE FROM retentativas WHERE destino = ?", obsoletos)
+
+
+def pendentes():
+    return catalogo.conectar().execute("SELECT COUNT(*) FROM retentativas").fetchone()[0]
+
+
+def processar_fila(ao_recuperar=None):
+    """Repete os downloads cuja próxima tentativa já venceu.
+
+    `ao_recuperar` mapeia dono -> função chamada quando algum arquivo dele foi recuperado
+    (ex.: a sincronização do manifesto, que publica o conteúdo novo sem esperar o ciclo).
+    """
+    from atualizadores import downloader
+
+    ao_recuperar = ao_recuperar or {}
+    vencidos = catalogo.conectar().execute(
+        "SELECT * FROM retentativas WHERE proxima_em <= ? ORDER BY proxima_em", (time.time(),)
+    ).fetchall()
+    if not vencidos:
+        return
+
+    pool = downloader.obter_pool()
+    futuros = []
+    config_janelas = janelas.carregar_janelas()
+    for linha in vencidos:
+        if os.path.exists(linha["destino"]):
+            resolver(linha["destino"])  # o ciclo normal chegou antes
+            continue
+        prioridade = tuple(json.loads(linha["prioridade"]))  # a fila do pool continua ordenando por prioridade
+        classe = janelas.classe_do_destino(linha["destino"])
+        if not janelas.liberado(classe, prioridade, janelas=config_janelas):
+            # 🌙 Janela de download fechada: a nova tentativa fica para a abertura (espalhada nos primeiros 10 min)
+            abertura = janelas.proxima_abertura(classe, janelas=config_janelas)
+            adiar(linha["destino"], abertura.timestamp() + random.uniform(0, 600))
+            continue
+        try:
+            opcoes = _carregar_opcoes(linha["opcoes"])
+        except Exception as e:
+            print(f"⚠️ Opções inválidas na fila de retentativas ({linha['destino']}): {e}")
+            resolver(linha["destino"])
+            continue
+        print(f"🔁 Nova tentativa ({linha['tentativas']}/{MAX_TENTATIVAS}): {os.path.basename(linha['destino'])}")
+        futuros.append((opcoes.get("dono"), pool.enviar(linha["url"], linha["destino"], prioridade=prioridade, **opcoes)))
+
+    recuperados = {dono for dono, futuro in futuros if futuro.result()}
+    for dono in recuperados:
+        print(f"✅ Downloads de '{dono}' recuperados pela fila de retentativas")
+        if dono in ao_recuperar:
+            ao_recuperar[dono]()
@@ -0,0 +1,180 @@
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.server import serve
+from atualizadores.backend_local import BackendLocal
+
+# Servidor local do pacote de sincronização (POST /api/sync) e do canal push (websocket no formato do
+# Realtime do Supabase, na porta seguinte), para testes sem o backend real.
+# Os feeds vêm do mesmo arquivo JSON do backend_local. Uso:
+#   python -m atualizadores.servidor_local backend.json 8787
+# e no config.json: {"backend_local": "backend.json", "pacote_sync": {"url": "http://127.0.0.1:8787/api/sync"},
+#                    "canal_push": {"url": "ws://127.0.0.1:8788/realtime/v1/websocket"}}
+
+
+def _primeira(resposta):
+    return resposta.data[0] if resposta.data else None
+
+
+def _clientes(backend, tela_id):
+    linha = _primeira(backend.table("updates_clientes").select("atualizado_em, json_data").eq("cliente_id", tela_id).limit(1).execute())
+    return linha and (linha["atualizado_em"], linha["json_data"])
+
+
+def _entretenimento(backend, tela_id):
+    linha = _primeira(backend.table("entretenimento_updates").select("versao, json_data").order("versao", desc=True).limit(1).execute())
+    return linha and (linha["versao"], linha["json_data"])
+
+
+def _valor_por_tipo(tabela, tipo):
+    def buscar(backend, tela_id):
+        linha = _primeira(backend.table(tabela).select("valor, atualizado_em").eq("tipo", tipo).execute())
+        return linha and (linha["atualizado_em"], linha["valor"])
+    return buscar
+
+
+def _lives(backend, tela_id):
+    linhas = backend.table("cameras").select("url, data_criacao, timing").order("data_criacao", desc=True).execute().data
+    return linhas and (linhas[0]["data_criacao"], [{"url": item["url"], "timing": item.get("timing", 30)} for item in linhas])
+
+
+def _clima(backend, tela_id):
+    linha = _primeira(backend.table("clima").select("atualizado_em, dados").limit(1).execute())
+    return linha and (linha["atualizado_em"], linha["dados"])
+
+
+def _software(backend, tela_id):
+    linha = _primeira(backend.table("sistema_update").select("versao_disponivel, download_url").eq("cliente_id", tela_id).execute())
+    return linha and (linha["versao_disponivel"], linha)
+
+
+FEEDS = {
+    "clientes": _clientes,
+    "entretenimento": _entretenimento,
+    "noticias": _valor_por_tipo("noticias", "noticias"),
+    "cotacao": _valor_por_tipo("cotacoes", "cotacao"),
+    "lives": _lives,
+    "clima": _clima,
+    "software": _software,
+}
+
+
+def montar_pacote(backend, tela_id, carimbos):
+    """Carimbo de cada feed e, só para os que mudaram em relação a `carimbos`, os dados."""
+    feeds = {}
+    for nome, buscar in FEEDS.items():
+        try:
+            atual = buscar(backend, tela_id)
+        except KeyError:
+            continue  # tabela sem as colunas esperadas: o cliente usa a consulta individual
+        if not atual:
+            continue
+        carimbo, dados = atual
+        feeds[nome] = {"carimbo": carimbo}
+        if str(carimbo) != str(carimbos.get(nome)):
+            feeds[nome]["dados"] = dados
+    return {"feeds": feeds}
+
+
+class ServidorPacote(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, backend, porta=0, porta_ws=0):
+        super().__init__(("127.0.0.1", porta), _Handler)
+        self.backend = backend
+        self.requisicoes = 0
+        self.assinantes = {}  # conexão websocket -> lista de postgres_changes assinados
+        self.assinantes_lock = threading.Lock()
+        self.ws = serve(self._sessao_ws, "127.0.0.1", porta_ws)
+        self.porta_ws = self.ws.socket.getsockname()[1]
+        threading.Thread(target=self.ws.serve_forever, name="servidor-canal", daemon=True).start()
+        backend.ouvir(self.avisar)
+
+    def shutdown(self):
+        self.ws.shutdown()
+        super().shutdown()
+
+    def _sessao_ws(self, conexao):
+        """Uma tela conectada ao canal: responde join e heartbeats como o Realtime."""
+        try:
+            for texto in conexao:
+                mensagem = json.loads(texto)
+                resposta = {}
+                if mensagem.get("event") == "phx_join":
+                    mudancas = mensagem.get("payload", {}).get("config", {}).get("postgres_changes", [])
+                    with self.assinantes_lock:
+                        self.assinantes[conexao] = mudancas
+                    resposta = {"postgres_changes": mudancas}
+                conexao.send(json.dumps({"topic": mensagem.get("topic"), "event": "phx_reply", "ref": mensagem.get("ref"),
+                                         "payload": {"status": "ok", "response": resposta}}))
+        except (ConnectionClosed, ValueError):
+            pass
+        finally:
+            with self.assinantes_lock:
+                self.assinantes.pop(conexao, None)
+
+    def derrubar_canal(self):
+        """Fecha todas as conexões do canal push (simula uma queda do Realtime)."""
+        with self.assinantes_lock:
+            conexoes = list(self.assinantes)
+        for conexao in conexoes:
+            conexao.close()
+
+    def avisar(self, tabela, tipo, registro):
+        """Envia a mudança a cada assinante cuja assinatura (tabela e filtro `coluna=eq.valor`) casa com ela."""
+        with self.assinantes_lock:
+            assinantes = list(self.assinantes.items())
+        for conexao, mudancas in assinantes:
+            if not any(_casa(mudanca, tabela, registro) for mudanca in mudancas):
+                continue
+            dados = {"schema": "public", "table": tabela, "type": tipo, "record": registro}
+            try:
+                conexao.send(json.dumps({"topic": "realtime:telas", "event": "postgres_changes",
+                                         "payload": {"data": dados}, "ref": None}, ensure_ascii=False))
+            except ConnectionClosed:
+                pass  # a sessão da conexão percebe a queda e remove o assinante
+
+
+def _casa(mudanca, tabela, registro):
+    if mudanca.get("table") != tabela:
+        return False
+    if not mudanca.get("filter"):
+        return True
+    coluna, valor = mudanca["filter"].split("=eq.", 1)
+    return str(registro.get(coluna)) == valor
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path != "/api/sync":
+            self.send_error(404)
+            return
+        self.server.requisicoes += 1
+        pedido = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        corpo = json.dumps(montar_pacote(self.server.backend, pedido.get("tela_id"), pedido.get("carimbos") or {}),
+                           ensure_ascii=False).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def iniciar(backend, porta=0, porta_ws=0):
+    """Sobe o servidor numa thread de fundo e o retorna (`server_port` e `porta_ws` têm as portas)."""
+    servidor = ServidorPacote(backend, porta, porta_ws)
+    threading.Thread(target=servidor.serve_forever, name="servidor-pacote", daemon=True).start()
+    return servidor
+
+
+if __name__ == "__main__":
+    caminho = sys.argv[1] if len(sys.argv) > 1 else "backend.json"
+    porta = int(sys.argv[2]) if len(sys.argv) > 2 else 8787
+    print(f"🧪 Pacote de sincronização local em http://127.0.0.1:{porta}/api/sync ({caminho})")
+    print(f"🧪 Canal push local em ws://127.0.0.1:{porta + 1}/realtime/v1/websocket")
+    ServidorPacote(BackendLocal(caminho), porta, porta + 1).serve_forever()
@@ -1,49 +1,23 @@
 import sys
 import os
-import json
 import time
+import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from config.database import supabase
-import requests
+from atualizadores import downloader, armazem, manifesto, http_cliente, prioridade, indice, verificacao, geracoes, retentativas, janelas
 
 BASE_DIR = getattr(__builtins__, '_MEIPASS', os.path.abspath("."))
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
-UPDATE_JSON_FILE = os.path.join(CACHE_DIR, "update.json")
-CONFIG_PATH = "config.json"
-S3_BASE_URL = "https://telas-clientes.s3.sa-east-1.amazonaws.com"
+S3_BUCKET = "telas-clientes"
+S3_BASE_URL = f"https://{S3_BUCKET}.s3.sa-east-1.amazonaws.com"
+CATEGORIAS = {"Propagandas": "video", "Banners": "imagem", "CondominiumNotices": "mensagem"}
+HORIZONTE_AVISOS = 2  # dias: avisos que entram em vigor até lá precisam estar no disco
 
 os.makedirs(CACHE_DIR, exist_ok=True)
 
-def carregar_config():
-    if not os.path.exists(CONFIG_PATH):
-        return 101
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
-            config_data = json.load(file)
-            return int(config_data.get("tela_id", 101))
-    except:
-        return 101
-
-CLIENTE_ID = carregar_config()
-
-def baixar_arquivo(url, destino, tentativas=3):
-    for tentativa in range(1, tentativas + 1):
-        try:
-            response = requests.get(url, stream=True, timeout=20)
-            if response.status_code == 200:
-                os.makedirs(os.path.dirname(destino), exist_ok=True)
-                with open(destino, "wb") as file:
-                    for chunk in response.iter_content(1024 * 1024 * 4):
-                        file.write(chunk)
-                return os.path.exists(destino)
-        except:
-            time.sleep(3)
-    return False
-
 def confirmar_atualizacao(cliente_id):
     try:
         url = f"http://15.228.8.3:8000/confirm-update/{cliente_id}"  # ou IP externo do seu backend
-        response = requests.post(url, timeout=10)
+        response = http_cliente.post(url, timeout=10)
         if response.status_code == 200:
             print("✅ Atualização confirmada com o servidor.")
         else:
@@ -53,81 +27,167 @@ def confirmar_atualizacao(cliente_id):
 
 
 def verificar_integridade_arquivos(json_data):
+    # 🗂️ Compara o manifesto com o índice de arquivos, sem consultar o disco item a item
+    indice.garantir_varredura()
+    presentes = indice.presentes(*CATEGORIAS)
     arquivos_faltando = []
-    for categoria in ["Propagandas", "Banners", "CondominiumNotices"]:
+    for categoria, chave in CATEGORIAS.items():
         for item in json_data.get(categoria, []):
             if item.get("status") == "deleted":
                 continue
-            caminho = item.get("video") if categoria == "Propagandas" else item.get("imagem") if categoria == "Banners" else item.get("mensagem")
+            caminho = item.get(chave)
             if not caminho:
                 continue
-            caminho_local = os.path.join(CACHE_DIR, caminho)
-            if not os.path.exists(caminho_local):
+            if indice.normalizar(caminho) not in presentes:
                 arquivos_faltando.append((categoria, caminho))
     return arquivos_faltando
 
-def contar_arquivos_faltando():
-    response = supabase.table("updates_clientes").select("json_data").eq("cliente_id", CLIENTE_ID).limit(1).execute()
-    if not response.data:
+def _inicio_vigencia(aviso):
+    try:
+        return datetime.datetime.strptime(aviso["data_ini"], "%Y-%m-%d")
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def arquivos_liberados(json_data, arquivos, prioridades):
+    """Separa os arquivos que baixam agora dos que esperam a janela de download da sua categoria."""
+    config_janelas = janelas.carregar_janelas()
+    inicios = {item["mensagem"]: _inicio_vigencia(item) for item in json_data.get("CondominiumNotices", []) if item.get("mensagem")}
+    liberados, adiados = [], []
+    for categoria, caminho in arquivos:
+        if janelas.liberado(categoria, prioridades.get(caminho), precisa_em=inicios.get(caminho), janelas=config_janelas):
+            liberados.append((categoria, caminho))
+        else:
+            adiados.append((categoria, caminho))
+    return liberados, adiados
+
+def contar_arquivos_faltando(manifesto_ciclo=None):
+    json_data = (manifesto_ciclo or manifesto.ManifestoCiclo()).clientes()
+    if not json_data:
         return 0
-    json_data = response.data[0]["json_data"]
-    return len(verificar_integridade_arquivos(json_data))
+    faltando = verificar_integridade_arquivos(json_data)
+    return len(arquivos_liberados(json_data, faltando, prioridade.prioridades_clientes(json_data))[0])
 
-def baixar_arquivos_faltando(arquivos, pasta_s3, callback=None):
+def baixar_arquivos_faltando(arquivos, pasta_s3, callback=None, prioridades=None, esperados=None):
     if not pasta_s3:
         return
-    for _, caminho in arquivos:
-        url = f"{S3_BASE_URL}/{pasta_s3}/{caminho}"
-        destino = os.path.join(CACHE_DIR, caminho)
-        if baixar_arquivo(url, destino) and callback:
-            callback()
+    prioridades = prioridades or {}
+    esperados = esperados or {}
+    tarefas = [
+        (f"{S3_BASE_URL}/{pasta_s3}/{caminho}", os.path.join(CACHE_DIR, caminho),
+         {"timeout": 20, "dono": "clientes", "prioridade": prioridades.get(caminho, prioridade.PRIORIDADE_PADRAO),
+          **esperados.get(caminho, {})})
+        for _, caminho in arquivos
+    ]
+    downloader.obter_pool().baixar_em_lote(tarefas, callback=callback)
+
+def esperados_por_caminho(json_data):
+    """Tamanho/SHA-256 declarados no manifesto, por caminho."""
+    return {
+        item[chave]: verificacao.esperado_do_item(item)
+        for categoria, chave in CATEGORIAS.items()
+        for item in json_data.get(categoria, [])
+        if item.get(chave) and item.get("status") != "deleted"
+    }
+
+def agendar_verificacao(json_data):
+    """Confere em segundo plano os arquivos presentes que ainda não foram verificados."""
+    pasta_s3 = json_data.get("pasta_s3")
+    presentes = indice.presentes(*CATEGORIAS)
+    for caminho, esperado in esperados_por_caminho(json_data).items():
+        if indice.normalizar(caminho) in presentes:
+            verificacao.agendar(os.path.join(CACHE_DIR, caminho), esperado, S3_BUCKET, pasta_s3 and f"{pasta_s3}/{caminho}")
+
+def publicar_geracao(json_data):
+    """Publica manifesto + arquivos completos como uma nova geração (nada acontece se nada mudou)."""
+    presentes = indice.presentes(*CATEGORIAS)
+    arquivos = {
+        caminho: os.path.join(CACHE_DIR, caminho)
+        for caminho in esperados_por_caminho(json_data)
+        if indice.normalizar(caminho) in presentes
+    }
+    geracoes.publicar("clientes", json_data, arquivos)
 
 def deletar_arquivos_removidos(json_data):
     print("🗑️ Verificando e removendo arquivos obsoletos...")
 
-    categorias = {
-        "Propagandas": "video",
-        "Banners": "imagem",
-        "CondominiumNotices": "mensagem"
-    }
-
     arquivos_validos = set()
-    for categoria, chave in categorias.items():
+    for categoria, chave in CATEGORIAS.items():
         for item in json_data.get(categoria, []):
             caminho = item.get(chave)
             if caminho and item.get("status") != "deleted":
-                caminho_absoluto = os.path.normpath(os.path.join(CACHE_DIR, caminho))
-                arquivos_validos.add(caminho_absoluto)
+                arquivos_validos.add(indice.normalizar(caminho))
 
-    for categoria, chave in categorias.items():
-        pasta = os.path.join(CACHE_DIR, categoria)
-        if not os.path.exists(pasta):
+    # 🗂️ Diferença entre índice e manifesto: nenhuma varredura de pastas
+    indice.garantir_varredura()
+    for caminho in indice.presentes(*CATEGORIAS):
+        # Downloads parciais (.part) de arquivos ainda válidos são mantidos para retomada
+        if downloader.caminho_final(caminho) in arquivos_validos:
             continue
-        for root, _, files in os.walk(pasta):
-            for file in files:
-                caminho_absoluto = os.path.normpath(os.path.join(root, file))
-                if caminho_absoluto not in arquivos_validos:
-                    try:
-                        os.remove(caminho_absoluto)
-                        print(f"🗑️ Arquivo removido: {caminho_absoluto}")
-                    except Exception as e:
-                        print(f"⚠️ Falha ao remover {caminho_absoluto}: {e}")
-
-
-def verificar_atualizacao(callback=None):
+        caminho_absoluto = indice.absoluto(caminho)
+        try:
+            if os.path.exists(caminho_absoluto):
+                os.remove(caminho_absoluto)
+                print(f"🗑️ Arquivo removido: {caminho_absoluto}")
+            indice.remover(caminho)
+        except Exception as e:
+            print(f"⚠️ Falha ao remover {caminho_absoluto}: {e}")
+
+    # ♻️ Libera do armazém o conteúdo que não é mais referenciado por nenhuma categoria
+    armazem.coletar_lixo()
+
+
+def verificar_atualizacao(callback=None, manifesto_ciclo=None):
     try:
-        response = supabase.table("updates_clientes").select("json_data").eq("cliente_id", CLIENTE_ID).limit(1).execute()
-        if response.data:
-            json_data = response.data[0]["json_data"]
-            with open(UPDATE_JSON_FILE, "w", encoding="utf-8") as f:
-                json.dump(json_data, f, indent=4, ensure_ascii=False)
+        json_data = (manifesto_ciclo or manifesto.ManifestoCiclo()).clientes()
+        if json_data:
+            prioridades = prioridade.prioridades_clientes(json_data)
             arquivos_faltando = verificar_integridade_arquivos(json_data)
+            # 🌙 Fora da janela da categoria, só baixa o que a tela precisa exibir agora
+            liberados, adiados = arquivos_liberados(json_data, arquivos_faltando, prioridades)
+            if adiados:
+                print(f"🌙 {len(adiados)} arquivo(s) ficam para a janela de download da categoria")
+            # 🔁 O que saiu do manifesto (ou foi adiado) não precisa ser repetido pela fila de retentativas
+            retentativas.manter_apenas("clientes", [os.path.join(CACHE_DIR, caminho) for _, caminho in liberados])
             if arquivos_faltando:
-                baixar_arquivos_faltando(arquivos_faltando, json_data.get("pasta_s3"), callback=callback)
+                baixar_arquivos_faltando(liberados, json_data.get("pasta_s3"), callback=callback,
+                                         prioridades=prioridades, esperados=esperados_por_caminho(json_data))
                 deletar_arquivos_removidos(json_data)
-                confirmar_atualizacao(CLIENTE_ID)
-    except:
-        pass
+                confirmar_atualizacao(manifesto.carregar_config())
+            # 🧬 A interface só passa a ver o novo manifesto quando os arquivos dele estão completos
+            publicar_geracao(json_data)
+            agendar_verificacao(json_data)
+    except Exception as e:
+        print(f"❌ Erro ao verificar atualização do cliente: {e}")
+        return False
+
+def garantir_avisos_proximos(dias=HORIZONTE_AVISOS):
+    """Pré-busca dos avisos que entram em vigor nos próximos `dias` e ainda não estão no disco.
+
+    Usa só o último manifesto salvo e o índice de arquivos: sem consulta ao servidor quando está tudo
+    presente. Cobre o que ficou para a janela ou esgotou a fila de retentativas, para o aviso já estar
+    na geração publicada quando o InfoWidget passar a exibi-lo.
+    """
+    json_data, _ = manifesto.remoto_salvo("clientes")
+    if not json_data:
+        return
+    hoje = datetime.date.today()
+    limite = (hoje + datetime.timedelta(days=dias)).isoformat()
+    indice.garantir_varredura()
+    presentes = indice.presentes(*CATEGORIAS)
+    proximos = [
+        ("CondominiumNotices", item["mensagem"])
+        for item in json_data.get("CondominiumNotices", [])
+        if item.get("mensagem") and item.get("status") != "deleted"
+        and str(item.get("data_ini")) <= limite and str(item.get("data_fim")) >= hoje.isoformat()
+        and indice.normalizar(item["mensagem"]) not in presentes
+    ]
+    if not proximos:
+        return
+    print(f"📅 Pré-buscando {len(proximos)} aviso(s) que entram em vigor até {limite}")
+    # Vigência próxima: não espera janela e passa à frente dos vídeos na fila do pool
+    prioridades = {caminho: (prioridade.EXIBICAO_IMEDIATA, posicao, 0) for posicao, (_, caminho) in enumerate(proximos)}
+    baixar_arquivos_faltando(proximos, json_data.get("pasta_s3"), prioridades=prioridades, esperados=esperados_por_caminho(json_data))
+    publicar_geracao(json_data)
 
 if __name__ == "__main__":
     while True:
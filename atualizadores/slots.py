@@ -0,0 +1,138 @@
+import os
+import sys
+import json
+import shutil
+import subprocess
+from atualizadores import catalogo
+
+BASE_DIR = os.path.abspath(".")
+SOFTWARE_DIR = os.path.join(BASE_DIR, "software")
+PONTEIRO = os.path.join(SOFTWARE_DIR, "atual.json")
+
+# Instalação A/B do software: cada versão fica no seu próprio slot (software/v<N>/), montado e compilado
+# ao lado da versão em execução. A troca é um único os.replace do ponteiro software/atual.json; o slot
+# anterior fica guardado para rollback. Dados (config.json, cache/) continuam na raiz, que também é o
+# diretório de trabalho de todos os processos. Sem ponteiro, roda a árvore da raiz (instalação antiga).
+#
+#   {"versao": 7, "slot": "v7", "anterior": {"versao": 6, "slot": "v6"}, "confirmado": true}
+#
+# "confirmado" só vira true quando a versão nova sinaliza que subiu (sinalizar_pronto); um ponteiro não
+# confirmado no boot (ex.: queda de energia no meio da troca) volta para a versão anterior. A versão nova
+# sobe em espera (app.py --assumir) com a antiga ainda na tela — ver passagem.py.
+
+
+def carregar_ponteiro():
+    if not os.path.exists(PONTEIRO):
+        return None
+    try:
+        with open(PONTEIRO, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except:
+        return None
+
+
+def salvar_ponteiro(ponteiro):
+    """Troca atômica: quem ler o ponteiro vê a versão antiga ou a nova, nunca um arquivo pela metade."""
+    os.makedirs(SOFTWARE_DIR, exist_ok=True)
+    temporario = PONTEIRO + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(ponteiro, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, PONTEIRO)
+
+
+def diretorio_slot(slot):
+    return os.path.join(SOFTWARE_DIR, slot) if slot else BASE_DIR
+
+
+def diretorio_ativo():
+    """Árvore de código da versão ativa (a raiz numa instalação sem slots)."""
+    ponteiro = carregar_ponteiro()
+    return diretorio_slot(ponteiro.get("slot")) if ponteiro else BASE_DIR
+
+
+def ativar(versao, slot):
+    """Aponta para o novo slot, guardando o atual como anterior. Ainda não confirmado."""
+    ponteiro = carregar_ponteiro() or {"versao": None, "slot": None}
+    anterior = {"versao": ponteiro.get("versao"), "slot": ponteiro.get("slot")}
+    salvar_ponteiro({"versao": versao, "slot": slot, "anterior": anterior, "confirmado": False})
+
+
+def confirmar():
+    ponteiro = carregar_ponteiro()
+    if ponteiro and not ponteiro.get("confirmado"):
+        ponteiro["confirmado"] = True
+        salvar_ponteiro(ponteiro)
+
+
+def reverter():
+    """Volta o ponteiro para a versão anterior. Retorna a versão restaurada (None = árvore da raiz)."""
+    ponteiro = carregar_ponteiro()
+    if not ponteiro:
+        return None
+    anterior = ponteiro.get("anterior") or {}
+    salvar_ponteiro({"versao": anterior.get("versao"), "slot": anterior.get("slot"), "anterior": None, "confirmado": True})
+    return anterior.get("versao")
+
+
+def limpar_slots():
+    """Remove slots que não são nem o ativo nem o anterior (nem um em preparação)."""
+    ponteiro = carregar_ponteiro() or {}
+    manter = {ponteiro.get("slot"), (ponteiro.get("anterior") or {}).get("slot")}
+    if not os.path.isdir(SOFTWARE_DIR):
+        return
+    for nome in os.listdir(SOFTWARE_DIR):
+        caminho = os.path.join(SOFTWARE_DIR, nome)
+        if os.path.isdir(caminho) and nome not in manter and not nome.endswith(".preparando"):
+            shutil.rmtree(caminho, ignore_errors=True)
+            print(f"🗑️ Slot de software removido: {nome}")
+
+
+def iniciar(script, slot_dir=None, argumentos=()):
+    """Inicia `script` (ex.: app.py) a partir do slot, sempre com a raiz como diretório de trabalho."""
+    caminho = os.path.join(slot_dir or diretorio_ativo(), script)
+    flags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    return subprocess.Popen([sys.executable, caminho, *argumentos], cwd=BASE_DIR, creationflags=flags)
+
+
+def redirecionar(arquivo_app):
+    """Chamado pelo app.py: se a versão ativa está num slot e este não é ele, inicia o slot e retorna True."""
+    ponteiro = carregar_ponteiro()
+    if not ponteiro:
+        return False
+    if not ponteiro.get("confirmado"):
+        print(f"↩️ Versão {ponteiro.get('versao')} não chegou a subir; voltando para a anterior")
+        reverter()
+        ponteiro = carregar_ponteiro()
+    slot_dir = diretorio_slot(ponteiro.get("slot"))
+    if os.path.normcase(os.path.dirname(os.path.abspath(arquivo_app))) == os.path.normcase(slot_dir):
+        return False
+    if not os.path.exists(os.path.join(slot_dir, "app.py")):
+        return False
+    iniciar("app.py", slot_dir)
+    return True
+
+
+def sinalizar_pronto(app_dir=None):
+    """A janela principal está na tela: o verificador pode confirmar a versão.
+
+    Na passagem sem tela preta o verificador que iniciou a troca sai junto com a instância antiga,
+    então a própria versão nova (rodando do slot ativo, `app_dir`) confirma o ponteiro e a versão.
+    """
+    try:
+        catalogo.salvar_metadado("app_pronto_pid", os.getpid())
+        ponteiro = carregar_ponteiro()
+        if ponteiro and app_dir and os.path.normcase(os.path.abspath(app_dir)) == os.path.normcase(diretorio_slot(ponteiro.get("slot"))):
+            confirmar()
+            if ponteiro.get("versao") is not None:
+                catalogo.salvar_versao("software", ponteiro["versao"])
+    except Exception as e:
+        print(f"⚠️ Falha ao sinalizar que o app está pronto: {e}")
+
+
+def app_pronto(pid):
+    try:
+        return int(catalogo.obter_metadado("app_pronto_pid", 0)) == pid
+    except Exception:
+        return False
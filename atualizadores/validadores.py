@@ -0,0 +1,44 @@
+from atualizadores import catalogo, http_cliente
+
+# Tabela local de validadores HTTP (ETag / Last-Modified) por URL, usada para GETs condicionais:
+# se o recurso não mudou o servidor responde 304 sem corpo e mantemos a cópia local.
+# Os validadores ficam na tabela `validadores` do catálogo SQLite.
+
+
+def cabecalhos_condicionais(url):
+    validador = catalogo.obter_validador(url)
+    headers = {}
+    if validador.get("etag"):
+        headers["If-None-Match"] = validador["etag"]
+    if validador.get("last_modified"):
+        headers["If-Modified-Since"] = validador["last_modified"]
+    return headers
+
+
+def registrar(url, response):
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if not etag and not last_modified:
+        esquecer(url)
+        return
+    if catalogo.obter_validador(url) != {"etag": etag, "last_modified": last_modified}:
+        catalogo.salvar_validador(url, etag, last_modified)
+
+
+def esquecer(url):
+    catalogo.remover_validador(url)
+
+
+def get_condicional(url, possui_copia_local=True, **kwargs):
+    """GET com If-None-Match/If-Modified-Since.
+
+    Retorna a resposta; `status_code == 304` significa que a cópia local continua válida.
+    Sem cópia local os validadores não são enviados, para garantir um corpo completo.
+    """
+    headers = dict(kwargs.pop("headers", {}) or {})
+    if possui_copia_local:
+        headers.update(cabecalhos_condicionais(url))
+    response = http_cliente.get(url, headers=headers, **kwargs)
+    if response.status_code == 200:
+        registrar(url, response)
+    return response
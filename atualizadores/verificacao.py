@@ -0,0 +1,214 @@
+import os
+import sys
+import time
+import queue
+import hashlib
+import threading
+import boto3
+from atualizadores import catalogo, indice, http_cliente, armazem
+
+# Verificação de integridade do conteúdo baixado: tamanho e SHA-256 do manifesto quando existem,
+# senão o ETag/MD5 do objeto no S3. O resultado fica na tabela `verificacoes` do catálogo, válido
+# enquanto (caminho, tamanho, mtime) não mudar — cada arquivo é lido uma única vez. A leitura roda
+# numa thread de fundo com prioridade de E/S baixa para não competir com a reprodução de vídeo.
+
+TAMANHO_PARTE_S3 = 8 * 1024 * 1024  # tamanho de parte padrão dos uploads multipart do boto3
+TAMANHO_BLOCO = 1024 * 1024
+PAUSA_ENTRE_ARQUIVOS = 0.05
+
+_s3 = None
+
+
+def esperado_do_item(item):
+    """Tamanho/SHA-256 declarados no item do manifesto (chaves aceitas pelo pool de downloads)."""
+    esperado = {}
+    try:
+        if item.get("tamanho"):
+            esperado["tamanho"] = int(item["tamanho"])
+    except (TypeError, ValueError):
+        pass
+    if item.get("sha256"):
+        esperado["sha256"] = str(item["sha256"]).lower()
+    return esperado
+
+
+def _cache(caminho, stat):
+    linha = catalogo.conectar().execute(
+        "SELECT * FROM verificacoes WHERE caminho = ? AND tamanho = ? AND mtime = ?",
+        (indice.normalizar(caminho), stat.st_size, stat.st_mtime),
+    ).fetchone()
+    return dict(linha) if linha else None
+
+
+def _gravar(caminho, stat, referencia, sha256=None, md5=None, etag=None):
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute(
+            "INSERT OR REPLACE INTO verificacoes VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (indice.normalizar(caminho), stat.st_size, stat.st_mtime, sha256, md5, etag, referencia, time.time()),
+        )
+
+
+def _esquecer(caminho):
+    conexao = catalogo.conectar()
+    with conexao:
+        conexao.execute("DELETE FROM verificacoes WHERE caminho = ?", (indice.normalizar(caminho),))
+
+
+def ja_verificado(caminho):
+    try:
+        return _cache(caminho, os.stat(caminho)) is not None
+    except OSError:
+        return False
+
+
+def marcar_valido(caminho, referencia, sha256=None):
+    """Registra um arquivo já conferido (ex.: no fim do download) para não ser relido depois."""
+    try:
+        _gravar(caminho, os.stat(caminho), referencia, sha256=sha256)
+    except OSError:
+        pass
+
+
+def validar_uma_vez(caminho, validador):
+    """Executa `validador(caminho)` só se o arquivo ainda não foi verificado nesta versão (tamanho + mtime)."""
+    if ja_verificado(caminho):
+        return True
+    if not validador(caminho):
+        return False
+    marcar_valido(caminho, "validador")
+    return True
+
+
+def calcular_hashes(caminho):
+    """SHA-256, MD5 e ETag multipart (partes de 8 MB) numa única leitura."""
+    sha256, md5, md5_partes = hashlib.sha256(), hashlib.md5(), []
+    parte, lido_na_parte = hashlib.md5(), 0
+    with open(caminho, "rb") as file:
+        for bloco in iter(lambda: file.read(TAMANHO_BLOCO), b""):
+            sha256.update(bloco)
+            md5.update(bloco)
+            parte.update(bloco)
+            lido_na_parte += len(bloco)
+            if lido_na_parte >= TAMANHO_PARTE_S3:
+                md5_partes.append(parte.digest())
+                parte, lido_na_parte = hashlib.md5(), 0
+    if lido_na_parte:
+        md5_partes.append(parte.digest())
+    etag_multipart = f"{hashlib.md5(b''.join(md5_partes)).hexdigest()}-{len(md5_partes)}"
+    return sha256.hexdigest(), md5.hexdigest(), etag_multipart
+
+
+def _metadados_s3(bucket, chave):
+    """(ETag, tamanho) do objeto: boto3 se houver credenciais, senão HEAD na URL pública."""
+    global _s3
+    try:
+        if _s3 is None:
+            _s3 = boto3.client('s3', region_name='sa-east-1')
+        resposta = _s3.head_object(Bucket=bucket, Key=chave)
+        return resposta["ETag"].strip('"'), resposta["ContentLength"]
+    except Exception:
+        head = http_cliente.head(f"https://{bucket}.s3.sa-east-1.amazonaws.com/{chave}", timeout=10)
+        if head.status_code != 200:
+            return None, None
+        return (head.headers.get("ETag") or "").strip('"') or None, int(head.headers.get("Content-Length", 0)) or None
+
+
+def verificar(caminho, esperado=None, bucket=None, chave=None):
+    """Confere o arquivo contra o manifesto (ou o S3). Retorna True, False, ou None se não há referência."""
+    esperado = esperado or {}
+    stat = os.stat(caminho)
+    if _cache(caminho, stat):
+        return True
+
+    if esperado.get("tamanho") and stat.st_size != esperado["tamanho"]:
+        return False
+
+    etag_remoto = tamanho_remoto = None
+    if not esperado.get("sha256") and bucket and chave:
+        etag_remoto, tamanho_remoto = _metadados_s3(bucket, chave)
+        if tamanho_remoto and stat.st_size != tamanho_remoto:
+            return False
+    if not esperado.get("sha256") and not etag_remoto:
+        if esperado.get("tamanho") or tamanho_remoto:
+            _gravar(caminho, stat, "tamanho")
+            return True
+        return None
+
+    sha256, md5, etag_multipart = calcular_hashes(caminho)
+    if esperado.get("sha256"):
+        valido, referencia = sha256 == esperado["sha256"], "sha256"
+    elif "-" in etag_remoto:
+        # ETag multipart depende do tamanho de parte usado no upload: se não bater com o padrão, fica o tamanho
+        valido, referencia = True, "etag" if etag_multipart == etag_remoto else "tamanho"
+    else:
+        valido, referencia = md5 == etag_remoto, "etag"
+
+    if valido:
+        _gravar(caminho, stat, referencia, sha256=sha256, md5=md5, etag=etag_remoto)
+    return valido
+
+
+def _reduzir_prioridade_io():
+    """Coloca a thread atual em prioridade de E/S baixa (modo background no Windows, idle no Linux)."""
+    try:
+        if sys.platform == "win32":
+            import ctypes
+            THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+            kernel32 = ctypes.windll.kernel32
+            kernel32.SetThreadPriority(kernel32.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif sys.platform.startswith("linux"):
+            import psutil
+            psutil.Process(threading.get_native_id()).ionice(psutil.IOPRIO_CLASS_IDLE)
+    except Exception as e:
+        print(f"⚠️ Não foi possível reduzir a prioridade de E/S da verificação: {e}")
+
+
+class VerificadorFundo:
+    """Fila de verificação processada por uma única thread de baixa prioridade."""
+
+    def __init__(self):
+        self.fila = queue.Queue()
+        self.pendentes = set()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def agendar(self, caminho, esperado=None, bucket=None, chave=None):
+        with self.lock:
+            if caminho in self.pendentes:
+                return
+            self.pendentes.add(caminho)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._loop, name="verificacao", daemon=True)
+                self.thread.start()
+        self.fila.put((caminho, esperado, bucket, chave))
+
+    def _loop(self):
+        _reduzir_prioridade_io()
+        while True:
+            caminho, esperado, bucket, chave = self.fila.get()
+            try:
+                if os.path.exists(caminho) and verificar(caminho, esperado, bucket, chave) is False:
+                    # ❌ Arquivo truncado ou corrompido: sai do disco, do índice e do armazém (objeto e ETag),
+                    #    senão o próximo download o reaproveitaria pelo ETag em vez de baixá-lo de novo
+                    armazem.descartar(caminho)
+                    os.remove(caminho)
+                    indice.remover(caminho)
+                    _esquecer(caminho)
+                    print(f"❌ Arquivo corrompido removido para novo download: {caminho}")
+            except Exception as e:
+                print(f"⚠️ Falha ao verificar {caminho}: {e}")
+            finally:
+                with self.lock:
+                    self.pendentes.discard(caminho)
+            time.sleep(PAUSA_ENTRE_ARQUIVOS)
+
+
+_verificador = VerificadorFundo()
+
+
+def agendar(caminho, esperado=None, bucket=None, chave=None):
+    """Enfileira a verificação em segundo plano. Arquivos já verificados nesta versão são ignorados na hora."""
+    if ja_verificado(caminho):
+        return
+    _verificador.agendar(caminho, esperado, bucket, chave)
@@ -1,81 +1,9 @@
-import os
 import json
 from PyQt6.QtWidgets import QLabel, QWidget, QHBoxLayout
 from PyQt6.QtGui import QFont
 from PyQt6.QtCore import Qt, QTimer
-from config.database import supabase
-
-# 🔥 Caminho do JSON local
-COTACAO_JSON_PATH = "cache/cotacao.json"
-
-# 🔥 Criar pasta cache se não existir
-os.makedirs("cache", exist_ok=True)
-
-def obter_cotacao_supabase():
-    if supabase is None:
-        print("⚠️ Supabase não disponível. Pulando atualização de notícias.")
-        return None, None
-
-    try:
-        response = supabase.table("cotacoes").select("valor, atualizado_em").eq("tipo", "cotacao").execute()
-        if response.data:
-            cotacao_data = response.data[0]
-            return cotacao_data["valor"], cotacao_data["atualizado_em"]  # Retorna os valores
-        print("⚠️ Nenhuma cotação encontrada no Supabase.")
-        return None, None
-
-    except Exception as e:
-        print(f"❌ Erro ao buscar cotação no Supabase: {e}")
-        return None, None
-
-
-def salvar_cotacao_localmente(cotacao, atualizado_em):
-    """Salva a cotação no arquivo local e adiciona prints para depuração."""
-    try:
-        with open(COTACAO_JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump({"cotacao": cotacao, "atualizado_em": atualizado_em}, file, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"❌ Erro ao salvar cotação localmente: {e}")
-
-
-def carregar_cotacao_local():
-    """Carrega o JSON salvo localmente e garante que está em formato de dicionário"""
-    if not os.path.exists(COTACAO_JSON_PATH):
-        return None, None
-
-    try:
-        with open(COTACAO_JSON_PATH, "r", encoding="utf-8") as file:
-            data = json.load(file)
-
-            # 🚀 Verifica se o campo "cotacao" está salvo como string e converte para dicionário
-            if isinstance(data.get("cotacao"), str):
-                data["cotacao"] = json.loads(data["cotacao"])
-
-            return data.get("cotacao"), data.get("atualizado_em")
-
-    except Exception as e:
-        print(f"❌ Erro ao carregar cotação local: {e}")
-        return None, None
-
-def verificar_e_atualizar_cotacao():
-
-    # 🔥 Busca timestamp do JSON salvo localmente
-    cotacao_local, timestamp_local = carregar_cotacao_local()
-
-    # 🔥 Busca do Supabase
-    cotacao_supabase, timestamp_supabase = obter_cotacao_supabase()
-
-    # Se não houver cotação no Supabase, manter o que já existe localmente
-    if not cotacao_supabase:
-        return cotacao_local
-
-    # Se os timestamps forem diferentes, atualiza o JSON local
-    if timestamp_supabase != timestamp_local:
-        print(f"🔄 Atualização detectada! Novo timestamp: {timestamp_supabase}")
-        salvar_cotacao_localmente(cotacao_supabase, timestamp_supabase)
-        return cotacao_supabase  # Retorna a nova cotação
-    return cotacao_local  # Retorna a cotação já salva
-
+from atualizadores.cotacao_update import verificar_e_atualizar_cotacao, carregar_cotacao_local
+from atualizadores.agendador import Cadencia
 
 class Footer(QWidget):
     def __init__(self):
@@ -101,6 +29,7 @@ class Footer(QWidget):
         layout.addWidget(self.label)
 
         # 📌 Carregar as cotações do JSON
+        cotacao_salva, self.carimbo_cotacao = carregar_cotacao_local()
         self.texts = self.get_cotacoes_from_json()
         self.update_label_text()
 
@@ -110,12 +39,21 @@ class Footer(QWidget):
         self.timer.timeout.connect(self.scroll_text)
         self.timer.start(10)
 
-        self.atualizar_cotacoes()
-
-        # 🔥 Criar um timer para verificar atualizações a cada 20 minutos
+        # 🔥 Verifica atualizações a cada ~20 minutos, começando na fase desta tela (não no boot);
+        #    uma tela que ainda não tem cotação salva busca na hora
+        self.cadencia = Cadencia("cotacoes_widget", 1200)
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self.atualizar_cotacoes)
-        self.update_timer.start(1200000)  # 20 minutos (1.200.000 ms)
+        if not cotacao_salva:
+            self.cadencia.proxima()  # consome a fase: as seguintes já são o intervalo com jitter
+            self.update_timer.start(0)
+        else:
+            self.update_timer.start(self.cadencia.proxima_ms())
+
+        # 📡 Cotação gravada pelo atualizador (no boot, pelo pacote ou pelo canal push) entra em segundos
+        self.local_timer = QTimer(self)
+        self.local_timer.timeout.connect(self.verificar_cotacao_local)
+        self.local_timer.start(10000)  # 🔄 Só lê o catálogo a cada 10 segundos
 
     def get_cotacoes_from_json(self):
         """Obtém as cotações do JSON salvo localmente."""
@@ -169,8 +107,15 @@ class Footer(QWidget):
     def atualizar_cotacoes(self):
         """Atualiza as cotações verificando o Supabase e atualiza o label."""
         print("🔄 Atualizando cotações no Footer...")
-        nova_cotacao = verificar_e_atualizar_cotacao()
-        if nova_cotacao:
+        self.update_timer.start(self.cadencia.proxima_ms())  # próximo ciclo com jitter
+        verificar_e_atualizar_cotacao()
+        self.verificar_cotacao_local()
+
+    def verificar_cotacao_local(self):
+        """Recarrega o label quando a cotação salva no catálogo mudou."""
+        cotacao, carimbo = carregar_cotacao_local()
+        if cotacao and carimbo != self.carimbo_cotacao:
+            self.carimbo_cotacao = carimbo
             self.texts = self.get_cotacoes_from_json()
             self.update_label_text()
 
@@ -1,18 +1,15 @@
 from PyQt6.QtWidgets import QLabel
 from PyQt6.QtGui import QFont, QFontDatabase
 from PyQt6.QtCore import Qt
+from atualizadores import catalogo
 import os
-import json
 import re  # 📌 Para manipular strings e separar palavras
 
 class Header(QLabel):
     def __init__(self):
         super().__init__()
 
-        # 📌 Caminho do JSON extraído do ZIP
-        self.json_path = "cache/update.json"
-
-        # 📌 Obter o nome da tela do JSON e formatá-lo corretamente
+        # 📌 Obter o nome da tela do manifesto do cliente e formatá-lo corretamente
         self.screen_name = self.get_screen_name()
 
         # 📌 Caminho da fonte personalizada
@@ -43,27 +40,26 @@ class Header(QLabel):
         """)
 
     def get_screen_name(self):
-        """Obtém e formata corretamente o nome da tela a partir do JSON"""
-        if not os.path.exists(self.json_path):
-            print(f"⚠️ Arquivo JSON não encontrado: {self.json_path}")
-            return "Indexa"  # Nome padrão se o JSON não existir
-
+        """Obtém e formata corretamente o nome da tela a partir do manifesto do cliente"""
         try:
-            with open(self.json_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                screen_name = data.get("ScreenName", "")
+            data = catalogo.carregar_manifesto("clientes")
+            if data is None:
+                print("⚠️ Manifesto do cliente ainda não disponível no catálogo")
+                return "Indexa"  # Nome padrão se o manifesto não existir
+
+            screen_name = data.get("ScreenName", "")
 
-                # 📌 Se não houver nome, retornar "Indexa"
-                if not screen_name:
-                    return "Indexa"
+            # 📌 Se não houver nome, retornar "Indexa"
+            if not screen_name:
+                return "Indexa"
 
-                # 📌 Formatar corretamente o nome para separar palavras maiúsculas
-                screen_name = self.formatar_nome(screen_name)
+            # 📌 Formatar corretamente o nome para separar palavras maiúsculas
+            screen_name = self.formatar_nome(screen_name)
 
-                return screen_name
+            return screen_name
 
         except Exception as e:
-            print(f"❌ Erro ao carregar o JSON: {e}")
+            print(f"❌ Erro ao carregar o manifesto: {e}")
             return "Indexa"  # Fallback se houver erro
 
     def formatar_nome(self, nome):
@@ -5,6 +5,7 @@ import pypdfium2
 from PyQt6.QtWidgets import QVBoxLayout, QLabel, QWidget, QSizePolicy
 from PyQt6.QtGui import QPixmap
 from PyQt6.QtCore import Qt, QTimer
+from atualizadores import catalogo
 
 
 class InfoWidget(QWidget):
@@ -21,14 +22,11 @@ class InfoWidget(QWidget):
 
         self.last_json_data = None
 
-        # ⏱️ Timer de checagem de atualizações do JSON
+        # ⏱️ Timer de checagem de atualizações do manifesto
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self.check_for_json_update)
         self.update_timer.start(10000)  # 🔄 Verifica a cada 10 segundos
 
-        # 📌 Caminho do JSON extraído
-        self.json_path = "cache/update.json"
-        self.notices_folder = "cache/CondominiumNotices/"
         self.default_image = "assets/no_notices.png"
 
         # 📌 Layout principal
@@ -87,22 +85,15 @@ class InfoWidget(QWidget):
             self.check_for_json_update()
 
     def check_for_json_update(self):
-        """Verifica mudanças no JSON e na pasta de avisos. Aplica alterações com atraso apenas se a pasta mudar."""
-        if not os.path.exists(self.json_path):
-            return
+        """Verifica se uma nova geração foi publicada (ou o dia virou) e aplica na hora.
 
+        Cada geração já chega completa, então não é preciso esperar a pasta "assentar".
+        """
         try:
-            with open(self.json_path, "r", encoding="utf-8") as file:
-                new_json_raw = file.read()
-
-            new_folder_snapshot = self.get_folder_snapshot()
-
-            json_alterado = new_json_raw != self.last_json_data
-            pasta_alterada = new_folder_snapshot != getattr(self, "last_folder_snapshot", set())
+            new_json_raw = (catalogo.revisao_manifesto("clientes"), datetime.date.today())
 
             def aplicar_alteracoes():
                 self.last_json_data = new_json_raw
-                self.last_folder_snapshot = new_folder_snapshot
                 new_notices = self.get_valid_notices()
 
                 if new_notices != self.notices:
@@ -119,69 +110,29 @@ class InfoWidget(QWidget):
                         self.notice_timer.stop()
                         self.page_timer.stop()
 
-            if pasta_alterada:
-                print("📂 Mudança na pasta detectada! Aplicando após 10 segundos...")
-                QTimer.singleShot(10000, aplicar_alteracoes)
-            elif json_alterado:
-                print("📝 JSON alterado. Aplicando imediatamente.")
+            if new_json_raw != self.last_json_data:
+                print("📝 Nova geração de conteúdo publicada. Aplicando imediatamente.")
                 aplicar_alteracoes()
 
         except Exception as e:
-            print(f"❌ Erro ao verificar mudanças no JSON ou pasta: {e}")
-            
-    def get_folder_snapshot(self):
-        """Retorna um snapshot dos arquivos da pasta de avisos (nome + data de modificação)."""
-        if not os.path.exists(self.notices_folder):
-            return set()
-        return {
-            (f, os.path.getmtime(os.path.join(self.notices_folder, f)))
-            for f in os.listdir(self.notices_folder)
-            if os.path.isfile(os.path.join(self.notices_folder, f))
-        }
+            print(f"❌ Erro ao verificar mudanças no manifesto: {e}")
 
     def get_valid_notices(self):
-        """Obtém avisos vigentes do JSON."""
-        if not os.path.exists(self.json_path):
-            print(f"⚠️ Arquivo JSON não encontrado: {self.json_path}")
-            return []
-
+        """Obtém avisos vigentes hoje (consulta indexada por data no catálogo)."""
         try:
-            with open(self.json_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                notices = data.get("CondominiumNotices", [])
-
-                today = datetime.date.today()
-                valid_notices = []
-
-                for notice in notices:
-                    # 🔒 Ignora avisos marcados como 'deleted'
-                    if notice.get("status") == "deleted":
-                        continue
-
-                    # 🔒 Verifica se os campos necessários existem
-                    if not all(k in notice for k in ("data_ini", "data_fim", "mensagem")):
-                        print(f"⚠️ Aviso incompleto ignorado: {notice}")
-                        continue
-
-                    try:
-                        data_ini = datetime.datetime.strptime(notice["data_ini"], "%Y-%m-%d").date()
-                        data_fim = datetime.datetime.strptime(notice["data_fim"], "%Y-%m-%d").date()
-
-                        if data_ini <= today <= data_fim:
-                            file_name = os.path.basename(notice["mensagem"])
-                            file_path = os.path.join(self.notices_folder, file_name)
-
-                            if os.path.exists(file_path):
-                                valid_notices.append(file_path)
-                            else:
-                                print(f"⚠️ Arquivo do aviso não encontrado: {file_path}")
-                    except Exception as date_error:
-                        print(f"⚠️ Erro ao processar datas do aviso: {notice} | Erro: {date_error}")
+            valid_notices = []
+            # 🔒 Avisos 'deleted' ou sem datas já ficam fora da consulta
+            # 🧬 Os caminhos já apontam para dentro da geração publicada
+            for file_path in catalogo.avisos_vigentes(datetime.date.today()):
+                if os.path.exists(file_path):
+                    valid_notices.append(file_path)
+                else:
+                    print(f"⚠️ Arquivo do aviso não encontrado: {file_path}")
 
-                return valid_notices
+            return valid_notices
 
         except Exception as e:
-            print(f"❌ Erro ao processar JSON: {e}")
+            print(f"❌ Erro ao consultar avisos no catálogo: {e}")
             return []
 
     def update_notice(self):
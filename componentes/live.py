@@ -1,5 +1,4 @@
 import os
-import json
 import sys
 import socket
 os.environ["QT_LOGGING_RULES"] = "qt.multimedia.ffmpeg.debug=false"
@@ -8,10 +7,10 @@ from PyQt6.QtGui import QPainterPath, QRegion,QTransform
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QGraphicsView, QGraphicsScene, QSizePolicy
 from PyQt6.QtMultimediaWidgets import QGraphicsVideoItem
 from PyQt6.QtMultimedia import QMediaPlayer, QAudioOutput
-from config.database import supabase
+from atualizadores.live_update import verificar_e_atualizar_live, carregar_live_local
+from atualizadores import governador, canal_push
+from atualizadores.agendador import Cadencia
 
-LIVE_JSON_PATH = "cache/live.json"
-CONFIG_PATH = "config.json"
 
 class LiveReconnectThread(QThread):
     finished = pyqtSignal()
@@ -61,68 +60,20 @@ class RoundedGraphicsView(QGraphicsView):
         self.setMask(region)
 
 
-def carregar_config():
-    if not os.path.exists(CONFIG_PATH):
-        return None
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
-            config_data = json.load(file)
-            return int(config_data.get("tela_id", 102))
-    except:
-        return 0
-
-CLIENTE_ID = carregar_config()
-
-from config.database import supabase
-
-def verificar_e_atualizar_live():
-    lives_locais, timestamp_local = carregar_live_local()
-
-    if not supabase:
-        print("⚠️ Supabase indisponível. Usando cache local.")
-        return lives_locais or []
-
-    try:
-        response = supabase.table("cameras").select("url, data_criacao, timing").order("data_criacao", desc=True).execute()
-
-        if response.data:
-            timestamp_supabase = response.data[0]["data_criacao"]
-
-            if timestamp_supabase != timestamp_local:
-                lives = [{"url": item["url"], "timing": item.get("timing", 30)} for item in response.data]
-                salvar_live_localmente(lives, timestamp_supabase)
-                return lives
-
-    except Exception as e:
-        print(f"⚠️ Erro ao buscar lives no Supabase: {e}")
-
-    return lives_locais or []
-
-def salvar_live_localmente(lives, data_criacao):
-    try:
-        with open(LIVE_JSON_PATH, "w", encoding="utf-8") as file:
-            json.dump({"lives": lives, "data_criacao": data_criacao}, file, indent=4, ensure_ascii=False)
-    except:
-        pass
-
-def carregar_live_local():
-    if not os.path.exists(LIVE_JSON_PATH):
-        return None, None
-    try:
-        with open(LIVE_JSON_PATH, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return data.get("lives", []), data.get("data_criacao")
-    except:
-        return None, None
-
 class LiveWidget(QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, em_espera=False):
         super().__init__(parent)
+        # 🔀 Em espera (troca de versão): não abre o stream até retomar(); a instância em exibição já abriu o seu
+        self.em_espera = em_espera
         self.verificacoes_paradas = 0
         self.internet_conectada = True
         self.reconectando = False
 
-        self.lives = verificar_e_atualizar_live() or []
+        # 📦 Abre com a cópia local; a rede só é consultada na primeira execução (sem catálogo)
+        self.lives, self.carimbo_lives = carregar_live_local()
+        if not self.lives:
+            self.lives = verificar_e_atualizar_live() or []
+            self.carimbo_lives = carregar_live_local()[1]
         self.live_url = self.lives[0]["url"] if self.lives else None
         self.current_live_index = 0
 
@@ -179,6 +130,7 @@ class LiveWidget(QWidget):
         self.audio_output.setVolume(0.0)
         self.player.setAudioOutput(self.audio_output)
         self.player.setVideoOutput(self.video_item)
+        self.player.mediaStatusChanged.connect(self._status_midia_alterado)
 
         # Reconfigura a mídia e inicia
         self.set_media()
@@ -189,9 +141,11 @@ class LiveWidget(QWidget):
         self.switch_timer.timeout.connect(self.switch_live)
         self.switch_timer.start(30000)
 
+        # ⏱️ ~20 minutos com jitter, começando na fase desta tela (não junto com o resto do prédio)
+        self.cadencia = Cadencia("lives_widget", 1200)
         self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.atualizar_live)
-        self.update_timer.start(1200000)
+        self.update_timer.timeout.connect(self.atualizar_live_periodico)
+        self.update_timer.start(self.cadencia.proxima_ms())
 
         self.verificador_timer = QTimer(self)
         self.verificador_timer.timeout.connect(self.verificar_live)
@@ -201,6 +155,11 @@ class LiveWidget(QWidget):
         self.internet_timer.timeout.connect(self.verificar_conexao_internet)
         self.internet_timer.start(5000)
 
+        # 📡 Câmeras sincronizadas pelo atualizador (ex.: avisadas pelo canal push) entram em segundos
+        self.local_timer = QTimer(self)
+        self.local_timer.timeout.connect(self.verificar_lives_locais)
+        self.local_timer.start(10000)
+
         
 
     def set_media(self, url=None):
@@ -214,13 +173,22 @@ class LiveWidget(QWidget):
 
         if url:
             self.live_url = url
+            if self.em_espera:
+                return
             self.player.setSource(QUrl(url))
             print(f"🎬 Mídia configurada: {url}")
 
     def start_live(self):
-        if self.live_url:
+        if self.live_url and not self.em_espera:
             self.player.play()
 
+    def retomar(self):
+        """Sai da espera: abre o stream da câmera atual e toca."""
+        if self.em_espera:
+            self.em_espera = False
+            self.set_media()
+            self.start_live()
+
     def switch_live(self):
         if self.lives:
             self.current_live_index = (self.current_live_index + 1) % len(self.lives)
@@ -232,8 +200,21 @@ class LiveWidget(QWidget):
             timing = self.lives[self.current_live_index].get("timing", 30)
             self.switch_timer.start(timing * 1000)
 
-    def atualizar_live(self):
-        nova_live = verificar_e_atualizar_live()
+    def atualizar_live_periodico(self):
+        self.update_timer.start(self.cadencia.proxima_ms())
+        if canal_push.ativo():
+            return  # 📡 O atualizador sincroniza assim que o painel muda; verificar_lives_locais aplica
+        self.atualizar_live()
+
+    def verificar_lives_locais(self):
+        """Só lê o catálogo: troca as câmeras quando as salvas mudaram."""
+        lives, carimbo = carregar_live_local()
+        if lives and carimbo != self.carimbo_lives:
+            self.atualizar_live(lives)
+
+    def atualizar_live(self, lives=None):
+        nova_live = lives or verificar_e_atualizar_live()
+        self.carimbo_lives = carregar_live_local()[1]
 
         if nova_live:
             self.lives = nova_live
@@ -254,13 +235,15 @@ class LiveWidget(QWidget):
             self.audio_output.setVolume(0.0)
             self.player.setAudioOutput(self.audio_output)
             self.player.setVideoOutput(self.video_item)
+            self.player.mediaStatusChanged.connect(self._status_midia_alterado)
 
             # Reconfigura a mídia e inicia
             self.set_media()
             QTimer.singleShot(500, self.start_live)
 
     def verificar_live(self):
-        if self.reconectando or not self.internet_conectada:
+        # Em espera não há stream: não é travamento (nem sinal para o governador de banda)
+        if self.em_espera or self.reconectando or not self.internet_conectada:
             return
 
         self.reconectando = True  # 🔒 bloqueia até a verificação acabar
@@ -271,7 +254,16 @@ class LiveWidget(QWidget):
         self.verifier_thread.start()
 
 
+    def _status_midia_alterado(self, status):
+        # 📡 Avisa o atualizador para liberar banda quando a live começa a bufferizar
+        if status in (QMediaPlayer.MediaStatus.StalledMedia, QMediaPlayer.MediaStatus.BufferingMedia):
+            governador.sinalizar_estado_live("buffering")
+        elif status == QMediaPlayer.MediaStatus.BufferedMedia:
+            governador.sinalizar_estado_live("ok")
+
     def _verificacao_finalizada(self, funcionando):
+        # Heartbeat a cada verificação: mantém o governador de banda do atualizador informado
+        governador.sinalizar_estado_live("ok" if funcionando else "travada")
         if funcionando:
             self.verificacoes_paradas = 0
         else:
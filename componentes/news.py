@@ -1,17 +1,14 @@
 import os
-import json
 import qrcode
 from PIL import Image
-import requests
 from PyQt6.QtWidgets import QLabel, QWidget, QVBoxLayout, QHBoxLayout, QSizePolicy
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QPixmap, QPainter, QPainterPath
-from config.database import supabase
-from atualizadores import noticias_update
+from atualizadores import noticias_update, canal_push, manifesto
+from atualizadores.agendador import Cadencia
 
 
 # 🔥 Caminhos dos arquivos locais
-NEWS_JSON_PATH = "cache/noticias.json"
 QR_CODE_FOLDER = "cache/qrcodes"
 S3_BUCKET = "imagens-noticias"
 S3_PREFIX = "News/"
@@ -45,8 +42,9 @@ class NewsWidget(QWidget):
     def __init__(self):
         super().__init__()
 
-        # 🔄 Força a verificação no Supabase na inicialização
-        noticias_update.verificar_e_atualizar_noticias()
+        # 🔄 Só consulta o Supabase na inicialização se ainda não há notícias; senão espera a fase desta tela
+        if noticias_update.carregar_noticias_local()[0] is None:
+            noticias_update.verificar_e_atualizar_noticias()
 
         # 🔥 Criar QR Code folder dentro do objeto
         self.qr_folder = QR_CODE_FOLDER
@@ -164,8 +162,8 @@ class NewsWidget(QWidget):
         main_layout.addLayout(center_layout)
         self.setLayout(main_layout)
 
-        # 📌 Criar JSON inicial caso não exista
-        if not os.path.exists(NEWS_JSON_PATH):
+        # 📌 Criar registro inicial de notícias caso não exista
+        if noticias_update.carregar_noticias_local()[0] is None:
             noticias_update.salvar_noticias_localmente({"portal_cidade": [], "jovempan": []}, "2000-01-01T00:00:00")
 
         # 📌 Carregar as notícias do JSON
@@ -183,10 +181,17 @@ class NewsWidget(QWidget):
         else:
             self.news_label.setText("⚠️ Nenhuma notícia disponível!")
 
-        # 🔥 Criar um timer para verificar atualizações a cada 20 minutos
+        # 🔥 Verifica atualizações a cada ~20 minutos, começando na fase desta tela
+        self.cadencia = Cadencia("noticias_widget", 1200)
         self.update_timer = QTimer(self)
         self.update_timer.timeout.connect(self.atualizar_noticias)
-        self.update_timer.start(1200000)  # 20 minutos (1.200.000 ms)
+        self.update_timer.start(self.cadencia.proxima_ms())
+
+        # 📡 Notícias sincronizadas pelo atualizador (ex.: avisadas pelo canal push) aparecem em segundos
+        self.carimbo_noticias = noticias_update.carregar_noticias_local()[1]
+        self.local_timer = QTimer(self)
+        self.local_timer.timeout.connect(self.verificar_noticias_locais)
+        self.local_timer.start(10000)  # 🔄 Só lê o catálogo a cada 10 segundos
 
     def get_news_from_json(self):
         """Obtém as notícias do JSON salvo localmente e gera QR Codes intercalados em loop entre J e P."""
@@ -302,36 +307,42 @@ class NewsWidget(QWidget):
     def atualizar_noticias(self):
         """Atualiza as notícias verificando o Supabase e atualiza o label."""
         print("🔄 Atualizando notícias no Widget...")
-        novas_noticias = noticias_update.verificar_e_atualizar_noticias()
-        if novas_noticias:
+        self.update_timer.start(self.cadencia.proxima_ms())  # próximo ciclo com jitter
+        if canal_push.ativo():
+            return  # 📡 O atualizador sincroniza assim que o painel muda; verificar_noticias_locais mostra
+        noticias_update.verificar_e_atualizar_noticias()
+        self.verificar_noticias_locais()
+
+    def verificar_noticias_locais(self):
+        """Recarrega o label quando as notícias salvas no catálogo mudaram."""
+        noticias, carimbo = noticias_update.carregar_noticias_local()
+        if noticias and carimbo != self.carimbo_noticias:
+            self.carimbo_noticias = carimbo
             self.clear_qr_cache()  # 🔥 Limpa os QR Codes antigos
             self.news_list = self.get_news_from_json()
             self.update_news()
 
     def clear_qr_cache(self):
-        """Limpa QR Codes antigos ao iniciar, mantendo apenas os do JSON salvo localmente."""
-        if not os.path.exists(NEWS_JSON_PATH):
-            print("⚠️ Nenhum JSON encontrado, pulando limpeza de QR Codes.")
-            return  # Se o JSON não existe, não há como validar
+        """Limpa QR Codes antigos ao iniciar, mantendo apenas os das notícias salvas localmente."""
+        noticias, _ = noticias_update.carregar_noticias_local()
+        if noticias is None:
+            print("⚠️ Nenhuma notícia salva, pulando limpeza de QR Codes.")
+            return  # Sem notícias salvas, não há como validar
 
         try:
-            with open(NEWS_JSON_PATH, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                noticias = data.get("noticias", {})
-
-                # 🔹 Obtém todos os links do JSON para gerar IDs de QR Codes válidos
-                valid_qr_codes = set()
-                for fonte in noticias.values():  # Itera por 'portal_cidade' e 'jovempan'
-                    for noticia in fonte:
-                        if "link" in noticia:
-                            valid_qr_codes.add(f"{hash(noticia['link'])}.png")
-
-                # 🔹 Remove QR Codes que não estão mais no JSON
-                for filename in os.listdir(self.qr_folder):
-                    if filename.endswith(".png") and filename not in valid_qr_codes:
-                        file_path = os.path.join(self.qr_folder, filename)
-                        os.remove(file_path)
-                        print(f"🗑️ Removido QR Code antigo: {file_path}")
+            # 🔹 Obtém todos os links das notícias para gerar IDs de QR Codes válidos
+            valid_qr_codes = set()
+            for fonte in noticias.values():  # Itera por 'portal_cidade' e 'jovempan'
+                for noticia in fonte:
+                    if "link" in noticia:
+                        valid_qr_codes.add(f"{hash(noticia['link'])}.png")
+
+            # 🔹 Remove QR Codes que não estão mais nas notícias
+            for filename in os.listdir(self.qr_folder):
+                if filename.endswith(".png") and filename not in valid_qr_codes:
+                    file_path = os.path.join(self.qr_folder, filename)
+                    os.remove(file_path)
+                    print(f"🗑️ Removido QR Code antigo: {file_path}")
 
         except Exception as e:
             print(f"❌ Erro ao limpar QR Codes antigos: {e}")
@@ -343,13 +354,16 @@ class NewsWidget(QWidget):
             return None
 
         # ⚠️ Substitua pelo domínio público ou IP do seu servidor
-        backend_url = f"http://15.228.8.3:8000/leitura?cliente_id={noticias_update.CLIENTE_ID}&link={link}"
+        backend_url = f"http://15.228.8.3:8000/leitura?cliente_id={manifesto.carregar_config()}&link={link}"
         qr_filename = f"{hash(backend_url)}.png"
         qr_path = os.path.join(self.qr_folder, qr_filename)
 
         if not os.path.exists(qr_path):
             qr = qrcode.make(backend_url)
-            qr.save(qr_path)
+            # Grava em arquivo temporário e renomeia: nunca fica um PNG pela metade no cache
+            temporario = qr_path + ".tmp"
+            qr.save(temporario, format="PNG")
+            os.replace(temporario, qr_path)
 
         return qr_path
     
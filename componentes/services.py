@@ -1,15 +1,15 @@
 import os
-import json
 from PyQt6.QtWidgets import QHBoxLayout, QLabel, QWidget, QSizePolicy
 from PyQt6.QtGui import QPixmap, QPainter, QPainterPath
 from PyQt6.QtCore import Qt, QTimer, QRectF
+from atualizadores import catalogo
 
 
 class ServicesWidget(QWidget):
     def __init__(self):
         super().__init__()
         
-        # 🔹 Última versão conhecida do JSON (para comparação)
+        # 🔹 Última revisão conhecida do manifesto (para comparação)
         self.last_json_state = None 
 
         # 📌 Layout para centralizar a imagem
@@ -36,15 +36,11 @@ class ServicesWidget(QWidget):
         layout.addWidget(self.Services)
         self.setLayout(layout)
 
-        # 📌 Caminho dos arquivos extraídos do ZIP
-        self.json_path = "cache/update.json"
-        self.image_folder = "cache/Banners"
-
-        # 📌 Carregar a lista de banners do JSON
+        # 📌 Carregar a lista de banners do catálogo
         self.image_list = self.get_images_from_json()
         self.current_image_index = 0
 
-         # 📌 Criar Timer para monitorar mudanças no JSON a cada 30 segundos
+         # 📌 Criar Timer para monitorar mudanças no manifesto a cada 30 segundos
         self.json_check_timer = QTimer(self)
         self.json_check_timer.timeout.connect(self.check_for_json_update)
         self.json_check_timer.start(30000)  # 🔹 Verifica a cada 30s
@@ -61,73 +57,38 @@ class ServicesWidget(QWidget):
             self.Services.setText("⚠️ Nenhum banner encontrado!")
 
     def check_for_json_update(self):
-        """Verifica se houve mudança no JSON ou na pasta e recarrega os banners com atraso."""
-        if not os.path.exists(self.json_path):
-            return
-
+        """Recarrega os banners assim que uma nova geração de conteúdo é publicada (ela já chega completa)."""
         try:
-            with open(self.json_path, "r", encoding="utf-8") as file:
-                new_json_state = file.read()
-
-            new_folder_snapshot = self.get_folder_snapshot()
-            json_alterado = new_json_state != self.last_json_state
-            pasta_alterada = new_folder_snapshot != getattr(self, "last_folder_snapshot", set())
-
-            if not json_alterado and not pasta_alterada:
+            new_json_state = catalogo.revisao_manifesto("clientes")
+            if new_json_state == self.last_json_state:
                 return
 
-            print("🔄 Mudança detectada em banners. Aplicando em 10 segundos...")
-
-            def aplicar():
-                self.last_json_state = new_json_state
-                self.last_folder_snapshot = new_folder_snapshot
-                self.image_list = self.get_images_from_json()
-                self.current_image_index = 0
-                self.update_image()
-
-            QTimer.singleShot(10000, aplicar)
+            print("🔄 Nova geração de banners publicada. Aplicando...")
+            self.last_json_state = new_json_state
+            self.image_list = self.get_images_from_json()
+            self.current_image_index = 0
+            self.update_image()
 
         except Exception as e:
             print(f"❌ Erro ao verificar mudanças: {e}")
 
-    def get_folder_snapshot(self):
-        """Snapshot da pasta Banners."""
-        if not os.path.exists(self.image_folder):
-            return set()
-        return {
-            (f, os.path.getmtime(os.path.join(self.image_folder, f)))
-            for f in os.listdir(self.image_folder)
-            if os.path.isfile(os.path.join(self.image_folder, f))
-        }
-
     def get_images_from_json(self):
-        """Obtém os banners válidos listados no JSON (status diferente de deleted)."""
-        if not os.path.exists(self.json_path):
-            print(f"⚠️ JSON não encontrado: {self.json_path}")
-            return []
-
+        """Obtém os banners válidos do catálogo (status diferente de deleted)."""
         try:
-            with open(self.json_path, "r", encoding="utf-8") as file:
-                data = json.load(file)
-                banners = data.get("Banners", [])
-
-                arquivos_validos = set(
-                    os.path.normpath(os.path.join(self.image_folder, os.path.basename(b["imagem"])))
-                    for b in banners
-                    if b.get("status") != "deleted" and "imagem" in b
-                )
+            # Caminhos absolutos dentro da geração publicada: manifesto e arquivos sempre consistentes
+            arquivos_validos = dict.fromkeys(os.path.normpath(imagem) for imagem in catalogo.banners_ativos())
 
-                imagens_existentes = []
-                for path in arquivos_validos:
-                    if os.path.exists(path):
-                        imagens_existentes.append(path)
-                    else:
-                        print(f"⚠️ Imagem ausente: {path}")
+            imagens_existentes = []
+            for path in arquivos_validos:
+                if os.path.exists(path):
+                    imagens_existentes.append(path)
+                else:
+                    print(f"⚠️ Imagem ausente: {path}")
 
-                return imagens_existentes
+            return imagens_existentes
 
         except Exception as e:
-            print(f"❌ Erro ao processar JSON: {e}")
+            print(f"❌ Erro ao consultar banners no catálogo: {e}")
             return []
 
 
@@ -1,10 +1,8 @@
 import sys
 import os
-import json
-import urllib.request
-import requests
-import traceback
 import datetime
+from atualizadores import validadores, clima_update, armazem
+from atualizadores.agendador import Cadencia
 
 from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QDateTime, QLocale
 from PyQt6.QtGui import QFont, QPixmap
@@ -14,6 +12,8 @@ from PyQt6.QtWidgets import (
 
 QLocale.setDefault(QLocale(QLocale.Language.Portuguese, QLocale.Country.Brazil))
 
+ICONES_FOLDER = os.path.join("cache", "icones")
+
 CONDICOES_PT = {
     1000: "Ensolarado", 1003: "Parcialmente nublado", 1006: "Nublado", 1009: "Encoberto", 1030: "Névoa",
     1063: "Chuva isolada", 1066: "Neve isolada", 1069: "Chuva congelante isolada", 1072: "Garoa congelante isolada",
@@ -35,6 +35,7 @@ class FlipClockClimaWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.setFixedSize(420, 180)
+        self.icones_revalidados = set()
 
         self.stack = QStackedLayout()
         self.stack.addWidget(self.criar_layout_relogio())
@@ -59,11 +60,12 @@ class FlipClockClimaWidget(QWidget):
         self.troca_timer.start(5000)
 
         self.atualizar_relogio()
-        self.atualizar_clima()
 
+        # ⏱️ Clima a cada ~20 minutos, começando na fase desta tela; até lá vale o clima do catálogo
+        self.cadencia_clima = Cadencia("clima_widget", 20 * 60)
         self.timer_clima = QTimer(self)
         self.timer_clima.timeout.connect(self.atualizar_clima)
-        self.timer_clima.start(20 * 60 * 1000)
+        self.timer_clima.start(self.cadencia_clima.proxima_ms())
 
     def criar_layout_relogio(self):
         widget = QWidget()
@@ -84,21 +86,8 @@ class FlipClockClimaWidget(QWidget):
         return widget
     
     def atualizar_clima(self):
-        url = "http://15.228.8.3:8000/api/clima"  # substitua pelo IP se necessário
-        try:
-            print("🔄 Buscando clima da API...")
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            dados = response.json()
-
-            with open("cache/clima_cache.json", "w", encoding="utf-8") as f:
-                json.dump(dados, f, indent=2, ensure_ascii=False)
-
-            print("✅ Clima atualizado com sucesso.")
-        except Exception as e:
-            print("⚠️ Erro ao buscar clima da API:", e)
-            traceback.print_exc()
-            print("🟡 Usando previsão local com base na hora atual.")
+        self.timer_clima.start(self.cadencia_clima.proxima_ms())
+        clima_update.atualizar_clima()
 
     def obter_forecast_mais_proximo(self, dados):
         agora = datetime.datetime.now()
@@ -116,14 +105,12 @@ class FlipClockClimaWidget(QWidget):
         layout_principal.setContentsMargins(0, 0, 40, 0)
         layout_principal.setSpacing(10)
 
-        if not os.path.exists("cache/clima_cache.json"):
+        dados = clima_update.carregar_clima_local()
+        if not dados:
             layout_principal.addWidget(QLabel("⛅ Sem dados de clima"))
             return widget
 
         try:
-            with open("cache/clima_cache.json", "r", encoding="utf-8") as f:
-                dados = json.load(f)
-
             clima_hoje = dados["current"]
             previsoes = [self.obter_forecast_mais_proximo(dados)] + dados["forecast"]["forecastday"][1:]
             layout_principal.addLayout(self.criar_bloco_hoje(clima_hoje, previsoes[0]), stretch=2)
@@ -185,8 +172,7 @@ class FlipClockClimaWidget(QWidget):
     def carregar_icone(self, url, size):
         pixmap = QPixmap()
         try:
-            img_data = urllib.request.urlopen("https:" + url).read()
-            pixmap.loadFromData(img_data)
+            pixmap.loadFromData(self.obter_icone(url))
         except:
             pixmap = QPixmap(size, size)
             pixmap.fill(Qt.GlobalColor.transparent)
@@ -197,6 +183,23 @@ class FlipClockClimaWidget(QWidget):
         label.setScaledContents(True)
         return label
 
+    def obter_icone(self, url):
+        """Retorna os bytes do ícone, revalidando o cache local no máximo uma vez por execução."""
+        os.makedirs(ICONES_FOLDER, exist_ok=True)
+        caminho = os.path.join(ICONES_FOLDER, url.strip("/").replace("/", "_"))
+
+        if url not in self.icones_revalidados or not os.path.exists(caminho):
+            try:
+                response = validadores.get_condicional("https:" + url, possui_copia_local=os.path.exists(caminho), timeout=10)
+                if response.status_code == 200:
+                    armazem.gravar_se_mudou(caminho, response.content)
+                self.icones_revalidados.add(url)
+            except Exception as e:
+                print(f"⚠️ Erro ao buscar ícone {url}: {e}")
+
+        with open(caminho, "rb") as f:
+            return f.read()
+
     def atualizar_relogio(self):
         agora = QDateTime.currentDateTime()
         locale = QLocale(QLocale.Language.Portuguese, QLocale.Country.Brazil)
@@ -1,5 +1,4 @@
 import os
-import json
 import random
 from itertools import cycle
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QSizePolicy
@@ -7,6 +6,7 @@ from PyQt6.QtMultimedia import QMediaPlayer
 from PyQt6.QtMultimediaWidgets import QVideoWidget
 from PyQt6.QtCore import QUrl, Qt, QTimer
 import glob
+from atualizadores import catalogo, indice
 
 
 def has_new_videos(current_list, folder):
@@ -16,12 +16,10 @@ def has_new_videos(current_list, folder):
 
 
 class VideoWidget(QWidget):
-    def __init__(self):
+    def __init__(self, em_espera=False):
         super().__init__()
-        self.json_path = "cache/update.json"
-        self.entretenimento_json = "cache/entretenimento_update.json"
-        self.folder_propagandas = "cache"
-        self.folder_entretenimento = "cache/Entretenimento"
+        # 🔀 Em espera (troca de versão): carrega o vídeo e fica parado no primeiro quadro até retomar()
+        self.em_espera = em_espera
         self.last_snapshot = self.get_folder_snapshot()
 
         # Player setup
@@ -61,47 +59,29 @@ class VideoWidget(QWidget):
         self.update_timer.start(10000)  # 10 segundos
 
     def get_folder_snapshot(self):
-        """Retorna um snapshot (nome + data modificação) dos arquivos de vídeo."""
-        paths = []
-        for folder in [
-            os.path.join(self.folder_propagandas, "Propagandas"),
-            os.path.join(self.folder_entretenimento, "curiosidades"),
-            os.path.join(self.folder_entretenimento, "engracados"),
-            os.path.join(self.folder_entretenimento, "enigmas"),
-        ]:
-            if os.path.exists(folder):
-                for f in os.listdir(folder):
-                    full_path = os.path.join(folder, f)
-                    if os.path.isfile(full_path):
-                        paths.append((f, os.path.getmtime(full_path)))
-        return set(paths)
+        """Revisões dos manifestos: mudam só quando uma nova geração (manifesto + vídeos completos) é publicada."""
+        return tuple(catalogo.revisao_manifesto(nome) for nome in ("clientes", "entretenimento"))
+
+    def origem(self, caminho):
+        """Mesmo vídeo em gerações diferentes tem a mesma origem (ex.: 'Entretenimento/curiosidades/a.mp4')."""
+        return catalogo.origem_na_geracao(indice.normalizar(os.path.abspath(caminho)))
 
 
     def get_videos_from_json(self):
         try:
-            with open(self.json_path, "r", encoding="utf-8") as f:
-                json_propagandas = json.load(f)
-            with open(self.entretenimento_json, "r", encoding="utf-8") as f:
-                json_entretenimento = json.load(f)
-
-            def listar_videos(lista, base, categoria=None):
+            def listar_videos(caminhos):
                 videos = []
-                for item in lista:
-                    if item.get("status") == "deleted":
-                        continue
-                    if categoria and item.get("categoria") != categoria:
-                        continue
-                    caminho = os.path.join(base, item["video"])
+                for caminho in caminhos:
                     if os.path.exists(caminho):
                         videos.append(caminho)
                     else:
                         print(f"⚠️ Arquivo ausente: {caminho}")
                 return videos
 
-            propagandas = listar_videos(json_propagandas.get("Propagandas", []), self.folder_propagandas)
-            curiosidades = listar_videos(json_entretenimento["entretenimento"], self.folder_entretenimento, "curiosidades")
-            engracados = listar_videos(json_entretenimento["entretenimento"], self.folder_entretenimento, "engracados")
-            enigmas = listar_videos(json_entretenimento["entretenimento"], self.folder_entretenimento, "enigmas")
+            propagandas = listar_videos(catalogo.videos_por_categoria("Propagandas"))
+            curiosidades = listar_videos(catalogo.videos_por_categoria("Entretenimento", "curiosidades"))
+            engracados = listar_videos(catalogo.videos_por_categoria("Entretenimento", "engracados"))
+            enigmas = listar_videos(catalogo.videos_por_categoria("Entretenimento", "enigmas"))
 
             random.shuffle(curiosidades)
             random.shuffle(engracados)
@@ -126,28 +106,36 @@ class VideoWidget(QWidget):
             return intercalados
 
         except Exception as e:
-            print(f"❌ Erro ao processar JSON: {e}")
+            print(f"❌ Erro ao consultar o catálogo de vídeos: {e}")
             return []
 
     def update_video_list(self):
         new_snapshot = self.get_folder_snapshot()
         if new_snapshot != self.last_snapshot:
-            print("🔄 Alterações detectadas nos arquivos. Atualizando lista de vídeos...")
+            print("🔄 Nova geração de conteúdo publicada. Atualizando lista de vídeos...")
             self.last_snapshot = new_snapshot
             new_list = self.get_videos_from_json()
             if new_list != self.video_list:
                 self.video_list = new_list
-                current = os.path.normpath(self.player.source().toLocalFile())
-                norm_list = [os.path.normpath(p) for p in self.video_list]
-                if current not in norm_list:
+                # O vídeo em exibição continua na geração anterior; só reinicia se ele saiu do manifesto
+                current = self.origem(self.player.source().toLocalFile())
+                if current not in {self.origem(p) for p in self.video_list}:
                     self.current_video_index = 0
                     self.play_video(self.video_list[0])
 
 
     def play_video(self, video_path):
         if os.path.exists(video_path):
+            try:
+                # ⏱️ Última exibição: base do LRU da cota de disco
+                indice.registrar_reproducao(os.path.abspath(video_path))
+            except Exception as e:
+                print(f"⚠️ Falha ao registrar exibição de {video_path}: {e}")
             self.player.setSource(QUrl.fromLocalFile(video_path))
-            self.player.play()
+            if self.em_espera:
+                self.player.pause()
+            else:
+                self.player.play()
         else:
             print(f"⚠️ Vídeo não encontrado: {video_path}. Atualizando lista...")
             self.video_list = self.get_videos_from_json()
@@ -155,6 +143,12 @@ class VideoWidget(QWidget):
             if self.video_list:
                 self.play_video(self.video_list[0])
 
+    def retomar(self):
+        """Sai da espera: o vídeo carregado começa a tocar."""
+        if self.em_espera:
+            self.em_espera = False
+            self.player.play()
+
     def handle_video_end(self, status):
         if status == QMediaPlayer.MediaStatus.EndOfMedia:
             self.current_video_index += 1
@@ -1,5 +1,6 @@
 from PyQt6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QHBoxLayout, QSizePolicy, QSpacerItem
 from PyQt6.QtCore import Qt  # 🔹 Import necessário para o modo fullscreen
+from PyQt6.QtMultimedia import QMediaPlayer
 import os
 import json
 from componentes.header import Header
@@ -13,7 +14,7 @@ from componentes.services import ServicesWidget
 
 
 class ElevatorScreen(QMainWindow):
-    def __init__(self):
+    def __init__(self, em_espera=False):
         super().__init__()
 
         # 🔹 Carregar o modelo do config.json
@@ -27,7 +28,9 @@ class ElevatorScreen(QMainWindow):
         # 📌 Configuração da Janela
         self.setWindowTitle("Tela do Elevador")
         self.setWindowFlag(Qt.WindowType.FramelessWindowHint)  # 🔹 Remove bordas
-        self.showFullScreen()  # 🔹 Inicia em tela cheia
+        # 🔀 Em espera (troca de versão), monta tudo fora da tela; a passagem mostra a janela depois
+        if not em_espera:
+            self.showFullScreen()  # 🔹 Inicia em tela cheia
 
         # 📌 Definir a imagem de fundo
         self.setStyleSheet("""
@@ -57,8 +60,9 @@ class ElevatorScreen(QMainWindow):
         header = Header()
         mainV_layout.addWidget(header, 1)
 
-        video_widget = VideoWidget()
+        video_widget = VideoWidget(em_espera=em_espera)
         mainV_layout.addWidget(video_widget, 4)
+        self.video_widget = video_widget
 
         # 📌 Criar as colunas
         mainV_layout.addItem(spacer2)
@@ -80,8 +84,9 @@ class ElevatorScreen(QMainWindow):
 
         right_layout.addItem(spacer)
 
-        live_widget = LiveWidget()
+        live_widget = LiveWidget(em_espera=em_espera)
         right_layout.addWidget(live_widget, 3)
+        self.live_widget = live_widget
 
         timer_widget = FlipClockClimaWidget()
         # Centralizar horizontalmente o widget de clima
@@ -103,3 +108,18 @@ class ElevatorScreen(QMainWindow):
         # 📌 Configurar o layout principal e a central widget
         main_widget.setLayout(mainV_layout)
         self.setCentralWidget(main_widget)
+
+    def midia_pronta(self):
+        """Primeiro vídeo já carregado no player (ou não há vídeo para carregar)."""
+        player = self.video_widget.player
+        return not self.video_widget.video_list or player.mediaStatus() in (
+            QMediaPlayer.MediaStatus.LoadedMedia,
+            QMediaPlayer.MediaStatus.BufferingMedia,
+            QMediaPlayer.MediaStatus.BufferedMedia,
+            QMediaPlayer.MediaStatus.EndOfMedia,
+        )
+
+    def retomar_midia(self):
+        """Fim da espera: vídeo e live começam a tocar (fora da tela ficam pausados)."""
+        self.video_widget.retomar()
+        self.live_widget.retomar()
@@ -0,0 +1,178 @@
+import time
+from PyQt6.QtCore import QObject, QTimer, QCoreApplication, QEvent
+from PyQt6.QtNetwork import QLocalServer, QLocalSocket
+from atualizadores import catalogo
+
+# Passagem sem tela preta entre duas instâncias do app (troca de versão do software):
+#   1. o verificador inicia a versão nova com --assumir; ela monta a janela fora da tela (caches locais,
+#      sem rede, vídeo e live pausados) e espera o primeiro vídeo carregar;
+#   2. conecta no servidor local da instância em exibição e envia "pronto"; a antiga responde "ok";
+#   3. a nova retoma a mídia, entra em tela cheia por cima e, depois do primeiro quadro pintado, envia
+#      "mostrada"; a antiga se esconde, responde "saindo <instante em que sumiu>" e encerra, levando junto
+#      atualizador e verificador;
+#   4. quando a conexão cai, a nova inicia os seus subprocessos e passa a ser o servidor.
+# Sem instância antiga no ar (ou sem resposta), a nova simplesmente aparece.
+# A lacuna registrada é o primeiro quadro da nova menos o instante em que a antiga sumiu (mesmo relógio, mesma
+# máquina): positiva é tela vazia. Pela ordem acima ela fica negativa (sobreposição); só passa de zero quando
+# o primeiro quadro não chega em ESPERA_QUADRO e a antiga é liberada assim mesmo.
+NOME_SERVIDOR = "telasindexa-app"
+ESPERA_MIDIA = 15          # segundos esperando o primeiro vídeo antes de assumir assim mesmo
+ESPERA_RESPOSTA = 5000     # ms sem resposta da instância antiga: aparece mesmo assim
+ESPERA_QUADRO = 2000       # ms esperando o primeiro quadro da janela nova antes de liberar a antiga
+ESPERA_SAIDA = 20000       # ms para a antiga encerrar (ela espera até 5s por subprocesso)
+
+
+class ServidorPassagem(QObject):
+    """Instância em exibição: cede a tela quando a versão nova avisa que está pronta."""
+
+    def __init__(self, janela, parent=None):
+        super().__init__(parent)
+        self.janela = janela
+        self.servidor = QLocalServer(self)
+        self.servidor.newConnection.connect(self._nova_conexao)
+        QLocalServer.removeServer(NOME_SERVIDOR)  # socket órfão de uma instância que caiu
+        if not self.servidor.listen(NOME_SERVIDOR):
+            print(f"⚠️ Servidor de passagem indisponível: {self.servidor.errorString()}")
+
+    def _nova_conexao(self):
+        conexao = self.servidor.nextPendingConnection()
+        conexao.readyRead.connect(lambda: self._ler(conexao))
+
+    def _ler(self, conexao):
+        while conexao.canReadLine():
+            mensagem = bytes(conexao.readLine()).decode().strip()
+            if mensagem == "pronto":
+                print("🤝 Versão nova pronta fora da tela; cedendo a exibição")
+                conexao.write(b"ok\n")
+                conexao.flush()
+            elif mensagem == "mostrada":
+                # A nova já pintou por cima: daqui em diante esta janela não aparece mais
+                self.janela.hide()
+                QCoreApplication.processEvents()  # a janela sai da tela antes de marcar o instante
+                conexao.write(f"saindo {time.time()}\n".encode())
+                conexao.flush()
+                conexao.waitForBytesWritten(1000)
+                QCoreApplication.quit()
+
+
+class ClientePassagem(QObject):
+    """Instância nova (--assumir): espera o primeiro vídeo fora da tela, pede a vez e aparece por cima.
+
+    A antiga só é liberada depois do primeiro quadro pintado (ou de ESPERA_QUADRO).
+    """
+
+    def __init__(self, janela, ao_assumir, parent=None):
+        super().__init__(parent)
+        self.janela = janela
+        self.ao_assumir = ao_assumir
+        self.inicio = time.monotonic()
+        self.mostrada_em = None
+        self.primeiro_quadro_em = None
+        self.oculta_em = None
+        self.avisada = False
+        self.concluida = False
+        self.janela.installEventFilter(self)
+
+        self.conexao = QLocalSocket(self)
+        self.conexao.connected.connect(self._pedir_vez)
+        self.conexao.readyRead.connect(self._ler)
+        self.conexao.disconnected.connect(self._concluir)
+        self.conexao.errorOccurred.connect(self._erro)
+
+        self.timer_midia = QTimer(self)
+        self.timer_midia.timeout.connect(self._verificar_midia)
+        self.timer_midia.start(100)
+
+    def _verificar_midia(self):
+        esperando = time.monotonic() - self.inicio
+        if not self.janela.midia_pronta() and esperando < ESPERA_MIDIA:
+            return
+        self.timer_midia.stop()
+        print(f"🎬 Versão nova montada fora da tela em {esperando:.1f}s")
+        self.conexao.connectToServer(NOME_SERVIDOR)
+
+    def _pedir_vez(self):
+        self.conexao.write(b"pronto\n")
+        self.conexao.flush()
+        QTimer.singleShot(ESPERA_RESPOSTA, self._sem_resposta)
+
+    def _ler(self):
+        while self.conexao.canReadLine():
+            mensagem = bytes(self.conexao.readLine()).decode().strip()
+            if mensagem == "ok":
+                self._mostrar()
+                if self.primeiro_quadro_em is not None:
+                    self._avisar_mostrada()
+                else:
+                    QTimer.singleShot(ESPERA_QUADRO, self._avisar_mostrada)
+            elif mensagem.startswith("saindo "):
+                try:
+                    self.oculta_em = float(mensagem.split()[1])
+                except ValueError:
+                    pass
+                self._registrar_lacuna()
+
+    def eventFilter(self, objeto, evento):
+        if objeto is self.janela and evento.type() == QEvent.Type.Paint and self.mostrada_em is not None:
+            # O evento chega antes da pintura: o instante é marcado quando ela termina
+            self.janela.removeEventFilter(self)
+            QTimer.singleShot(0, self._quadro_pintado)
+        return False
+
+    def _quadro_pintado(self):
+        if self.primeiro_quadro_em is not None:
+            return
+        self.primeiro_quadro_em = time.time()
+        if self.conexao.state() == QLocalSocket.LocalSocketState.ConnectedState:
+            self._avisar_mostrada()
+        self._registrar_lacuna()
+
+    def _avisar_mostrada(self):
+        if self.avisada or self.concluida:
+            return
+        self.avisada = True
+        if self.primeiro_quadro_em is None:
+            print(f"⚠️ Nenhum quadro pintado em {ESPERA_QUADRO} ms; liberando a instância antiga assim mesmo")
+        self.conexao.write(b"mostrada\n")
+        self.conexao.flush()
+        QTimer.singleShot(ESPERA_SAIDA, self._concluir)
+
+    def _erro(self, erro):
+        # Ninguém escutando: primeira instância (ou a antiga já caiu)
+        if self.mostrada_em is None:
+            print("ℹ️ Nenhuma instância em exibição; assumindo direto")
+            self._concluir()
+
+    def _sem_resposta(self):
+        if self.mostrada_em is None:
+            print("⚠️ Instância em exibição não respondeu; assumindo mesmo assim")
+            self._concluir()
+
+    def _mostrar(self):
+        if self.mostrada_em is not None:
+            return
+        self.mostrada_em = time.time()
+        self.janela.retomar_midia()
+        self.janela.showFullScreen()
+        self.janela.raise_()
+        self.janela.activateWindow()
+
+    def _registrar_lacuna(self):
+        """Primeiro quadro da nova menos o instante em que a antiga sumiu, quando os dois são conhecidos."""
+        if self.primeiro_quadro_em is None or self.oculta_em is None:
+            return
+        lacuna_ms = round((self.primeiro_quadro_em - self.oculta_em) * 1000)
+        print(f"🔀 Lacuna na tela: {max(lacuna_ms, 0)} ms (sobreposição de {max(-lacuna_ms, 0)} ms)")
+        try:
+            catalogo.salvar_metadado("passagem_lacuna_ms", lacuna_ms)
+        except Exception as e:
+            print(f"⚠️ Falha ao registrar a passagem: {e}")
+
+    def _concluir(self):
+        if self.concluida:
+            return
+        self.concluida = True
+        self._mostrar()
+        print(f"🔀 Passagem concluída em {time.monotonic() - self.inicio:.1f}s")
+        self.conexao.abort()
+        self.ao_assumir()
@@ -0,0 +1,68 @@
+import os
+import sys
+import json
+import tempfile
+import pytest
+
+# Os módulos resolvem caminhos relativos ("config.json", "cache/") e o cliente do backend na importação:
+# a sessão roda numa pasta temporária com um config.json apontando para o backend local.
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+os.chdir(tempfile.mkdtemp(prefix="telasindexa-testes-"))
+with open("config.json", "w", encoding="utf-8") as f:
+    json.dump({"tela_id": 101, "backend_local": "backend.json"}, f)
+
+
+@pytest.fixture
+def catalogo_vazio(tmp_path, monkeypatch):
+    """Catálogo SQLite novo, só deste teste."""
+    from atualizadores import catalogo
+    monkeypatch.setattr(catalogo, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(catalogo, "CATALOGO_DB", str(tmp_path / "cache" / "catalogo.db"))
+    catalogo._local.conexao = None
+    yield catalogo
+    if getattr(catalogo._local, "conexao", None) is not None:
+        catalogo._local.conexao.close()
+    catalogo._local.conexao = None
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch, catalogo_vazio):
+    """BackendLocal vazio no lugar do Supabase."""
+    from atualizadores import backend_local, manifesto
+    backend = backend_local.BackendLocal(str(tmp_path / "backend.json"))
+    monkeypatch.setattr(backend_local, "_cliente", backend)
+    monkeypatch.setattr(manifesto, "supabase", backend)
+    return backend
+
+
+@pytest.fixture
+def espiar(monkeypatch):
+    """Troca `modulo.nome` por uma espia que repassa a chamada; retorna a lista de argumentos recebidos."""
+    def instalar(modulo, nome):
+        chamadas = []
+        original = getattr(modulo, nome)
+
+        def espia(*args, **kwargs):
+            chamadas.append(args)
+            return original(*args, **kwargs)
+
+        monkeypatch.setattr(modulo, nome, espia)
+        return chamadas
+    return instalar
+
+
+@pytest.fixture
+def cache(catalogo_vazio, monkeypatch):
+    """Pasta cache/ só deste teste: catálogo, índice, armazém, gerações e cota apontam para ela."""
+    from atualizadores import armazem, cota, geracoes, indice
+    raiz = catalogo_vazio.CACHE_DIR
+    os.makedirs(raiz, exist_ok=True)
+    for modulo in (armazem, cota, geracoes, indice):
+        monkeypatch.setattr(modulo, "CACHE_DIR", raiz)
+    monkeypatch.setattr(catalogo_vazio, "PASTAS_BASE", {"clientes": raiz, "entretenimento": os.path.join(raiz, "Entretenimento")})
+    monkeypatch.setattr(armazem, "ARMAZEM_DIR", os.path.join(raiz, "Armazem"))
+    monkeypatch.setattr(armazem, "INDICE_ETAG_FILE", os.path.join(raiz, "Armazem", "indice_etag.json"))
+    monkeypatch.setattr(geracoes, "GERACOES_DIR", os.path.join(raiz, "Geracoes"))
+    monkeypatch.setattr(cota, "_reservas", {})
+    return raiz
@@ -0,0 +1,54 @@
+import pytest
+from atualizadores import agendador
+from atualizadores.agendador import Cadencia, Tarefa, fase, simular_carga
+
+
+def test_fase_e_estavel_e_fica_dentro_do_intervalo():
+    assert fase("noticias", 600, tela_id=101) == fase("noticias", 600, tela_id=101)
+    assert fase("noticias", 600, tela_id=101) != fase("noticias", 600, tela_id=102)
+    assert fase("noticias", 600, tela_id=101) != fase("cotacao", 600, tela_id=101)
+    assert all(0 <= fase("pacote", 600, tela_id) < 600 for tela_id in range(1, 200))
+
+
+def test_fases_da_frota_se_espalham_pelo_intervalo():
+    faixas = [0] * 10
+    for tela_id in range(1, 1001):
+        faixas[int(fase("pacote", 1200, tela_id) // 120)] += 1
+    # 1000 telas em 10 faixas: nenhuma faixa com menos da metade ou mais do dobro da média
+    assert min(faixas) > 50 and max(faixas) < 200
+
+
+def test_cadencia_comeca_na_fase_e_depois_usa_o_jitter(catalogo_vazio):
+    cadencia = Cadencia("lives_widget", 1200, jitter=0.1, tela_id=101)
+
+    assert cadencia.proxima() == max(1, fase("lives_widget", 1200, tela_id=101))
+    esperas = [cadencia.proxima() for _ in range(200)]
+    assert all(1080 <= espera <= 1320 for espera in esperas)
+    assert len(set(esperas)) > 100  # cada ciclo sorteia de novo: telas que colidiram uma vez se separam
+
+
+def test_cadencia_respeita_a_dica_do_servidor(catalogo_vazio):
+    agendador.registrar_dica(3600, "de teste")
+    cadencia = Cadencia("clima", 600, tela_id=101)
+
+    assert cadencia.proxima() > 3500
+    assert cadencia.proxima() > 3500
+
+
+def test_tarefa_faz_backoff_exponencial_e_volta_ao_intervalo(catalogo_vazio):
+    tarefa = Tarefa("cotacao", lambda: True, 600, jitter=0.1, backoff_base=30, backoff_max=200)
+
+    falhas = [tarefa.proxima_espera(False) for _ in range(5)]
+    for espera, base in zip(falhas, (30, 60, 120, 200, 200)):
+        assert base * 0.9 <= espera <= base * 1.1
+    assert 540 <= tarefa.proxima_espera(True) <= 660
+    assert tarefa.falhas == 0
+
+
+def test_fase_e_jitter_derrubam_o_pico_da_frota():
+    pico_fixo, media_fixa = simular_carga(telas=500, espalhar=False)
+    pico, media = simular_carga(telas=500, espalhar=True)
+
+    assert pico_fixo >= 400  # todas no mesmo boot: quase a frota inteira na mesma janela de 10 s
+    assert pico * 10 < pico_fixo
+    assert media == pytest.approx(media_fixa, rel=0.2)  # o total de consultas é o mesmo, só espalhado
@@ -0,0 +1,71 @@
+import os
+import hashlib
+from atualizadores import armazem
+
+
+def gravar(cache, nome, conteudo):
+    caminho = os.path.join(cache, "Propagandas", nome)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as f:
+        f.write(conteudo)
+    return caminho
+
+
+def test_conteudo_repetido_vira_link_do_mesmo_objeto(cache):
+    a = gravar(cache, "a.mp4", b"mesmo video")
+    b = gravar(cache, "b.mp4", b"mesmo video")
+
+    sha256 = armazem.armazenar(a, etag='"e1"')
+    assert armazem.armazenar(b) == sha256 == hashlib.sha256(b"mesmo video").hexdigest()
+
+    assert os.path.samefile(a, b) and os.path.samefile(a, armazem.caminho_objeto(sha256))
+    assert armazem.sha_por_etag('"e1"') == sha256
+    assert armazem.sha_por_etag('"outro"') is None
+
+
+def test_vincular_materializa_sem_download(cache):
+    sha256 = armazem.armazenar(gravar(cache, "a.mp4", b"video"))
+    destino = os.path.join(cache, "Entretenimento", "curiosidades", "a.mp4")
+
+    assert armazem.vincular(sha256.upper(), destino) is True
+    assert os.path.samefile(destino, armazem.caminho_objeto(sha256))
+    assert armazem.vincular("0" * 64, destino + ".outro") is False
+    assert armazem.vincular(None, destino + ".outro") is False
+
+
+def test_descartar_tira_o_objeto_e_os_etags(cache):
+    caminho = gravar(cache, "a.mp4", b"corrompido")
+    sha256 = armazem.armazenar(caminho, etag='"e1"')
+    armazem.armazenar(gravar(cache, "b.mp4", b"bom"), etag='"e2"')
+
+    assert armazem.descartar(caminho) == sha256
+
+    assert not os.path.exists(armazem.caminho_objeto(sha256))
+    assert armazem.sha_por_etag('"e1"') is None
+    assert armazem.sha_por_etag('"e2"') is not None
+    assert os.path.exists(caminho)  # o arquivo em si fica para quem chamou decidir
+
+
+def test_coletar_lixo_remove_so_objetos_sem_referencia(cache):
+    a = gravar(cache, "a.mp4", b"saiu")
+    sha_a = armazem.armazenar(a, etag='"e1"')
+    sha_b = armazem.armazenar(gravar(cache, "b.mp4", b"fica"), etag='"e2"')
+    os.remove(a)
+
+    assert armazem.coletar_lixo() == 1
+
+    assert not os.path.exists(armazem.caminho_objeto(sha_a))
+    assert os.path.exists(armazem.caminho_objeto(sha_b))
+    assert armazem.sha_por_etag('"e1"') is None
+    assert armazem.sha_por_etag('"e2"') == sha_b
+    assert os.path.exists(armazem.INDICE_ETAG_FILE)
+
+
+def test_gravar_se_mudou_nao_regrava_conteudo_igual(cache):
+    caminho = os.path.join(cache, "feeds", "noticias.json")
+
+    assert armazem.gravar_se_mudou(caminho, b"{}") is True
+    assert armazem.gravar_se_mudou(caminho, b"{}") is False
+    assert armazem.gravar_se_mudou(caminho, b"[]") is True
+    with open(caminho, "rb") as f:
+        assert f.read() == b"[]"
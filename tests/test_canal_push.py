@@ -0,0 +1,132 @@
+import time
+import threading
+import pytest
+from atualizadores import canal_push, servidor_local
+from atualizadores.canal_push import CanalPush
+
+
+def esperar(condicao, prazo=5):
+    limite = time.monotonic() + prazo
+    while time.monotonic() < limite:
+        if condicao():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def encerrar(canal):
+    canal.encerrar()
+    for thread in threading.enumerate():
+        if thread.name == "canal-push":
+            thread.join(5)
+
+
+@pytest.fixture
+def canal_rapido(monkeypatch):
+    """Heartbeat e backoff em décimos de segundo."""
+    monkeypatch.setattr(canal_push, "HEARTBEAT", 0.2)
+    monkeypatch.setattr(canal_push, "SILENCIO_MAX", 1)
+    monkeypatch.setattr(canal_push, "RECONEXAO_BASE", 0.05)
+    monkeypatch.setattr(canal_push, "RECONEXAO_MAX", 0.2)
+
+
+@pytest.fixture
+def servidor(backend):
+    servidor = servidor_local.iniciar(backend)
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def canal(servidor, canal_rapido):
+    mudancas = []
+    canal = CanalPush(lambda feed, registro: mudancas.append((feed, registro)),
+                      url=f"ws://127.0.0.1:{servidor.porta_ws}/realtime/v1/websocket", tela_id=101)
+    canal.mudancas = mudancas
+    yield canal
+    encerrar(canal)
+
+
+def test_espera_de_reconexao_cresce_ate_o_teto():
+    for falhas in range(1, 12):
+        base = min(canal_push.RECONEXAO_MAX, canal_push.RECONEXAO_BASE * 2 ** (falhas - 1))
+        esperas = [canal_push.espera_reconexao(falhas) for _ in range(50)]
+        assert all(base * 0.5 <= espera <= base * 1.5 for espera in esperas)
+    assert canal_push.espera_reconexao(30) <= canal_push.RECONEXAO_MAX * 1.5
+
+
+def test_mudanca_chega_pelo_canal_so_para_esta_tela(canal, backend):
+    canal.iniciar()
+    assert esperar(lambda: canal.conectado)
+    assert canal_push.ativo()
+
+    backend.publicar("updates_clientes", {"nome": "Outra tela"}, "atualizado_em", "2026-01-02", cliente_id=202)
+    backend.publicar("updates_clientes", {"nome": "Esta tela"}, "atualizado_em", "2026-01-02", cliente_id=101)
+
+    assert esperar(lambda: canal.mudancas)
+    time.sleep(0.2)
+    assert [(feed, registro["cliente_id"]) for feed, registro in canal.mudancas] == [("clientes", 101)]
+
+
+def test_heartbeats_nao_escrevem_no_catalogo(canal, espiar):
+    gravacoes = espiar(canal_push.catalogo, "salvar_metadado")
+    canal.iniciar()
+    assert esperar(lambda: canal.conectado)
+
+    time.sleep(1.2)  # ~6 heartbeats
+
+    assert canal.conectado
+    assert [args[1] for args in gravacoes] == [0, canal_push.os.getpid()]
+
+
+def test_reconecta_depois_de_uma_queda(canal, servidor, espiar):
+    esperas = espiar(canal_push, "espera_reconexao")
+    canal.iniciar()
+    assert esperar(lambda: canal.conectado)
+    time.sleep(0.5)  # sessão mais longa que 2 heartbeats: a queda é pontual
+
+    servidor.derrubar_canal()
+
+    assert esperar(lambda: esperas)
+    assert esperas[0] == (1,)
+    assert esperar(lambda: canal.conectado and servidor.assinantes)
+    assert canal_push.ativo()
+
+
+def test_falhas_seguidas_aumentam_o_backoff(canal_rapido, catalogo_vazio, espiar):
+    esperas = espiar(canal_push, "espera_reconexao")
+    canal = CanalPush(lambda feed, registro: None, url="ws://127.0.0.1:9/realtime/v1/websocket", tela_id=101)
+    canal.iniciar()
+    try:
+        assert esperar(lambda: len(esperas) >= 4)
+    finally:
+        encerrar(canal)
+
+    assert esperas[:4] == [(1,), (2,), (3,), (4,)]
+    assert not canal.conectado
+    assert not canal_push.ativo()
+
+
+def test_servidor_mudo_derruba_a_conexao(canal_rapido, catalogo_vazio):
+    # Servidor que aceita a conexão mas nunca responde (nem aos heartbeats): morta após SILENCIO_MAX, e refeita
+    from websockets.sync.server import serve
+    conexoes = []
+
+    def mudo(conexao):
+        conexoes.append(conexao)
+        for _ in conexao:
+            pass
+
+    servidor = serve(mudo, "127.0.0.1", 0)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    canal = CanalPush(lambda feed, registro: None,
+                      url=f"ws://127.0.0.1:{servidor.socket.getsockname()[1]}/realtime/v1/websocket", tela_id=101)
+    canal.iniciar()
+    try:
+        assert esperar(lambda: len(conexoes) >= 2)
+    finally:
+        encerrar(canal)
+        servidor.shutdown()
+
+    assert not canal.conectado
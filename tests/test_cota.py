@@ -0,0 +1,126 @@
+import os
+from collections import namedtuple
+import pytest
+from atualizadores import armazem, catalogo, cota, geracoes, indice
+
+KB = 1000
+PASTAS_DE_CONTEUDO = ("Propagandas", "Banners", "Geracoes", "Armazem")
+Uso = namedtuple("Uso", "total used free")
+
+
+def gravar(cache, caminho, tamanho, idade=0, conteudo=None):
+    """Arquivo de conteúdo como os downloads deixam: no armazém e no índice. `idade` (s) ordena o LRU."""
+    absoluto = indice.absoluto(caminho)
+    os.makedirs(os.path.dirname(absoluto), exist_ok=True)
+    with open(absoluto, "wb") as f:
+        f.write((conteudo or caminho.encode()).ljust(tamanho, b"\0"))
+    os.utime(absoluto, (1_700_000_000 - idade, 1_700_000_000 - idade))
+    armazem.armazenar(absoluto)
+    indice.registrar(absoluto)
+    return absoluto
+
+
+def manifesto(*videos):
+    return {"Propagandas": [{"video": video} for video in videos], "Banners": [], "CondominiumNotices": []}
+
+
+def publicar(cache, *videos):
+    geracoes.publicar("clientes", manifesto(*videos), {video: indice.absoluto(video) for video in videos})
+
+
+def configurar(monkeypatch, limite, reserva=0):
+    monkeypatch.setattr(cota, "carregar_config_cota", lambda: {"limite_bytes": limite, "reserva_livre_bytes": reserva})
+
+
+def disco_simulado(monkeypatch, cache, capacidade):
+    """Partição de `capacidade` bytes: ocupado é a soma dos inodes distintos dos arquivos de conteúdo."""
+    def disk_usage(_):
+        inodes = {}
+        for pasta in PASTAS_DE_CONTEUDO:
+            for root, _, files in os.walk(os.path.join(cache, pasta)):
+                for file in files:
+                    if os.path.join(root, file) == armazem.INDICE_ETAG_FILE:
+                        continue
+                    stat = os.stat(os.path.join(root, file))
+                    inodes[(stat.st_dev, stat.st_ino)] = stat.st_size
+        usado = sum(inodes.values())
+        return Uso(capacidade, usado, capacidade - usado)
+    monkeypatch.setattr(cota.shutil, "disk_usage", disk_usage)
+
+
+def geracao_substituida_com_arquivo_exclusivo(cache, tamanho):
+    """Geração 1 (substituída, ainda na retenção) com um vídeo que só existe nela e no armazém."""
+    gravar(cache, "Propagandas/antigo.mp4", tamanho, idade=900)
+    publicar(cache, "Propagandas/antigo.mp4")
+    os.remove(indice.absoluto("Propagandas/antigo.mp4"))
+    indice.remover("Propagandas/antigo.mp4")
+
+
+def test_cota_estourada_remove_pelo_lru_mesmo_com_geracao_substituida(cache, monkeypatch):
+    # Descartar a geração substituída liberaria disco, mas não baixa o uso indexado: o LRU precisa rodar
+    geracao_substituida_com_arquivo_exclusivo(cache, 60 * KB)
+    gravar(cache, "Propagandas/a.mp4", 40 * KB, idade=300)
+    gravar(cache, "Propagandas/b.mp4", 40 * KB, idade=200)
+    gravar(cache, "Propagandas/atual.mp4", 40 * KB, idade=100)
+    publicar(cache, "Propagandas/atual.mp4")
+    configurar(monkeypatch, limite=100 * KB)
+
+    assert cota.garantir_espaco(30 * KB, indice.absoluto("Propagandas/novo.mp4"))
+
+    assert indice.presentes("Propagandas") == {"Propagandas/atual.mp4"}
+    assert not os.path.exists(indice.absoluto("Propagandas/a.mp4"))
+    assert not os.path.exists(indice.absoluto("Propagandas/b.mp4"))
+    assert indice.uso_total() == 40 * KB
+
+
+def test_falta_de_disco_descarta_geracoes_e_poupa_conteudo_compartilhado(cache, monkeypatch):
+    geracao_substituida_com_arquivo_exclusivo(cache, 60 * KB)
+    # Mesmo conteúdo em dois caminhos (um link só no armazém): remover um deles não libera nada
+    gravar(cache, "Propagandas/x.mp4", 50 * KB, idade=800, conteudo=b"x")
+    gravar(cache, "Banners/x.png", 50 * KB, idade=700, conteudo=b"x")
+    gravar(cache, "Propagandas/a.mp4", 40 * KB, idade=300)
+    gravar(cache, "Propagandas/atual.mp4", 40 * KB, idade=100)
+    publicar(cache, "Propagandas/atual.mp4")
+    disco_simulado(monkeypatch, cache, capacidade=250 * KB)  # usado: 60 + 50 + 40 + 40 = 190
+    configurar(monkeypatch, limite=10 ** 12, reserva=130 * KB)
+
+    assert cota.garantir_espaco(30 * KB, indice.absoluto("Propagandas/novo.mp4"))
+
+    assert indice.presentes("Propagandas", "Banners") == {"Propagandas/x.mp4", "Banners/x.png", "Propagandas/atual.mp4"}
+    assert not os.path.exists(os.path.join(geracoes.GERACOES_DIR, "clientes", "1"))
+    assert cota.shutil.disk_usage(cache).free == 160 * KB
+
+
+def test_sem_candidatos_o_download_e_recusado(cache, monkeypatch):
+    gravar(cache, "Propagandas/atual.mp4", 40 * KB)
+    publicar(cache, "Propagandas/atual.mp4")
+    configurar(monkeypatch, limite=50 * KB)
+
+    assert not cota.garantir_espaco(30 * KB, indice.absoluto("Propagandas/novo.mp4"))
+    assert os.path.exists(indice.absoluto("Propagandas/atual.mp4"))
+    assert indice.absoluto("Propagandas/novo.mp4") not in cota._reservas
+
+
+def test_entretenimento_so_cede_lugar_a_conteudo_obrigatorio(cache, monkeypatch):
+    gravar(cache, "Entretenimento/curiosidades/e.mp4", 60 * KB, idade=500)
+    catalogo.salvar_manifesto("entretenimento", {"entretenimento": [{"video": "curiosidades/e.mp4", "categoria": "curiosidades"}]})
+    configurar(monkeypatch, limite=100 * KB)
+
+    assert not cota.garantir_espaco(50 * KB, indice.absoluto("Entretenimento/curiosidades/novo.mp4"))
+    assert os.path.exists(indice.absoluto("Entretenimento/curiosidades/e.mp4"))
+
+    assert cota.garantir_espaco(50 * KB, indice.absoluto("Propagandas/novo.mp4"))
+    assert not os.path.exists(indice.absoluto("Entretenimento/curiosidades/e.mp4"))
+    assert indice.uso_total() == 0
+
+
+def test_reservas_de_downloads_em_andamento_contam_na_cota(cache, monkeypatch):
+    configurar(monkeypatch, limite=100 * KB)
+    primeiro, segundo = indice.absoluto("Propagandas/a.mp4"), indice.absoluto("Propagandas/b.mp4")
+
+    assert cota.garantir_espaco(60 * KB, primeiro)
+    assert not cota.garantir_espaco(60 * KB, segundo)
+    assert cota.garantir_espaco(60 * KB, primeiro)  # a reserva do próprio destino não conta contra ele
+
+    cota.liberar_reserva(primeiro)
+    assert cota.garantir_espaco(60 * KB, segundo)
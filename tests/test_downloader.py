@@ -0,0 +1,215 @@
+import os
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from atualizadores import catalogo, cota, downloader, http_cliente, retentativas
+
+CONTEUDO = bytes(range(256)) * 400  # 102400 bytes
+
+
+class Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Arquivo)
+        self.arquivos = {"/video.mp4": CONTEUDO}
+        self.pedidos = []  # (método, caminho, Range)
+        self.ignorar_range = False
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class Arquivo(BaseHTTPRequestHandler):
+    """Serve arquivos com Range (206/416), como o storage das mídias."""
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, corpo):
+        dados = self.server.arquivos.get(self.path)
+        self.server.pedidos.append((self.command, self.path, self.headers.get("Range")))
+        if dados is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        faixa = self.headers.get("Range")
+        if faixa and not self.server.ignorar_range:
+            inicio, _, fim = faixa.split("=", 1)[1].partition("-")
+            inicio, fim = int(inicio), int(fim) if fim else len(dados) - 1
+            if inicio >= len(dados):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(dados)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {inicio}-{fim}/{len(dados)}")
+            dados = dados[inicio:fim + 1]
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        if corpo:
+            self.wfile.write(dados)
+
+    def do_GET(self):
+        self._responder(True)
+
+    def do_HEAD(self):
+        self._responder(False)
+
+
+@pytest.fixture
+def servidor():
+    servidor = Servidor()
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+@pytest.fixture
+def pool(cache, monkeypatch):
+    monkeypatch.setattr(http_cliente, "espera_backoff", lambda *args, **kwargs: 0)
+    monkeypatch.setattr(cota, "carregar_config_cota", lambda: {"limite_bytes": 1024 ** 3, "reserva_livre_bytes": 0})
+    return downloader.PoolDownloads(max_workers=1, segmentos=1)
+
+
+def gets(servidor):
+    return [pedido for pedido in servidor.pedidos if pedido[0] == "GET"]
+
+
+def na_fila(destino):
+    linha = catalogo.conectar().execute("SELECT tentativas FROM retentativas WHERE destino = ?", (destino,)).fetchone()
+    return linha["tentativas"] if linha else 0
+
+
+def test_checksum_divergente_nao_e_rebaixado_e_tem_poucas_retentativas(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    opcoes = {"dono": "clientes", "sha256": "0" * 64, "tamanho": len(CONTEUDO)}
+
+    for tentativa in range(1, downloader.RETENTATIVAS_CHECKSUM + 1):
+        assert pool.enviar(servidor.url + "/video.mp4", destino, **opcoes).result() is False
+        assert len(gets(servidor)) == tentativa  # um download por tentativa, sem repetir dentro do worker
+        assert na_fila(destino) == tentativa
+
+    assert pool.enviar(servidor.url + "/video.mp4", destino, **opcoes).result() is False
+    assert na_fila(destino) == 0
+    assert not os.path.exists(destino) and not os.path.exists(destino + downloader.SUFIXO_PARCIAL)
+
+
+def test_recusa_da_cota_nao_entra_na_fila(cache, pool, servidor, monkeypatch):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    retentativas.registrar_falha(servidor.url + "/video.mp4", destino, {"dono": "clientes"}, (1,))
+    monkeypatch.setattr(cota, "garantir_espaco", lambda necessario, destino: False)
+
+    resultado = pool.enviar(servidor.url + "/video.mp4", destino, dono="clientes", tamanho=len(CONTEUDO))
+
+    assert resultado.result() is False
+    assert na_fila(destino) == 0
+    assert pool._baixar(servidor.url + "/video.mp4", destino, tamanho=len(CONTEUDO)) == (False, downloader.FALHA_COTA)
+
+
+def test_outras_falhas_continuam_na_fila_de_retentativas(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "sumiu.mp4")
+
+    assert pool.enviar(servidor.url + "/sumiu.mp4", destino, dono="clientes").result() is False
+    assert pool._baixar(servidor.url + "/sumiu.mp4", destino) == (False, downloader.FALHA_STATUS)
+    assert na_fila(destino) == 1
+
+
+def test_download_com_checksum_certo_sai_da_fila(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    retentativas.registrar_falha(servidor.url + "/video.mp4", destino, {"dono": "clientes"}, (1,))
+    sha256 = hashlib.sha256(CONTEUDO).hexdigest()
+
+    assert pool.enviar(servidor.url + "/video.mp4", destino, dono="clientes", sha256=sha256).result() is True
+    assert na_fila(destino) == 0
+    with open(destino, "rb") as f:
+        assert f.read() == CONTEUDO
+
+
+def parcial(destino, conteudo):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    with open(destino + downloader.SUFIXO_PARCIAL, "wb") as f:
+        f.write(conteudo)
+
+
+def conferir(destino):
+    with open(destino, "rb") as f:
+        assert f.read() == CONTEUDO
+    assert not os.path.exists(destino + downloader.SUFIXO_PARCIAL)
+    assert not os.path.exists(destino + downloader.SUFIXO_SEGMENTOS)
+
+
+def test_retoma_o_part_com_range(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    parcial(destino, CONTEUDO[:1000])
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino, tamanho=len(CONTEUDO)) == (True, None)
+
+    assert gets(servidor) == [("GET", "/video.mp4", "bytes=1000-")]
+    conferir(destino)
+
+
+def test_416_com_part_completo_finaliza_sem_baixar_de_novo(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    parcial(destino, CONTEUDO)
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino, sha256=hashlib.sha256(CONTEUDO).hexdigest()) == (True, None)
+
+    assert gets(servidor) == [("GET", "/video.mp4", f"bytes={len(CONTEUDO)}-")]
+    conferir(destino)
+
+
+def test_416_com_part_maior_que_o_remoto_recomeca(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    parcial(destino, CONTEUDO + b"lixo")
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino) == (True, None)
+
+    assert [pedido[2] for pedido in gets(servidor)] == [f"bytes={len(CONTEUDO) + 4}-", None]
+    conferir(destino)
+
+
+def test_servidor_sem_range_reinicia_do_zero(cache, pool, servidor):
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    parcial(destino, b"x" * 1000)
+    servidor.ignorar_range = True
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino) == (True, None)
+    conferir(destino)
+
+
+def test_arquivo_grande_baixa_em_faixas(cache, servidor, monkeypatch):
+    monkeypatch.setattr(cota, "carregar_config_cota", lambda: {"limite_bytes": 1024 ** 3, "reserva_livre_bytes": 0})
+    pool = downloader.PoolDownloads(max_workers=1, max_por_host=4, segmentos=4, limiar_segmentado=1)
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino, tamanho=len(CONTEUDO)) == (True, None)
+
+    faixa = len(CONTEUDO) // 4
+    assert sorted(pedido[2] for pedido in gets(servidor)) == [f"bytes={inicio}-{inicio + faixa - 1}" for inicio in range(0, len(CONTEUDO), faixa)]
+    assert pool.ativos_por_host == {"127.0.0.1:" + str(servidor.server_port): 0}
+    conferir(destino)
+
+
+def test_download_em_faixas_retoma_so_o_que_falta(cache, servidor, monkeypatch):
+    monkeypatch.setattr(cota, "carregar_config_cota", lambda: {"limite_bytes": 1024 ** 3, "reserva_livre_bytes": 0})
+    pool = downloader.PoolDownloads(max_workers=1, max_por_host=4, segmentos=2, limiar_segmentado=1)
+    destino = os.path.join(cache, "Propagandas", "video.mp4")
+    meio = len(CONTEUDO) // 2
+    # Primeira faixa completa e 100 bytes da segunda, como um reinício no meio do download deixaria
+    parcial(destino, CONTEUDO[:meio + 100].ljust(len(CONTEUDO), b"\0"))
+    estado = {"total": len(CONTEUDO), "faixas": [[0, meio - 1, meio], [meio, len(CONTEUDO) - 1, 100]]}
+    downloader._salvar_estado_segmentos(destino + downloader.SUFIXO_SEGMENTOS, estado)
+
+    assert pool._baixar(servidor.url + "/video.mp4", destino, tamanho=len(CONTEUDO)) == (True, None)
+
+    assert gets(servidor) == [("GET", "/video.mp4", f"bytes={meio + 100}-{len(CONTEUDO) - 1}")]
+    conferir(destino)
@@ -0,0 +1,94 @@
+import os
+import time
+from atualizadores import armazem, catalogo, geracoes, indice
+
+
+def gravar(caminho, conteudo):
+    absoluto = indice.absoluto(caminho)
+    os.makedirs(os.path.dirname(absoluto), exist_ok=True)
+    with open(absoluto, "wb") as f:
+        f.write(conteudo)
+    armazem.armazenar(absoluto)
+    return absoluto
+
+
+def publicar(*videos):
+    dados = {"Propagandas": [{"video": video} for video in videos], "Banners": [], "CondominiumNotices": []}
+    return geracoes.publicar("clientes", dados, {video: indice.absoluto(video) for video in videos})
+
+
+def numeros():
+    linhas = catalogo.conectar().execute("SELECT numero FROM geracoes WHERE manifesto = 'clientes' ORDER BY numero")
+    return [linha["numero"] for linha in linhas]
+
+
+def diretorio(numero):
+    return os.path.join(geracoes.GERACOES_DIR, "clientes", str(numero))
+
+
+def test_publicar_o_mesmo_conteudo_nao_cria_geracao(cache):
+    gravar("Propagandas/a.mp4", b"a")
+
+    assert publicar("Propagandas/a.mp4") is True
+    assert publicar("Propagandas/a.mp4") is False
+    assert numeros() == [1]
+    assert os.path.samefile(os.path.join(diretorio(1), "Propagandas", "a.mp4"), indice.absoluto("Propagandas/a.mp4"))
+
+
+def test_geracao_substituida_fica_durante_a_retencao(cache):
+    gravar("Propagandas/a.mp4", b"a")
+    publicar("Propagandas/a.mp4")
+    gravar("Propagandas/b.mp4", b"b")
+    publicar("Propagandas/b.mp4")
+
+    assert geracoes.coletar_geracoes("clientes") == 0
+    assert numeros() == [1, 2]
+    assert os.path.exists(os.path.join(diretorio(1), "Propagandas", "a.mp4"))
+    assert catalogo.geracao_atual("clientes")["numero"] == 2
+
+
+def test_coleta_remove_geracao_vencida_e_o_conteudo_so_dela(cache):
+    gravar("Propagandas/a.mp4", b"a")
+    publicar("Propagandas/a.mp4")
+    objeto_a = armazem.caminho_objeto(armazem.calcular_sha256(indice.absoluto("Propagandas/a.mp4")))
+    os.remove(indice.absoluto("Propagandas/a.mp4"))  # saiu da rotação: só a geração 1 e o armazém o têm
+    gravar("Propagandas/b.mp4", b"b")
+    publicar("Propagandas/b.mp4")
+    objeto_b = armazem.caminho_objeto(armazem.calcular_sha256(indice.absoluto("Propagandas/b.mp4")))
+
+    assert geracoes.coletar_geracoes("clientes", retencao=0) == 1
+
+    assert numeros() == [2]
+    assert not os.path.exists(diretorio(1))
+    assert not os.path.exists(objeto_a)
+    # A geração atual continua inteira, ainda ligada ao armazém
+    assert os.path.exists(os.path.join(diretorio(2), "Propagandas", "b.mp4"))
+    assert os.path.exists(objeto_b)
+    assert catalogo.geracao_atual("clientes")["numero"] == 2
+
+
+def test_coleta_preserva_conteudo_ainda_usado_pela_geracao_atual(cache):
+    gravar("Propagandas/a.mp4", b"a")
+    publicar("Propagandas/a.mp4")
+    gravar("Propagandas/b.mp4", b"b")
+    publicar("Propagandas/a.mp4", "Propagandas/b.mp4")
+
+    geracoes.coletar_geracoes("clientes", retencao=0)
+
+    assert numeros() == [2]
+    with open(os.path.join(diretorio(2), "Propagandas", "a.mp4"), "rb") as f:
+        assert f.read() == b"a"
+    assert os.path.exists(armazem.caminho_objeto(armazem.calcular_sha256(indice.absoluto("Propagandas/a.mp4"))))
+
+
+def test_retencao_conta_a_partir_da_substituicao(cache, monkeypatch):
+    gravar("Propagandas/a.mp4", b"a")
+    publicar("Propagandas/a.mp4")
+    gravar("Propagandas/b.mp4", b"b")
+    agora = time.time()
+    monkeypatch.setattr(time, "time", lambda: agora - geracoes.RETENCAO - 1)
+    publicar("Propagandas/b.mp4")  # a geração 1 foi substituída há mais que a retenção
+    monkeypatch.setattr(time, "time", lambda: agora)
+
+    assert geracoes.coletar_geracoes("clientes") == 1
+    assert numeros() == [2]
@@ -0,0 +1,111 @@
+from atualizadores import manifesto
+
+FILTRO = {"cliente_id": 101}
+
+
+def _manifesto(videos, nome="Edifício Central"):
+    return {
+        "nome": nome,
+        "Propagandas": [{"video": video, "categoria": "Propagandas"} for video in videos],
+        "Banners": [],
+        "CondominiumNotices": [],
+    }
+
+
+def _publicar(backend, dados, carimbo):
+    backend.publicar("updates_clientes", dados, "atualizado_em", carimbo, cliente_id=101)
+
+
+def test_primeira_busca_usa_o_snapshot(backend, espiar):
+    _publicar(backend, _manifesto(["a.mp4", "b.mp4"]), "2026-01-01T00:00:00")
+    deltas = espiar(manifesto, "_buscar_delta")
+
+    dados, carimbo = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["a.mp4", "b.mp4"])
+    assert carimbo == "2026-01-01T00:00:00"
+    assert deltas == []
+    assert manifesto.remoto_salvo("clientes") == (dados, carimbo)
+
+
+def test_carimbo_igual_dispensa_delta_e_snapshot(backend, espiar):
+    _publicar(backend, _manifesto(["a.mp4"]), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    deltas, snapshots = espiar(manifesto, "_buscar_delta"), espiar(manifesto, "_buscar_snapshot")
+
+    dados, carimbo = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["a.mp4"])
+    assert carimbo == "2026-01-01T00:00:00"
+    assert deltas == [] and snapshots == []
+
+
+def test_mudanca_chega_por_delta(backend, espiar):
+    _publicar(backend, _manifesto(["a.mp4", "b.mp4"]), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    _publicar(backend, _manifesto(["b.mp4", "c.mp4"], nome="Edifício Norte"), "2026-01-02T00:00:00")
+    snapshots = espiar(manifesto, "_buscar_snapshot")
+
+    dados, carimbo = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["b.mp4", "c.mp4"], nome="Edifício Norte")
+    assert carimbo == "2026-01-02T00:00:00"
+    assert snapshots == []
+    assert manifesto.remoto_salvo("clientes") == (dados, carimbo)
+
+
+def test_delta_trafega_menos_que_o_snapshot(backend):
+    videos = [f"video_{i:03d}.mp4" for i in range(200)]
+    _publicar(backend, _manifesto(videos), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    snapshot = backend.bytes_respondidos
+
+    _publicar(backend, _manifesto(videos + ["novo.mp4"]), "2026-01-02T00:00:00")
+    backend.bytes_respondidos = 0
+    dados, _ = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(videos + ["novo.mp4"])
+    assert backend.bytes_respondidos * 10 < snapshot
+
+
+def test_base_desconhecida_cai_no_snapshot(backend, espiar):
+    _publicar(backend, _manifesto(["a.mp4"]), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    _publicar(backend, _manifesto(["a.mp4", "b.mp4"]), "2026-01-02T00:00:00")
+    backend.dados["historico"] = {}  # versão base já expirou do histórico do servidor
+    snapshots = espiar(manifesto, "_buscar_snapshot")
+
+    dados, carimbo = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["a.mp4", "b.mp4"])
+    assert carimbo == "2026-01-02T00:00:00"
+    assert len(snapshots) == 1
+
+
+def test_assinatura_divergente_cai_no_snapshot(backend, espiar):
+    _publicar(backend, _manifesto(["a.mp4"]), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    # Cópia local corrompida com o mesmo carimbo: o delta aplicado sobre ela não confere com a assinatura
+    manifesto.lembrar_remoto("clientes", _manifesto(["outro.mp4"]), "2026-01-01T00:00:00")
+    _publicar(backend, _manifesto(["a.mp4", "b.mp4"]), "2026-01-02T00:00:00")
+    snapshots = espiar(manifesto, "_buscar_snapshot")
+
+    dados, _ = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["a.mp4", "b.mp4"])
+    assert len(snapshots) == 1
+
+
+def test_falha_no_delta_cai_no_snapshot(backend, monkeypatch):
+    _publicar(backend, _manifesto(["a.mp4"]), "2026-01-01T00:00:00")
+    manifesto.buscar_manifesto("clientes", FILTRO)
+    _publicar(backend, _manifesto(["b.mp4"]), "2026-01-02T00:00:00")
+
+    def sem_funcao_remota(funcao, parametros=None):
+        raise KeyError(f"função remota desconhecida: {funcao}")
+
+    monkeypatch.setattr(backend, "rpc", sem_funcao_remota)
+    dados, carimbo = manifesto.buscar_manifesto("clientes", FILTRO)
+
+    assert dados == _manifesto(["b.mp4"])
+    assert carimbo == "2026-01-02T00:00:00"
@@ -0,0 +1,116 @@
+import pytest
+from atualizadores import pacote_sync, manifesto, servidor_local, catalogo
+
+CLIENTES = {"nome": "Edifício Central", "Propagandas": [{"video": "a.mp4"}], "Banners": [], "CondominiumNotices": []}
+ENTRETENIMENTO = {"entretenimento": [{"video": "curiosidade.mp4", "categoria": "curiosidades"}]}
+NOTICIAS = {"geral": [{"titulo": "Manchete", "imagem": "manchete.jpg"}]}
+
+
+@pytest.fixture
+def servidor(backend, monkeypatch):
+    backend.publicar("updates_clientes", CLIENTES, "atualizado_em", "2026-01-01T00:00:00", cliente_id=101)
+    backend.publicar("entretenimento_updates", ENTRETENIMENTO, "versao", 3)
+    backend.dados["tabelas"]["noticias"] = [{"tipo": "noticias", "valor": NOTICIAS, "atualizado_em": "2026-01-01T08:00:00"}]
+    servidor = servidor_local.iniciar(backend)
+    url = f"http://127.0.0.1:{servidor.server_port}/api/sync"
+    monkeypatch.setattr(pacote_sync, "carregar_config_pacote", lambda: {"ativo": True, "url": url, "validade": 1800})
+    yield servidor
+    servidor.shutdown()
+    servidor.server_close()
+
+
+def test_valor_do_feed():
+    feeds = {"cotacao": {"carimbo": "c2", "dados": {"dolar": 5.1}}, "clima": {"carimbo": "k1"}}
+
+    assert pacote_sync._valor(feeds, "cotacao", {"dolar": 4.9}) == ({"dolar": 5.1}, "c2")
+    assert pacote_sync._valor(feeds, "clima", {"temperatura": 21}) == ({"temperatura": 21}, "k1")
+    assert pacote_sync._valor(feeds, "lives", []) is None
+
+
+def test_pacote_so_traz_dados_dos_feeds_que_mudaram(backend):
+    backend.publicar("updates_clientes", CLIENTES, "atualizado_em", "2026-01-01T00:00:00", cliente_id=101)
+    backend.publicar("entretenimento_updates", ENTRETENIMENTO, "versao", 3)
+
+    pacote = servidor_local.montar_pacote(backend, 101, {"clientes": "2026-01-01T00:00:00", "entretenimento": "2"})
+
+    assert pacote["feeds"]["clientes"] == {"carimbo": "2026-01-01T00:00:00"}
+    assert pacote["feeds"]["entretenimento"] == {"carimbo": 3, "dados": ENTRETENIMENTO}
+    assert "noticias" not in pacote["feeds"]  # tabela vazia: o cliente usa a consulta individual
+
+
+def test_ciclo_preenchido_pelo_pacote_nao_consulta_as_tabelas(servidor, espiar):
+    clientes, entretenimento = espiar(manifesto, "buscar_clientes"), espiar(manifesto, "buscar_entretenimento")
+
+    feeds = pacote_sync.buscar_pacote(101)
+    ciclo = pacote_sync.preparar_ciclo(feeds, 101)
+
+    assert servidor.requisicoes == 1
+    assert ciclo.clientes() == CLIENTES
+    assert ciclo.entretenimento() == {"versao": 3, "json_data": ENTRETENIMENTO}
+    assert ciclo.noticias() == (NOTICIAS, "2026-01-01T08:00:00")
+    assert clientes == [] and entretenimento == []
+    assert manifesto.remoto_salvo("clientes") == (CLIENTES, "2026-01-01T00:00:00")
+
+
+def test_feed_sem_mudanca_usa_a_copia_local(servidor, espiar):
+    pacote_sync.preparar_ciclo(pacote_sync.buscar_pacote(101), 101)
+    clientes = espiar(manifesto, "buscar_clientes")
+
+    feeds = pacote_sync.buscar_pacote(101)
+    ciclo = pacote_sync.preparar_ciclo(feeds, 101)
+
+    assert "dados" not in feeds["clientes"] and "dados" not in feeds["entretenimento"]
+    assert ciclo.clientes() == CLIENTES
+    assert ciclo.entretenimento() == {"versao": 3, "json_data": ENTRETENIMENTO}
+    assert clientes == []
+
+
+def test_servidor_sem_endpoint_pausa_o_pacote(servidor, monkeypatch, catalogo_vazio, espiar):
+    url = f"http://127.0.0.1:{servidor.server_port}/api/outro"
+    monkeypatch.setattr(pacote_sync, "carregar_config_pacote", lambda: {"ativo": True, "url": url, "validade": 1800})
+    pedidos = espiar(pacote_sync.http_cliente, "post")
+
+    assert pacote_sync.buscar_pacote(101) is None
+    assert float(catalogo_vazio.obter_metadado("pacote_sem_endpoint_ate", 0)) > 0
+    assert pacote_sync.buscar_pacote(101) is None
+    assert len(pedidos) == 1  # dentro da pausa o pacote nem é pedido
+
+
+def test_tarefa_do_pacote_grava_e_antecipa_so_os_feeds_que_mudaram(servidor, espiar):
+    disparados = []
+    assert pacote_sync.sincronizar(disparados.append)
+    assert sorted(disparados) == ["clientes", "entretenimento", "noticias"]
+
+    clientes = espiar(manifesto, "buscar_clientes")
+    ciclo = pacote_sync.ciclo_do_pacote()
+    assert ciclo.clientes() == CLIENTES
+    assert ciclo.entretenimento() == {"versao": 3, "json_data": ENTRETENIMENTO}
+    assert ciclo.noticias() == (NOTICIAS, "2026-01-01T08:00:00")
+    assert clientes == []
+
+    catalogo.salvar_feed("noticias", NOTICIAS, "2026-01-01T08:00:00")  # a tarefa de notícias processou o pacote
+    disparados.clear()
+    assert pacote_sync.sincronizar(disparados.append)
+    assert disparados == []  # nada mudou: as tarefas seguem no próprio ritmo
+
+
+def test_sem_pacote_as_tarefas_por_feed_consultam_sozinhas(servidor, monkeypatch):
+    url = f"http://127.0.0.1:{servidor.server_port}/api/outro"
+    monkeypatch.setattr(pacote_sync, "carregar_config_pacote", lambda: {"ativo": True, "url": url, "validade": 1800})
+    disparados = []
+
+    assert pacote_sync.sincronizar(disparados.append)  # não é falha: não há o que fazer
+    assert disparados == []
+    assert pacote_sync.ciclo_do_pacote() is None
+    assert not pacote_sync.recente("clientes")
+
+
+def test_agendador_mantem_as_tarefas_por_feed_com_o_pacote_ativo(backend, monkeypatch):
+    import atualizador
+    monkeypatch.setattr(pacote_sync, "carregar_config_pacote", lambda: {"ativo": True, "url": "http://127.0.0.1:9/api/sync", "validade": 1800})
+
+    tarefas = {tarefa.nome: tarefa for tarefa in atualizador.criar_agendador().tarefas}
+
+    assert {"pacote", "clientes", "entretenimento", "noticias", "lives", "cotacoes", "clima"} <= set(tarefas)
+    assert tarefas["clientes"].orcamento == "conteudo" and tarefas["noticias"].orcamento == "consultas"
+    assert tarefas["pacote"].orcamento == "consultas"
@@ -0,0 +1,99 @@
+import os
+import time
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6.QtCore import QCoreApplication
+from PyQt6.QtNetwork import QLocalServer
+import passagem
+
+
+class Janela(QtWidgets.QWidget):
+    """O mínimo da MainWindow que a passagem usa."""
+
+    def __init__(self, midia_pronta=True):
+        super().__init__()
+        self.pronta = midia_pronta
+        self.retomadas = 0
+
+    def midia_pronta(self):
+        return self.pronta
+
+    def retomar_midia(self):
+        self.retomadas += 1
+
+
+@pytest.fixture
+def app(monkeypatch, catalogo_vazio):
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    # Nome próprio por teste e esperas curtas, para o teste não depender de outra instância nem de 20s
+    monkeypatch.setattr(passagem, "NOME_SERVIDOR", f"telasindexa-teste-{os.getpid()}-{time.monotonic_ns()}")
+    monkeypatch.setattr(passagem, "ESPERA_RESPOSTA", 300)
+    monkeypatch.setattr(passagem, "ESPERA_QUADRO", 300)
+    monkeypatch.setattr(passagem, "ESPERA_SAIDA", 300)
+    monkeypatch.setattr(QCoreApplication, "quit", lambda: None)  # a "instância antiga" é este mesmo processo
+    return app
+
+
+def rodar_ate(condicao, limite=5):
+    fim = time.monotonic() + limite
+    while not condicao() and time.monotonic() < fim:
+        QCoreApplication.processEvents()
+        time.sleep(0.01)
+    return condicao()
+
+
+def test_nova_aparece_por_cima_antes_da_antiga_sumir(app, catalogo_vazio):
+    antiga = Janela()
+    antiga.show()
+    servidor = passagem.ServidorPassagem(antiga)
+    nova, assumiu = Janela(), []
+    cliente = passagem.ClientePassagem(nova, lambda: assumiu.append(time.time()))
+
+    assert rodar_ate(lambda: assumiu)
+
+    assert nova.isVisible() and not antiga.isVisible()
+    assert nova.retomadas == 1
+    assert cliente.avisada and cliente.oculta_em is not None
+    assert cliente.mostrada_em <= cliente.oculta_em  # a antiga só some depois da nova estar na tela
+    assert int(catalogo_vazio.obter_metadado("passagem_lacuna_ms")) <= 0  # sobreposição, nunca tela vazia
+    servidor.servidor.close()
+
+
+def test_sem_instancia_antiga_assume_direto(app):
+    nova, assumiu = Janela(), []
+    cliente = passagem.ClientePassagem(nova, lambda: assumiu.append(True))
+
+    assert rodar_ate(lambda: assumiu)
+
+    assert assumiu == [True]
+    assert nova.isVisible() and not cliente.avisada
+
+
+def test_instancia_antiga_muda_nao_segura_a_nova(app):
+    muda = QLocalServer()
+    assert muda.listen(passagem.NOME_SERVIDOR)  # aceita a conexão mas nunca responde
+    nova, assumiu = Janela(), []
+    cliente = passagem.ClientePassagem(nova, lambda: assumiu.append(True))
+
+    assert rodar_ate(lambda: assumiu)
+
+    assert nova.isVisible() and not cliente.avisada
+    muda.close()
+
+
+def test_espera_a_midia_antes_de_pedir_a_vez(app, monkeypatch):
+    monkeypatch.setattr(passagem, "ESPERA_MIDIA", 0.3)
+    antiga = Janela()
+    antiga.show()
+    servidor = passagem.ServidorPassagem(antiga)
+    nova, assumiu = Janela(midia_pronta=False), []
+    cliente = passagem.ClientePassagem(nova, lambda: assumiu.append(True))
+
+    rodar_ate(lambda: False, limite=0.2)
+    assert antiga.isVisible() and cliente.mostrada_em is None
+
+    assert rodar_ate(lambda: assumiu)  # sem mídia em ESPERA_MIDIA, assume assim mesmo
+    assert not antiga.isVisible()
+    servidor.servidor.close()
@@ -0,0 +1,70 @@
+import os
+import pytest
+from atualizadores import slots
+
+
+@pytest.fixture
+def software(tmp_path, monkeypatch, catalogo_vazio):
+    """Raiz de instalação própria do teste, com os slots v6 e v7 montados."""
+    monkeypatch.setattr(slots, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(slots, "SOFTWARE_DIR", str(tmp_path / "software"))
+    monkeypatch.setattr(slots, "PONTEIRO", str(tmp_path / "software" / "atual.json"))
+    for slot in ("v6", "v7"):
+        os.makedirs(tmp_path / "software" / slot)
+        (tmp_path / "software" / slot / "app.py").write_text("")
+    iniciados = []
+    monkeypatch.setattr(slots, "iniciar", lambda script, slot_dir=None, argumentos=(): iniciados.append(slot_dir))
+    return iniciados
+
+
+def test_ativar_guarda_o_slot_anterior_sem_confirmar(software):
+    slots.ativar(6, "v6")
+    slots.confirmar()
+    slots.ativar(7, "v7")
+
+    assert slots.carregar_ponteiro() == {"versao": 7, "slot": "v7", "anterior": {"versao": 6, "slot": "v6"}, "confirmado": False}
+    assert slots.diretorio_ativo() == slots.diretorio_slot("v7")
+
+
+def test_versao_que_nao_subiu_volta_para_a_anterior_no_boot(software):
+    slots.ativar(6, "v6")
+    slots.confirmar()
+    slots.ativar(7, "v7")  # energia caiu antes da versão 7 sinalizar que subiu
+
+    assert slots.redirecionar(os.path.join(slots.BASE_DIR, "app.py")) is True
+
+    assert software == [slots.diretorio_slot("v6")]
+    ponteiro = slots.carregar_ponteiro()
+    assert (ponteiro["versao"], ponteiro["slot"], ponteiro["confirmado"]) == (6, "v6", True)
+
+
+def test_reverter_sem_anterior_volta_para_a_raiz(software):
+    slots.ativar(7, "v7")
+
+    assert slots.reverter() is None
+    assert slots.diretorio_ativo() == slots.BASE_DIR
+    assert slots.redirecionar(os.path.join(slots.BASE_DIR, "app.py")) is False
+    assert software == []
+
+
+def test_sinalizar_pronto_confirma_so_do_slot_ativo(software, catalogo_vazio):
+    slots.ativar(7, "v7")
+
+    slots.sinalizar_pronto(slots.diretorio_slot("v6"))
+    assert slots.carregar_ponteiro()["confirmado"] is False
+
+    slots.sinalizar_pronto(slots.diretorio_slot("v7"))
+    assert slots.carregar_ponteiro()["confirmado"] is True
+    assert slots.app_pronto(os.getpid())
+    assert catalogo_vazio.carregar_versao("software") == 7
+
+
+def test_limpar_slots_mantem_ativo_anterior_e_em_preparacao(software):
+    for slot in ("v5", "v8.preparando"):
+        os.makedirs(os.path.join(slots.SOFTWARE_DIR, slot))
+    slots.ativar(6, "v6")
+    slots.ativar(7, "v7")
+
+    slots.limpar_slots()
+
+    assert sorted(nome for nome in os.listdir(slots.SOFTWARE_DIR) if nome != "atual.json") == ["v6", "v7", "v8.preparando"]
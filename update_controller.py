@@ -1,28 +1,42 @@
 def executar_atualizacoes(callback_progresso=None):
-    from atualizadores import sistema, entretenimento, noticias_update
+    from threading import Thread, Lock
+    from atualizadores import sistema, entretenimento, noticias_update, pacote_sync, manifesto
 
     progresso = {"total": 0, "atual": 0}
+    lock = Lock()
 
     def atualizar_barra():
         if callback_progresso and progresso["total"] > 0:
             percentual = int((progresso["atual"] / progresso["total"]) * 100)
-            callback_progresso(percentual)
+            callback_progresso(min(percentual, 100))
 
     def progresso_increment():
-        progresso["atual"] += 1
-        atualizar_barra()
+        # Chamado pelos workers do pool de downloads, possivelmente em paralelo
+        with lock:
+            progresso["atual"] += 1
+            atualizar_barra()
 
-    # 1️⃣ Contar arquivos pendentes
-    progresso["total"] += sistema.contar_arquivos_faltando()
-    progresso["total"] += entretenimento.contar_videos_faltando()
-    progresso["total"] += noticias_update.contar_imagens_faltando()
+    # 1️⃣ Contar arquivos pendentes (os manifestos são buscados uma única vez e reaproveitados no download;
+    #    com o pacote de sincronização, todos chegam numa só requisição)
+    #    (tela_id lido agora: na primeira execução o config.json acabou de ser gravado)
+    tela_id = manifesto.carregar_config()
+    manifesto_ciclo = pacote_sync.preparar_ciclo(pacote_sync.buscar_pacote(tela_id) or {}, tela_id)
+    progresso["total"] += sistema.contar_arquivos_faltando(manifesto_ciclo)
+    progresso["total"] += entretenimento.contar_videos_faltando(manifesto_ciclo)
+    progresso["total"] += noticias_update.contar_imagens_faltando(manifesto_ciclo)
 
     print(f"📊 Total de arquivos a baixar: {progresso['total']}")
 
-    # 2️⃣ Executar as atualizações com callback por arquivo
-    sistema.verificar_atualizacao(callback=progresso_increment)
-    entretenimento.verificar_atualizacao_entretenimento(callback=progresso_increment)
-    noticias_update.verificar_e_atualizar_noticias(callback=progresso_increment)
+    # 2️⃣ Executar as atualizações em paralelo; todas compartilham o mesmo pool de downloads
+    threads = [
+        Thread(target=sistema.verificar_atualizacao, kwargs={"callback": progresso_increment, "manifesto_ciclo": manifesto_ciclo}),
+        Thread(target=entretenimento.verificar_atualizacao_entretenimento, kwargs={"callback": progresso_increment, "manifesto_ciclo": manifesto_ciclo}),
+        Thread(target=noticias_update.verificar_e_atualizar_noticias, kwargs={"callback": progresso_increment, "manifesto_ciclo": manifesto_ciclo}),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
 
     # 3️⃣ Força o progresso para 100% no fim
     if callback_progresso:
@@ -1,44 +1,33 @@
 import os
 import time
-import json
-import requests
-import subprocess
+import shutil
 import atexit
 import zipfile
+import compileall
 import sys
-from config.database import supabase
+from urllib.parse import quote
+from atualizadores import http_cliente, catalogo, backend_local, pacote_sync, canal_push, armazem, slots, manifesto
+from atualizadores.agendador import Agendador, Tarefa, carregar_intervalos
 
 BASE_DIR = os.path.abspath(".")
 CACHE_DIR = os.path.join(BASE_DIR, "cache")
-VERSAO_FILE = os.path.join(CACHE_DIR, "versao_software.json")
-CONFIG_PATH = os.path.join(BASE_DIR, "config.json")
 LOCKFILE = os.path.join(CACHE_DIR, "software_updater.lock")
+INICIO_MAX = 120  # segundos para a versão nova sinalizar que assumiu a tela; depois disso, rollback
+PROCESSOS_APP = ("app.py", "atualizador.py")  # instância antiga: encerrada na troca se não sair pela passagem
 
 os.makedirs(CACHE_DIR, exist_ok=True)
-
-def carregar_config():
-    if not os.path.exists(CONFIG_PATH):
-        return 101
-    try:
-        with open(CONFIG_PATH, "r", encoding="utf-8") as file:
-            data = json.load(file)
-            return int(data.get("tela_id", 101))
-    except:
-        return 101
+supabase = backend_local.obter_cliente()
+versao_avisada = None  # última versão vista no catálogo por verificar_aviso_versao
 
 def carregar_versao_local():
-    if not os.path.exists(VERSAO_FILE):
-        return 1
     try:
-        with open(VERSAO_FILE, "r") as f:
-            return json.load(f).get("versao", 1)
+        return catalogo.carregar_versao("software", 1)
     except:
         return 1
 
 def salvar_versao_local(versao):
     try:
-        with open(VERSAO_FILE, "w") as f:
-            json.dump({"versao": versao}, f)
+        catalogo.salvar_versao("software", versao)
     except:
         pass
 
@@ -48,7 +37,7 @@ def limpar_lockfile():
 
 def baixar_arquivo(url, destino):
     try:
-        r = requests.get(url, stream=True, timeout=15)
+        r = http_cliente.get(url, stream=True, timeout=15)
         if r.status_code == 200:
             with open(destino, "wb") as f:
                 for chunk in r.iter_content(1024 * 1024):
@@ -66,55 +55,215 @@ def extrair_zip(zip_path, destino="."):
     except:
         return False
 
+def url_manifesto(dados, url_download):
+    """Manifesto por arquivo da versão: coluna manifesto_url, ou a URL do zip com .manifest.json no lugar de .zip.
+
+    {"base_url": "https://.../software_v7", "arquivos": {"app.py": {"sha256": "...", "tamanho": 1234}, ...}}
+    """
+    return dados.get("manifesto_url") or url_download.rsplit(".zip", 1)[0] + ".manifest.json"
+
+def baixar_manifesto_software(url):
+    try:
+        r = http_cliente.get(url, timeout=15, tentativas=1)
+        if r.status_code == 200:
+            return r.json()
+    except:
+        pass
+    return None
+
+def montar_slot_delta(manifesto_software, slot_dir):
+    """Arquivos iguais aos da versão ativa viram hard links; só os diferentes são baixados.
+
+    Retorna (bytes baixados, bytes da versão) ou None se algum arquivo não conferir.
+    """
+    origem = slots.diretorio_ativo()
+    base_url = manifesto_software["base_url"].rstrip("/")
+    baixados = total = 0
+    for caminho, info in manifesto_software["arquivos"].items():
+        destino = os.path.normpath(os.path.join(slot_dir, *caminho.split("/")))
+        if not destino.startswith(os.path.normpath(slot_dir) + os.sep):
+            print(f"❌ Caminho inválido no manifesto do software: {caminho}")
+            return None
+        atual = os.path.join(origem, *caminho.split("/"))
+        total += int(info.get("tamanho") or 0)
+        if os.path.isfile(atual) and armazem.calcular_sha256(atual) == info["sha256"]:
+            armazem.vincular_arquivo(atual, destino)
+            continue
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        if not baixar_arquivo(f"{base_url}/{quote(caminho)}", destino) or armazem.calcular_sha256(destino) != info["sha256"]:
+            print(f"❌ Arquivo da atualização não confere: {caminho}")
+            return None
+        baixados += os.path.getsize(destino)
+    return baixados, total
+
+def montar_slot_zip(url_download, slot_dir):
+    zip_path = slot_dir + ".zip"
+    try:
+        if not baixar_arquivo(url_download, zip_path) or not extrair_zip(zip_path, slot_dir):
+            return None
+        tamanho = os.path.getsize(zip_path)
+        return tamanho, tamanho
+    finally:
+        if os.path.exists(zip_path):
+            os.remove(zip_path)
+
+def preparar_slot(versao, dados, url_download):
+    """Monta e compila a versão nova em software/v<N>/, ao lado da versão em execução. Retorna o slot ou None."""
+    slot = f"v{versao}"
+    preparando = os.path.join(slots.SOFTWARE_DIR, slot + ".preparando")
+    shutil.rmtree(preparando, ignore_errors=True)
+    os.makedirs(preparando)
+
+    manifesto_software = baixar_manifesto_software(url_manifesto(dados, url_download))
+    resultado = montar_slot_delta(manifesto_software, preparando) if manifesto_software else None
+    if resultado is None:
+        # 📦 Sem manifesto por arquivo (ou delta falhou): zip completo, mas ainda extraído no slot
+        shutil.rmtree(preparando, ignore_errors=True)
+        resultado = montar_slot_zip(url_download, preparando)
+    if resultado is None:
+        shutil.rmtree(preparando, ignore_errors=True)
+        return None
+
+    # ⚙️ Bytecode gerado aqui: a versão nova não paga a compilação no primeiro start
+    if not compileall.compile_dir(preparando, quiet=1):
+        print(f"❌ Versão {versao} não compila; atualização descartada")
+        shutil.rmtree(preparando, ignore_errors=True)
+        catalogo.salvar_metadado("software_versao_recusada", versao)
+        return None
+
+    final = os.path.join(slots.SOFTWARE_DIR, slot)
+    shutil.rmtree(final, ignore_errors=True)
+    os.replace(preparando, final)
+    baixados, total = resultado
+    print(f"📦 Slot {slot} pronto: {baixados / 1024:.0f} KB baixados (versão completa: {total / 1024:.0f} KB)")
+    return slot
+
+def processos_app():
+    """Processos da instância em exibição (app + atualizador), menos este verificador."""
+    import psutil
+    processos = []
+    for proc in psutil.process_iter(["pid", "cmdline"]):
+        linha = " ".join(proc.info["cmdline"] or [])
+        if proc.pid != os.getpid() and any(nome in linha for nome in PROCESSOS_APP):
+            processos.append(proc)
+    return processos
+
+def encerrar_processos_app(processos=None):
+    for proc in processos if processos is not None else processos_app():
+        try:
+            if proc.is_running():
+                proc.terminate()
+                proc.wait(timeout=5)
+        except:
+            proc.kill()
+
+def trocar_versao(versao, slot):
+    """Sobe a versão nova em espera com a atual ainda na tela e espera ela sinalizar que assumiu.
+
+    A troca de janela é feita entre os dois apps (passagem.py), sem tela preta; a instância antiga sai
+    sozinha e leva este verificador junto. Se a nova não subir, é encerrada e a antiga nem chega a sair.
+    """
+    slots.ativar(versao, slot)
+    inicio = time.monotonic()
+    antigos = processos_app()
+    proc = slots.iniciar("app.py", argumentos=("--assumir",))
+    while time.monotonic() - inicio < INICIO_MAX and proc.poll() is None:
+        if slots.app_pronto(proc.pid):
+            slots.confirmar()
+            # Instância antiga sem servidor de passagem (anterior a ele) continua no ar: sai agora
+            encerrar_processos_app(antigos)
+            lacuna = catalogo.obter_metadado("passagem_lacuna_ms", None)
+            print(f"✅ Versão {versao} no ar em {time.monotonic() - inicio:.1f}s"
+                  + (f" (lacuna na tela: {max(int(lacuna), 0)} ms)" if lacuna is not None else ""))
+            return True
+        time.sleep(0.5)
+
+    print(f"↩️ Versão {versao} não subiu em {INICIO_MAX}s; a versão atual segue na tela")
+    if proc.poll() is None:
+        proc.kill()
+    slots.reverter()
+    catalogo.salvar_metadado("software_versao_recusada", versao)
+    if not any(p.is_running() for p in antigos):
+        slots.iniciar("app.py")
+    return False
+
+def reportar_versao_instalada(cliente_id, versao):
+    """Informa o backend uma vez por versão instalada em slot.
+
+    Na passagem o verificador que fez a troca costuma sair antes de chegar aqui; o da versão nova reporta.
+    """
+    ponteiro = slots.carregar_ponteiro()
+    if not ponteiro or not ponteiro.get("confirmado") or ponteiro.get("versao") != versao:
+        return
+    if str(catalogo.obter_metadado("software_versao_reportada", "")) == str(versao):
+        return
+    # ✅ Atualiza no Supabase
+    supabase.table("sistema_update").update({
+        "versao_instalada": versao,
+        "atualizado": True
+    }).eq("cliente_id", cliente_id).execute()
+    catalogo.salvar_metadado("software_versao_reportada", versao)
+    slots.limpar_slots()
+
 def verificar_nova_versao():
-    cliente_id = carregar_config()
+    cliente_id = manifesto.carregar_config()
     versao_instalada = carregar_versao_local()
 
-    if not os.path.exists(VERSAO_FILE):
-        salvar_versao_local(versao_instalada)
+    salvar_versao_local(versao_instalada)
 
     try:
-        response = supabase.table("sistema_update").select("*").eq("cliente_id", cliente_id).execute()
-        dados = response.data[0] if response.data else None
+        reportar_versao_instalada(cliente_id, versao_instalada)
+
+        # 📦 Se o pacote de sincronização do atualizador é recente (ou o canal push está de pé),
+        #    a versão já está no catálogo
+        dados, _ = catalogo.carregar_feed("software")
+        if not (dados and (pacote_sync.recente("software") or canal_push.ativo())):
+            # 📡 Sonda: só a versão disponível; a URL de download só é pedida quando há versão nova
+            response = supabase.table("sistema_update").select("versao_disponivel").eq("cliente_id", cliente_id).execute()
+            dados = response.data[0] if response.data else None
         if not dados:
             return
 
         versao_disponivel = dados.get("versao_disponivel")
-        url_download = dados.get("download_url")
 
         if versao_disponivel > versao_instalada:
-            zip_path = os.path.join(BASE_DIR, f"software_v{versao_disponivel}.zip")
-
-            if baixar_arquivo(url_download, zip_path):
-                if extrair_zip(zip_path, BASE_DIR):
-                    salvar_versao_local(versao_disponivel)
-                    os.remove(zip_path)
-                    # ✅ Atualiza no Supabase
-                    supabase.table("sistema_update").update({
-                        "versao_instalada": versao_disponivel,
-                        "atualizado": True
-                    }).eq("cliente_id", cliente_id).execute()
-
-                    # 🧨 Encerra instância atual do app.py, se estiver rodando
-                    import psutil
-                    for proc in psutil.process_iter(["pid", "cmdline"]):
-                        if proc.info["cmdline"] and "app.py" in " ".join(proc.info["cmdline"]):
-                            try:
-                                proc.terminate()
-                                proc.wait(timeout=5)
-                            except:
-                                proc.kill()
-
-                    # 🔁 Reinicia o app.py
-                    app_path = os.path.join(BASE_DIR, "app.py")
-                    if os.path.exists(app_path):
-                        subprocess.Popen([sys.executable, app_path], creationflags=subprocess.CREATE_NO_WINDOW)
-
-                    # Encerra o verificador
-                    os._exit(0)
+            if str(catalogo.obter_metadado("software_versao_recusada", "")) == str(versao_disponivel):
+                return  # já falhou nesta tela; espera a próxima versão
+            url_download = dados.get("download_url")
+            if not url_download:
+                response = supabase.table("sistema_update").select("download_url").eq("cliente_id", cliente_id).execute()
+                url_download = response.data[0].get("download_url") if response.data else None
+            if not url_download:
+                return
+            # 🅰️🅱️ A versão nova é montada ao lado da atual; a árvore em execução não é tocada
+            slot = preparar_slot(versao_disponivel, dados, url_download)
+            if not slot:
+                return False
 
-    except:
-        pass
+            if trocar_versao(versao_disponivel, slot):
+                salvar_versao_local(versao_disponivel)
+                reportar_versao_instalada(cliente_id, versao_disponivel)
+
+            # 🔁 O verificador da versão ativa assume daqui (o app novo não consegue iniciá-lo com este no ar)
+            limpar_lockfile()
+            slots.iniciar("verificador_sistema.py")
+            os._exit(0)
+
+    except Exception as e:
+        print(f"❌ Erro ao verificar nova versão: {e}")
+        return False
+
+def verificar_aviso_versao():
+    """Só lê o catálogo: quando o canal push do atualizador grava uma versão nova, instala na hora."""
+    global versao_avisada
+    _, versao = catalogo.carregar_feed("software")
+    if versao is None or versao == versao_avisada:
+        return
+    primeira_leitura = versao_avisada is None
+    versao_avisada = versao
+    if not primeira_leitura:
+        print(f"📨 Versão {versao} avisada pelo canal push")
+        verificar_nova_versao()
 
 if __name__ == "__main__":
     if os.path.exists(LOCKFILE):
@@ -134,6 +283,10 @@ if __name__ == "__main__":
 
     atexit.register(limpar_lockfile)
 
-    while True:
-        verificar_nova_versao()
-        time.sleep(1200)  # 20 minutos
+    # 🔁 Feed da versão do software, com jitter e backoff próprios
+    intervalos = carregar_intervalos({"versao_software": 1200})  # 20 minutos
+    agendador = Agendador()
+    agendador.adicionar(Tarefa("versao_software", verificar_nova_versao, intervalos["versao_software"],
+                               fator_push=canal_push.FATOR_POLLING))
+    agendador.adicionar(Tarefa("aviso_versao", verificar_aviso_versao, 15, fase=False))
+    agendador.rodar()